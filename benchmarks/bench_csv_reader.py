@@ -0,0 +1,72 @@
+"""
+Benchmark csv_reader.read_rows against np.genfromtxt and np.loadtxt.
+
+Usage:
+    python -m benchmarks.bench_csv_reader [--sizes-mb 1 10 100 1000]
+
+For each size a synthetic ``path_id,segment_id,x,y`` file is written in the same
+format as the files in src/problems (``%.18e`` fields) and parsed by each reader.
+np.genfromtxt is skipped above --genfromtxt-limit-mb because it gets very slow.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.csv_reader import read_rows
+
+BYTES_PER_ROW = 4 * 25  # '%.18e' fields with separators
+
+
+def make_synthetic_csv(csv_path, size_mb, points_per_segment=100, seed=0):
+    """
+    Write a synthetic CSV of roughly size_mb megabytes, in blocks to bound memory.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = int(size_mb * 1e6 / BYTES_PER_ROW)
+    block = 1_000_000
+    with open(csv_path, 'wb') as f:
+        for start in range(0, n_rows, block):
+            index = np.arange(start, min(start + block, n_rows)) // points_per_segment
+            rows = np.column_stack([index // 4, index % 4, rng.random((len(index), 2)) * 1000])
+            np.savetxt(f, rows, delimiter=',')
+    return n_rows
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes-mb', type=float, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--genfromtxt-limit-mb', type=float, default=100)
+    args = parser.parse_args()
+
+    readers = {
+        'read_rows float64': lambda path: read_rows(path),
+        'read_rows float32': lambda path: read_rows(path, dtype=np.float32),
+        'np.loadtxt': lambda path: np.loadtxt(path, delimiter=','),
+        'np.genfromtxt': lambda path: np.genfromtxt(path, delimiter=','),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes_mb:
+            csv_path = os.path.join(tmp, f"synthetic_{size_mb:g}mb.csv")
+            n_rows = make_synthetic_csv(csv_path, size_mb)
+            actual_mb = os.path.getsize(csv_path) / 1e6
+            print(f"{actual_mb:.1f} MB, {n_rows} rows")
+            for name, reader in readers.items():
+                if name == 'np.genfromtxt' and size_mb > args.genfromtxt_limit_mb:
+                    continue
+                seconds, _ = timed(lambda: reader(csv_path))
+                print(f"  {name:<18} {seconds:8.3f} s  {actual_mb / seconds:8.1f} MB/s")
+            os.remove(csv_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark plot_paths: one Line2D per segment against a single LineCollection, and
+memory across a batch of files with a new figure per file against one reused figure.
+
+Usage:
+    python -m benchmarks.bench_plot_paths [--segments 1000 10000] [--batch 50]
+"""
+import argparse
+import io
+import time
+import tracemalloc
+import warnings
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from src.visualizer import plot_paths
+
+
+def make_paths(n_segments, points_per_segment=20, segments_per_path=4, seed=0):
+    """
+    Random-walk segments, grouped into paths.
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(size=(n_segments, points_per_segment, 2))
+    segments = np.cumsum(steps, axis=1) + rng.random((n_segments, 1, 2)) * 1000
+    return [list(segments[i:i + segments_per_path]) for i in range(0, n_segments, segments_per_path)]
+
+
+def render(paths, batch):
+    ax = plot_paths(paths, batch=batch)
+    ax.figure.savefig(io.BytesIO(), format='png')
+    n_artists = len(ax.lines) + len(ax.collections)
+    plt.close(ax.figure)
+    return n_artists
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--segments', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--batch', type=int, default=50)
+    args = parser.parse_args()
+
+    for n_segments in args.segments:
+        paths = make_paths(n_segments)
+        for batch in (False, True):
+            start = time.perf_counter()
+            n_artists = render(paths, batch)
+            elapsed = time.perf_counter() - start
+            label = 'LineCollection' if batch else 'Line2D per segment'
+            print(f"{n_segments:>7} segments {label:>20}: {elapsed:7.3f} s, {n_artists} artists")
+
+    files = [make_paths(200, seed=seed) for seed in range(args.batch)]
+
+    def new_figures():
+        with warnings.catch_warnings():  # "More than 20 figures have been opened"
+            warnings.simplefilter('ignore')
+            for paths in files:  # Figures left open, as main.py used to do
+                ax = plot_paths(paths)
+                ax.figure.savefig(io.BytesIO(), format='png')
+        plt.close('all')
+
+    def reused_figure():
+        fig, ax = plt.subplots()
+        for paths in files:
+            ax.clear()
+            plot_paths(paths, ax=ax)
+            fig.savefig(io.BytesIO(), format='png')
+        plt.close(fig)
+
+    print(f"{args.batch} files, new figure per file: {peak_memory(new_figures) / 1e6:8.1f} MB peak")
+    print(f"{args.batch} files, one reused figure:   {peak_memory(reused_figure) / 1e6:8.1f} MB peak")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark PNG output: matplotlib plot_paths + savefig against the NumPy rasterizer.
+
+Usage:
+    python -m benchmarks.bench_png [--data-dir ./src/problems] [--repeat 3]
+
+Both renderers draw every CSV in the data directory at the same pixel size and the
+total wall-clock time per renderer is reported.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from src.data_loader import load_dataset
+from src.visualizer import plot_paths, save_paths_as_png
+
+
+def render_matplotlib(paths, output_path):
+    ax = plot_paths(paths, color='blue')
+    ax.figure.savefig(output_path, format='png')
+    plt.close(ax.figure)
+
+
+def render_numpy(paths, output_path):
+    save_paths_as_png(paths, output_path, color='blue')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-dir', default='./src/problems')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.data_dir)
+    n_points = sum(len(XY) for paths in dataset.values() for path in paths for XY in path)
+    print(f"{len(dataset)} files, {n_points} points")
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, render in (('matplotlib savefig', render_matplotlib), ('rasterizer', render_numpy)):
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for name, paths in dataset.items():
+                    render(paths, os.path.join(tmp, f"{name}.png"))
+                best = min(best, time.perf_counter() - start)
+            timings[label] = best
+            print(f"{label:>20}: {best:8.3f} s")
+
+    print(f"{'speedup':>20}: {timings['matplotlib savefig'] / timings['rasterizer']:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
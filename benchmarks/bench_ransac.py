@@ -0,0 +1,107 @@
+"""
+Benchmark circle and ellipse detection on the sample problems: Hough voting and
+per-segment ellipse fits against the RANSAC engine.
+
+Usage:
+    python -m benchmarks.bench_ransac [--data-dir ./src/problems] [--seed 0]
+
+The ground truth comes from the solution files (<name>_sol.csv, frag01_sol.csv for
+the fragments): every closed segment of at least 20 points that a conic fits
+tightly. A detection recalls a ground-truth shape when its center is within 10% of
+the shape size and its axes are within 10%.
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from src.data_loader import find_csv_files, read_csv
+from src.regularization.circle_detector import detect_circles
+from src.regularization.ellipse_detector import conic_to_ellipse, detect_ellipses
+from src.regularization.ransac import conic_design, conic_residuals, ransac_ellipses
+
+SOLUTIONS = {'frag0': 'frag01_sol', 'frag1': 'frag01_sol'}
+
+
+def ground_truth(paths, tolerance=0.01):
+    """
+    Ellipses (center_x, center_y, a, b, angle) of the closed, well-fitted segments.
+    """
+    shapes = []
+    for path in paths:
+        for XY in path:
+            if len(XY) < 20 or np.hypot(*(XY[0] - XY[-1])) > 0.05 * np.ptp(XY, axis=0).max():
+                continue
+            origin, scale = XY.mean(axis=0), np.ptp(XY, axis=0).max()
+            conic = np.linalg.svd(conic_design((XY - origin) / scale), full_matrices=False)[2][-1]
+            if conic_residuals(conic[None], (XY - origin) / scale).max() > tolerance:
+                continue
+            cx, cy, a, b, angle = conic_to_ellipse(conic)
+            if not np.isnan(cx):
+                shapes.append((cx * scale + origin[0], cy * scale + origin[1], a * scale, b * scale, angle))
+    return shapes
+
+
+def recall(truth, detected, tolerance=0.1):
+    """
+    Number of ground-truth ellipses matched by a detection (circles have a = b = r).
+    """
+    matched = 0
+    for cx, cy, a, b, _ in truth:
+        for shape in detected:
+            x, y, *axes = shape
+            da, db = (axes[0], axes[0]) if len(axes) == 1 else axes[:2]
+            if np.hypot(x - cx, y - cy) < tolerance * a and abs(da - a) < tolerance * a and abs(db - b) < tolerance * a:
+                matched += 1
+                break
+    return matched
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-dir', default='./src/problems')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')  # The per-segment ellipse fit warns on degenerate segments
+
+    csv_paths = find_csv_files(args.data_dir)
+    methods = {
+        'circles hough': lambda paths, points: detect_circles(points, method='hough'),
+        'circles ransac': lambda paths, points: detect_circles(points, method='ransac', seed=args.seed),
+        'ellipses per segment': lambda paths, points: detect_ellipses(paths),
+        'ellipses ransac': lambda paths, points: ransac_ellipses(points, seed=args.seed),
+    }
+    totals = {label: [0.0, 0] for label in methods}
+    n_truth = {'circles': 0, 'ellipses': 0}
+    for name, csv_path in csv_paths.items():
+        solution = SOLUTIONS.get(name, f"{name}_sol")
+        if name.endswith('_sol') or solution not in csv_paths:
+            continue
+        paths = read_csv(csv_path)
+        points = np.concatenate([XY for path in paths for XY in path])
+        truth = {'ellipses': ground_truth(read_csv(csv_paths[solution]))}
+        truth['circles'] = [shape for shape in truth['ellipses'] if shape[3] > 0.95 * shape[2]]
+        print(f"{name}: {len(points)} points, {len(truth['circles'])} circles, {len(truth['ellipses'])} ellipses")
+        for kind in n_truth:
+            n_truth[kind] += len(truth[kind])
+        for label, method in methods.items():
+            detected, seconds = timed(method, paths, points)
+            matched = recall(truth[label.split()[0]], detected)
+            totals[label][0] += seconds
+            totals[label][1] += matched
+            print(f"  {label:>21}: {seconds:7.3f} s, {len(detected):3d} detected, {matched} recalled")
+
+    print("Total:")
+    for label, (seconds, matched) in totals.items():
+        print(f"  {label:>21}: {seconds:7.3f} s, recall {matched}/{n_truth[label.split()[0]]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark the CSV grouping step of src.data_loader on synthetic drawings.
+
+Usage:
+    python -m benchmarks.bench_read_csv [--segments 100000] [--points 8]
+
+Writes a synthetic ``path_id, segment_id, x, y`` CSV with the requested number of
+segments, then times the original mask-per-id grouping against group_paths.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.data_loader import group_paths, read_csv
+
+
+def make_synthetic_csv(csv_path, n_segments, points_per_segment, segments_per_path=4, seed=0):
+    """
+    Write a synthetic CSV with n_segments segments of points_per_segment points each.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = n_segments * points_per_segment
+    segment_index = np.repeat(np.arange(n_segments), points_per_segment)
+    rows = np.column_stack([
+        segment_index // segments_per_path,
+        segment_index % segments_per_path,
+        rng.random((n_rows, 2)) * 1000,
+    ])
+    np.savetxt(csv_path, rows, delimiter=',')
+    return rows
+
+
+def mask_grouping(np_path_XYs):
+    """
+    The original grouping: one boolean mask per path id and per segment id.
+    """
+    path_XYs = []
+    for i in np.unique(np_path_XYs[:, 0]):
+        npXYs = np_path_XYs[np_path_XYs[:, 0] == i][:, 1:]
+        XYs = []
+        for j in np.unique(npXYs[:, 0]):
+            XYs.append(npXYs[npXYs[:, 0] == j][:, 1:])
+        path_XYs.append(XYs)
+    return path_XYs
+
+
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--segments', type=int, default=100_000)
+    parser.add_argument('--points', type=int, default=8)
+    parser.add_argument('--skip-baseline', action='store_true',
+                        help="Do not time the original grouping (it is quadratic).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'synthetic.csv')
+        rows = make_synthetic_csv(csv_path, args.segments, args.points)
+        shuffled = rows[np.random.default_rng(1).permutation(len(rows))]
+
+        print(f"{args.segments} segments, {len(rows)} rows")
+        print(f"group_paths (sorted input):   {timed(group_paths, rows):.4f} s")
+        print(f"group_paths (shuffled input): {timed(group_paths, shuffled):.4f} s")
+        print(f"read_csv (parse + group):     {timed(read_csv, csv_path, repeat=1):.4f} s")
+        if not args.skip_baseline:
+            print(f"mask grouping (original):     {timed(mask_grouping, rows, repeat=1):.4f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark SVG output: matplotlib plot_paths + savefig against the streaming SVG writer.
+
+Usage:
+    python -m benchmarks.bench_svg [--data-dir ./src/problems] [--precision 2] [--repeat 3]
+
+Both writers save every CSV in the data directory; the total wall-clock time and
+total file size per writer are reported.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from src.data_loader import load_dataset
+from src.svg_writer import write_svg
+from src.visualizer import plot_paths
+
+
+def render_matplotlib(paths, output_path, precision):
+    ax = plot_paths(paths, color='blue')
+    ax.figure.savefig(output_path, format='svg')
+    plt.close(ax.figure)
+
+
+def render_direct(paths, output_path, precision):
+    write_svg(output_path, paths, precision=precision)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-dir', default='./src/problems')
+    parser.add_argument('--precision', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.data_dir)
+    print(f"{len(dataset)} files")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, render in (('matplotlib savefig', render_matplotlib), ('svg_writer', render_direct)):
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for name, paths in dataset.items():
+                    render(paths, os.path.join(tmp, f"{name}.svg"), args.precision)
+                best = min(best, time.perf_counter() - start)
+            size = sum(os.path.getsize(os.path.join(tmp, f"{name}.svg")) for name in dataset)
+            results[label] = (best, size)
+            print(f"{label:>20}: {best:8.3f} s {size / 1e3:10.1f} kB")
+
+    (slow, big), (fast, small) = results['matplotlib savefig'], results['svg_writer']
+    print(f"{'ratio':>20}: {slow / fast:8.1f}x {big / small:9.1f}x smaller")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,56 +1,289 @@
+import argparse
 import os
-from src.data_loader import load_dataset
-from src.visualizer import plot_paths, save_plot_as_svg, save_plot_as_png
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+import matplotlib.pyplot as plt
+import src
+from src.data_loader import LazyDataset, find_csv_files
+from src.manifest import BuildManifest, code_version
+from src.parse_cache import ParseCache
+from src.visualizer import plot_paths, save_plot_as_svg, save_plot_as_png, save_paths_as_png, save_paths_as_svg
 
 # Constants for directories
 DATA_DIR = "./src/problems"  # Update this path to where your CSV and SVG files are located
 OUTPUT_DIR = "./output"
+CACHE_DIR = "./.cache/parse"  # Parsed CSVs are memory-mapped from here on reruns
+LOAD_WORKERS = None  # Processes parsing CSVs ahead of the rendering; None uses the CPUs left by the render workers
+RENDERER = "matplotlib"  # "matplotlib" plots a figure, "direct" writes SVG/PNG from the point arrays (faster)
+BATCH_WORKERS = 1  # Processes running process_file; 1 processes the files in this process
+CHUNK_SIZE = 4  # Files sent to a batch worker per task
+# Modules whose code determines the output files; editing one rebuilds everything
+RENDER_MODULES = ["csv_reader.py", "curve_set.py", "data_loader.py", "rasterizer.py", "svg_loader.py",
+                  "svg_writer.py", "visualizer.py"]
 
-def process_file(name, csv_data, output_dir):
+# Axis reused by every file rendered with matplotlib in this process
+_ax = None
+
+def init_renderer(renderer):
+    """
+    Set up the per-process rendering state (also the batch worker initializer).
+
+    Parameters:
+        renderer (str): "direct" or "matplotlib".
+    """
+    global _ax
+    if renderer == "matplotlib":
+        _, _ax = plt.subplots()
+
+def init_worker(renderer):
+    matplotlib.use('Agg')  # Workers never open windows
+    init_renderer(renderer)
+
+def render_with_matplotlib(ax, csv_data, svg_filename, png_filename):
+    """
+    Draw the data on a reused axis and save the figure as SVG and PNG.
+
+    The axis is cleared first, so one figure serves the whole batch instead of a new
+    figure (and its memory) per file.
+
+    Parameters:
+        ax (matplotlib.axes._axes.Axes): The axis to draw on.
+        csv_data (list): The parsed data from the CSV file.
+        svg_filename (str): The path where the SVG should be saved.
+        png_filename (str): The path where the PNG should be saved.
+    """
+    ax.clear()
+    plot_paths(csv_data, ax=ax, color='blue')
+    save_plot_as_svg(ax.figure, svg_filename)
+    save_plot_as_png(ax.figure, png_filename)
+
+def render_code_version():
+    """
+    Version of the rendering code, for the output manifest.
+    """
+    src_dir = os.path.dirname(src.__file__)
+    return code_version([os.path.abspath(__file__)] + [os.path.join(src_dir, module) for module in RENDER_MODULES])
+
+def output_filenames(name):
+    """
+    Names of the files process_file writes for an input, relative to the output directory.
+    """
+    return [f"{name}_from_csv.svg", f"{name}_from_csv.png"]
+
+def process_file(name, csv_data, output_dir, ax=None):
     """
     Process a single CSV file: plot, save as SVG, and convert to PNG.
-    
+
     Parameters:
         name (str): The name of the CSV file (without extension).
         csv_data (list): The parsed data from the CSV file.
         output_dir (str): The directory to save the output SVG and PNG files.
+        ax (matplotlib.axes._axes.Axes): Axis to render with matplotlib; if None the
+            SVG and PNG are written directly from the point arrays.
     """
     print(f"Processing {name}")
 
-    # Plot original data
-    fig, ax = plot_paths(csv_data, color='blue')
-    
-    # Save original data as SVG
-    svg_filename = os.path.join(output_dir, f"{name}_from_csv.svg")
-    save_plot_as_svg(fig, svg_filename)
-    
-    # Save as PNG
-    png_filename = os.path.join(output_dir, f"{name}_from_csv.png")
-    save_plot_as_png(fig, png_filename)
-    
+    svg_filename, png_filename = (os.path.join(output_dir, filename) for filename in output_filenames(name))
+
+    if ax is not None:
+        render_with_matplotlib(ax, csv_data, svg_filename, png_filename)
+    else:
+        # Save original data as SVG, written straight from the point arrays
+        save_paths_as_svg(csv_data, svg_filename, color='blue')
+
+        # Save as PNG, rasterized directly from the paths
+        save_paths_as_png(csv_data, png_filename, color='blue')
+
     print(f"Saved {svg_filename} and {png_filename}")
     print(f"Finished processing {name}")
 
-def main():
-    # Load the dataset
-    dataset = load_dataset(DATA_DIR)
-    
-    if not dataset:
-        print("No CSV files found in the specified directory.")
-        return
-    
-    print(f"Found {len(dataset)} CSV files.")
-    
-    # Ensure the output directory exists
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    # Process each file in the dataset
-    for name, csv_data in dataset.items():
+def file_result(name, status, seconds=0.0, error=None):
+    return {'name': name, 'status': status, 'seconds': seconds, 'error': error}
+
+def process_chunk(chunk, output_dir):
+    """
+    Process a list of (name, csv_data) pairs, isolating errors per file.
+
+    Parameters:
+        chunk (list): (name, csv_data) pairs.
+        output_dir (str): The directory to save the output SVG and PNG files.
+
+    Returns:
+        list: One result dict (name, status, seconds, error) per file.
+    """
+    results = []
+    for name, csv_data in chunk:
+        start = time.perf_counter()
         try:
-            process_file(name, csv_data, OUTPUT_DIR)
+            process_file(name, csv_data, output_dir, ax=_ax)
+            results.append(file_result(name, 'ok', time.perf_counter() - start))
         except Exception as e:
             print(f"Error processing {name}: {e}")
+            results.append(file_result(name, 'error', time.perf_counter() - start, str(e)))
         print("------------------------")
+    return results
+
+def iter_chunks(dataset, chunk_size, results):
+    """
+    Load the files in dataset order and group them into chunks.
+
+    Files that fail to load or are empty are recorded in results and left out.
+    """
+    chunk = []
+    for name in dataset:
+        try:
+            csv_data = dataset[name]
+        except Exception as e:
+            print(f"Error processing {name}: {e}")
+            results[name] = file_result(name, 'error', error=str(e))
+            continue
+        if not csv_data:
+            print(f"Warning: {name} is empty or could not be processed.")
+            results[name] = file_result(name, 'empty')
+            continue
+        chunk.append((name, csv_data))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_parallel(dataset, output_dir, renderer, workers, chunk_size, results):
+    """
+    Process the dataset on a pool of worker processes.
+
+    Chunks are submitted as files are loaded, with at most two per worker in flight,
+    so memory stays bounded on large inputs. If a worker dies, the files of its
+    chunk are recorded as errors and the rest of the batch carries on.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(renderer,)) as executor:
+        pending = deque()
+
+        def collect():
+            names, future = pending.popleft()
+            try:
+                chunk_results = future.result()
+            except Exception as e:
+                chunk_results = [file_result(name, 'error', error=f"worker failed: {e}") for name in names]
+            for result in chunk_results:
+                results[result['name']] = result
+
+        for chunk in iter_chunks(dataset, chunk_size, results):
+            pending.append(([name for name, _ in chunk], executor.submit(process_chunk, chunk, output_dir)))
+            if len(pending) >= 2 * workers:
+                collect()
+        while pending:
+            collect()
+
+def print_summary(results):
+    """
+    Print one line per file that was built, in input order, and the totals.
+    """
+    print("Summary:")
+    for result in results:
+        if result['status'] == 'fresh':
+            continue
+        error = f"  {result['error']}" if result['error'] else ""
+        print(f"  {result['name']:<30} {result['status']:<6} {result['seconds']:8.3f} s{error}")
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    print("  " + ", ".join(f"{count} {status}" for status, count in counts.items()))
+
+def load_worker_count(workers, load_workers=None):
+    """
+    Number of parse processes to run beside workers render processes.
+
+    Parsing and rendering share the CPUs, so by default the parse pool gets the ones
+    the render workers leave (at least one).
+    """
+    if load_workers is not None:
+        return load_workers
+    return max(1, (os.cpu_count() or 1) - workers)
+
+def main(data_dir=DATA_DIR, output_dir=OUTPUT_DIR, renderer=RENDERER, workers=BATCH_WORKERS,
+         chunk_size=CHUNK_SIZE, cache_dir=CACHE_DIR, force=False, load_workers=LOAD_WORKERS):
+    """
+    Render every CSV file of data_dir to SVG and PNG in output_dir.
+
+    The build is incremental: a manifest in output_dir records the input hash,
+    parameters and code version behind every output, so inputs whose outputs are
+    up to date are not even loaded, and outputs of removed inputs are deleted.
+    With workers > 1 the files are rendered on a process pool; the output files are
+    byte-identical to those of a serial run with either renderer (matplotlib SVGs
+    are saved without a date, see save_plot_as_svg). Files are parsed ahead on load_workers
+    processes (see load_worker_count).
+
+    Returns:
+        list: One result dict per file, in input order ('fresh' for skipped files).
+    """
+    global _ax
+    csv_paths = find_csv_files(data_dir)
+
+    # Outputs of removed inputs go first, also when no input is left
+    manifest = BuildManifest(output_dir, render_code_version())
+    recorded = len(manifest)
+    for filename in manifest.prune(csv_paths):
+        print(f"Removed stale {filename}")
+
+    if not csv_paths:
+        if len(manifest) != recorded:
+            manifest.save()
+        print("No CSV files found in the specified directory.")
+        return []
+
+    print(f"Found {len(csv_paths)} CSV files.")
+
+    # Ensure the output directory exists
+    os.makedirs(output_dir, exist_ok=True)
+
+    params = {'renderer': renderer}
+    stale = {name: csv_path for name, csv_path in csv_paths.items()
+             if force or not manifest.is_fresh(name, csv_path, params)}
+    print(f"{len(csv_paths) - len(stale)} up to date, {len(stale)} to build.")
+    results = {name: file_result(name, 'fresh') for name in csv_paths if name not in stale}
+
+    # Load lazily; files are parsed in the background while earlier ones are plotted
+    load_workers = load_worker_count(workers, load_workers) if stale else None
+    with LazyDataset(stale, cache=ParseCache(cache_dir), workers=load_workers) as dataset:
+        if workers > 1:
+            run_parallel(dataset, output_dir, renderer, workers, chunk_size, results)
+        else:
+            # One figure is reused for every file and closed at the end
+            init_renderer(renderer)
+            try:
+                for chunk in iter_chunks(dataset, 1, results):
+                    for result in process_chunk(chunk, output_dir):
+                        results[result['name']] = result
+            finally:
+                if _ax is not None:
+                    plt.close(_ax.figure)
+                    _ax = None
+
+    for name, csv_path in stale.items():
+        if results[name]['status'] == 'ok':
+            manifest.record(name, csv_path, params, output_filenames(name))
+        else:
+            manifest.remove(name)  # Outputs of the previous version are stale
+    manifest.save()
+
+    results = [results[name] for name in csv_paths]
+    print_summary(results)
+    return results
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Render every CSV file of a directory to SVG and PNG.")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--renderer', choices=["direct", "matplotlib"], default=RENDERER)
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS,
+                        help="Processes rendering files (0 for one per CPU, 1 for serial)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Files per worker task")
+    parser.add_argument('--load-workers', type=int, default=LOAD_WORKERS,
+                        help="Processes parsing files ahead (default: the CPUs not used by --workers, at least 1)")
+    parser.add_argument('--force', action='store_true', help="Rebuild outputs that are up to date")
+    args = parser.parse_args()
+    main(args.data_dir, args.output_dir, args.renderer, args.workers or os.cpu_count(), args.chunk_size,
+         force=args.force, load_workers=args.load_workers)
@@ -1,7 +1,9 @@
 # src/data_loader/__init__.py
 
 from .data_loader import load_dataset
+from .curve_set import CurveSet
+from .svg_loader import read_svg
 
 # src/visualizer/__init__.py
 
-from .visualizer import plot_paths, save_plot_as_svg, save_plot_as_png
+from .visualizer import plot_paths, save_plot_as_svg, save_plot_as_png, save_paths_as_png, save_paths_as_svg
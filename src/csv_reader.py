@@ -0,0 +1,117 @@
+import io
+
+import numpy as np
+
+N_COLUMNS = 4  # path_id, segment_id, x, y
+CHUNK_BYTES = 1 << 26
+
+def parse_buffer(buffer, dtype=np.float64, first_line=1):
+    """
+    Parse a block of complete ``path_id,segment_id,x,y`` lines.
+
+    Numbers are converted by numpy's C tokenizer (``np.loadtxt``) straight into the
+    requested dtype, and the result is checked for the fixed four-column layout and
+    finite values. Blank lines are skipped; anything else that is not four finite
+    numbers, '#' comments included, raises instead of turning into NaN.
+
+    Parameters:
+        buffer (bytes): Complete lines of the CSV file.
+        dtype (np.dtype): Output floating point type (np.float64 or np.float32).
+        first_line (int): Line number of the first line in buffer, for error messages.
+
+    Returns:
+        np.ndarray: Array of shape (n, 4).
+
+    Raises:
+        ValueError: If a line does not have four fields or a field is not a finite number.
+    """
+    if not buffer.strip():
+        return np.empty((0, N_COLUMNS), dtype=dtype)
+
+    try:
+        values = np.loadtxt(io.BytesIO(buffer), delimiter=',', comments=None, dtype=dtype, ndmin=2)
+    except ValueError:
+        _raise_malformed(buffer, first_line)
+        raise
+
+    if values.shape[1] != N_COLUMNS or not np.all(np.isfinite(values)):
+        _raise_malformed(buffer, first_line)
+    return values
+
+def _raise_malformed(buffer, first_line):
+    """
+    Find the first malformed line of a block and raise a ValueError describing it.
+
+    This only runs once a block has failed to parse, so it can afford a Python loop.
+    """
+    for line, text in enumerate(buffer.decode(errors='replace').split('\n')):
+        if not text.rstrip('\r'):  # Empty lines are skipped by the tokenizer
+            continue
+        text = text.strip()
+        fields = text.split(',')
+        if len(fields) != N_COLUMNS:
+            raise ValueError(f"line {first_line + line}: expected {N_COLUMNS} comma-separated "
+                             f"fields, got {len(fields)}: {text!r}")
+        for field, token in enumerate(fields):
+            try:
+                ok = np.isfinite(float(token))
+            except ValueError:
+                ok = False
+            if not ok:
+                raise ValueError(f"line {first_line + line}: field {field + 1} "
+                                 f"is not a finite number: {text!r}")
+
+def iter_row_blocks(csv_path, dtype=np.float64, chunk_bytes=CHUNK_BYTES):
+    """
+    Parse a CSV file block by block, each block ending on a line boundary.
+
+    Parameters:
+        csv_path (str): The path to the CSV file.
+        dtype (np.dtype): Output floating point type.
+        chunk_bytes (int): Approximate number of bytes read per block.
+
+    Yields:
+        np.ndarray: Arrays of shape (n, 4), in file order.
+    """
+    first_line = 1
+    carry = b''
+    with open(csv_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            chunk = carry + chunk
+            cut = chunk.rfind(b'\n') + 1
+            if cut == 0:  # No complete line yet
+                carry = chunk
+                continue
+            carry = chunk[cut:]
+            block = chunk[:cut]
+            yield parse_buffer(block, dtype, first_line)
+            first_line += block.count(b'\n')
+    if carry:
+        yield parse_buffer(carry, dtype, first_line)
+
+def read_rows(csv_path, dtype=np.float64, chunk_bytes=CHUNK_BYTES):
+    """
+    Read a ``path_id,segment_id,x,y`` CSV file into an (n, 4) array.
+
+    This replaces ``np.genfromtxt`` for the fixed four-column format: it is several
+    times faster, optionally returns float32, and raises on malformed rows instead of
+    filling them with NaN. Memory overhead beyond the result is bounded by chunk_bytes.
+
+    Parameters:
+        csv_path (str): The path to the CSV file.
+        dtype (np.dtype): Output floating point type (np.float64 or np.float32).
+        chunk_bytes (int): Approximate number of bytes parsed at a time.
+
+    Returns:
+        np.ndarray: Array of shape (n, 4).
+
+    Raises:
+        ValueError: If the file contains a malformed row.
+    """
+    blocks = [block for block in iter_row_blocks(csv_path, dtype, chunk_bytes) if len(block)]
+    if not blocks:
+        return np.empty((0, N_COLUMNS), dtype=dtype)
+    return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
@@ -1,4 +1,4 @@
-# src/__init__.py
+# src/curve_completion/__init__.py
 
-from .data_loader import load_dataset
-from .visualizer import plot_paths, save_plot_as_svg, save_plot_as_png
+from .gap_filler import fill_gaps
+from .occlusion_handler import handle_occlusions
@@ -49,18 +49,24 @@ def fill_gaps(curves, threshold=10, max_gaps=None):
     """
     Fill gaps in a set of curves.
     
-    :param curves: List of curves, where each curve is a list of numpy arrays
+    :param curves: List (or stream, e.g. from iter_csv) of curves, where each curve is a list of numpy arrays
     :param threshold: Maximum distance to consider as a gap
     :param max_gaps: Maximum number of gaps to fill (None for all gaps)
     :return: Updated list of curves with gaps filled
     """
+    curves = list(curves)  # Gaps are found between every pair of curves, so a stream is collected once
     gaps = find_gaps(curves, threshold)
     if max_gaps is not None:
         gaps = gaps[:max_gaps]
     
     new_curves = [curve.copy() for curve in curves]
+    merged = set()
     
     for i, p1, j, p2, _ in gaps:
+        # Endpoint indices refer to the original curves, so each curve is merged at most once
+        if i in merged or j in merged:
+            continue
+        merged.update((i, j))
         curve1 = new_curves[i]
         curve2 = new_curves[j]
         
@@ -1,27 +1,23 @@
 import numpy as np
-from scipy.optimize import minimize
 from sklearn.cluster import DBSCAN
 import matplotlib.pyplot as plt
+from ..regularization.circle_fit import fit_circles
+from ..regularization.min_rectangle import fit_min_area_rectangle
+
+# Gauss-Newton steps after the algebraic circle fit
+REFINE_ITERATIONS = 10
 
 def fit_circle(points):
     """
     Fit a circle to a set of 2D points using least squares optimization.
     
+    The algebraic Taubin fit is refined by a few Gauss-Newton steps on the
+    geometric distances.
+    
     :param points: numpy array of shape (n, 2) containing the points
     :return: tuple (center_x, center_y, radius)
     """
-    def calc_R(xc, yc):
-        return np.sqrt((points[:,0]-xc)**2 + (points[:,1]-yc)**2)
-
-    def f(c):
-        Ri = calc_R(*c)
-        return Ri - Ri.mean()
-
-    center_estimate = np.mean(points, axis=0)
-    center, _ = minimize(lambda c: np.sum(f(c)**2), center_estimate).x
-
-    radius = np.mean(calc_R(*center))
-    return (*center, radius)
+    return tuple(fit_circles(points, iterations=REFINE_ITERATIONS)[0])
 
 def complete_circle(points, num_points=100):
     """
@@ -43,28 +39,13 @@ def fit_rectangle(points):
     """
     Fit a rectangle to a set of 2D points.
     
+    The rectangle is the minimum-area rectangle around the points, found by rotating
+    calipers on their convex hull; width runs along the direction angle.
+    
     :param points: numpy array of shape (n, 2) containing the points
     :return: tuple (center_x, center_y, width, height, angle)
     """
-    # Compute the oriented bounding box
-    mean = np.mean(points, axis=0)
-    centered = points - mean
-    cov = np.cov(centered.T)
-    eigvals, eigvecs = np.linalg.eig(cov)
-    angle = np.arctan2(eigvecs[1, 0], eigvecs[0, 0])
-
-    # Rotate points
-    rot = np.array([[np.cos(angle), -np.sin(angle)],
-                    [np.sin(angle), np.cos(angle)]])
-    rotated = centered.dot(rot)
-
-    # Get axis-aligned bounding box
-    min_coords = np.min(rotated, axis=0)
-    max_coords = np.max(rotated, axis=0)
-    width = max_coords[0] - min_coords[0]
-    height = max_coords[1] - min_coords[1]
-
-    return (*mean, width, height, angle)
+    return fit_min_area_rectangle(points)[0]
 
 def complete_rectangle(points, num_points=100):
     """
@@ -88,7 +69,7 @@ def complete_rectangle(points, num_points=100):
     # Rotate and translate
     rot = np.array([[np.cos(angle), -np.sin(angle)],
                     [np.sin(angle), np.cos(angle)]])
-    completed_rectangle = rectangle.dot(rot) + [center_x, center_y]
+    completed_rectangle = rectangle.dot(rot.T) + [center_x, center_y]
     
     return completed_rectangle
 
@@ -99,12 +80,10 @@ def identify_shape(points):
     :param points: numpy array of shape (n, 2) containing the points
     :return: string 'circle' or 'rectangle'
     """
-    _, _, radius = fit_circle(points)
-    center_x, center_y, width, height, _ = fit_rectangle(points)
+    center_x, center_y, radius = fit_circle(points)
+    _, rectangle_error = fit_min_area_rectangle(points)
     
-    circle_error = np.mean(np.abs(np.sqrt((points[:,0]-center_x)**2 + (points[:,1]-center_y)**2) - radius))
-    rectangle_error = np.mean(np.minimum(np.abs(points[:,0] - (center_x - width/2)), np.abs(points[:,0] - (center_x + width/2))) +
-                              np.minimum(np.abs(points[:,1] - (center_y - height/2)), np.abs(points[:,1] - (center_y + height/2))))
+    circle_error = np.sqrt(np.mean((np.sqrt((points[:,0]-center_x)**2 + (points[:,1]-center_y)**2) - radius)**2))
     
     return 'circle' if circle_error < rectangle_error else 'rectangle'
 
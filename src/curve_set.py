@@ -0,0 +1,272 @@
+import numpy as np
+
+class CurveSet:
+    """
+    Columnar container for a drawing: every point of every segment in one flat array.
+
+    Points of segment ``s`` are ``points[segment_offsets[s]:segment_offsets[s + 1]]`` and
+    the segments of path ``p`` are ``segment_offsets[path_offsets[p]:path_offsets[p + 1]]``.
+    This is the same information as the nested ``[[XY, ...], ...]`` lists returned by
+    ``read_csv``, but batch kernels can run over ``points`` once for the whole file and
+    reduce per segment with ``segment_reduce`` instead of looping over small arrays.
+
+    Parameters:
+        points (np.ndarray): Array of shape (n, 2) with the x, y coordinates of all points.
+        segment_offsets (np.ndarray): Array of shape (n_segments + 1,) of point offsets.
+        path_offsets (np.ndarray): Array of shape (n_paths + 1,) of segment offsets.
+    """
+
+    def __init__(self, points, segment_offsets, path_offsets):
+        self.points = np.asarray(points).reshape(-1, 2)
+        self.segment_offsets = np.asarray(segment_offsets, dtype=np.intp)
+        self.path_offsets = np.asarray(path_offsets, dtype=np.intp)
+
+        if self.segment_offsets[0] != 0 or self.segment_offsets[-1] != len(self.points):
+            raise ValueError("segment_offsets must start at 0 and end at the number of points.")
+        if self.path_offsets[0] != 0 or self.path_offsets[-1] != self.n_segments:
+            raise ValueError("path_offsets must start at 0 and end at the number of segments.")
+
+    @classmethod
+    def from_paths(cls, paths_XYs, dtype=np.float64):
+        """
+        Build a CurveSet from the nested list structure returned by ``read_csv``.
+
+        Parameters:
+            paths_XYs (list): List of paths, where each path is a list of (m, 2) point arrays.
+            dtype (np.dtype): Floating point type of the flat coordinate array.
+
+        Returns:
+            CurveSet: The columnar form of paths_XYs (the points are copied once).
+        """
+        segments = []
+        path_lengths = []
+        for path in paths_XYs:
+            path_lengths.append(len(path))
+            segments.extend(np.asarray(XY, dtype=dtype).reshape(-1, 2) for XY in path)
+
+        segment_lengths = [len(XY) for XY in segments]
+        points = np.concatenate(segments) if segments else np.empty((0, 2), dtype=dtype)
+        return cls(points, _offsets(segment_lengths), _offsets(path_lengths))
+
+    @classmethod
+    def from_rows(cls, np_path_XYs, copy=True):
+        """
+        Build a CurveSet from a parsed ``path_id, segment_id, x, y`` array.
+
+        Rows are ordered with a single stable lexsort on (path_id, segment_id) and split
+        where either id changes, so points keep their original order within a segment.
+
+        Parameters:
+            np_path_XYs (np.ndarray): Array of shape (n, 4) with path_id, segment_id, x, y columns.
+            copy (bool): If False and the rows are already grouped, ``points`` is a (strided)
+                view of the input instead of a contiguous copy.
+
+        Returns:
+            CurveSet: The grouped points.
+        """
+        np_path_XYs = np.atleast_2d(np_path_XYs)
+        if np_path_XYs.size == 0:
+            return cls(np.empty((0, 2)), [0], [0])
+
+        path_ids = np_path_XYs[:, 0]
+        segment_ids = np_path_XYs[:, 1]
+
+        # Skip the gather when the rows are already grouped in order (the common case
+        # for files we write ourselves).
+        if np.any(path_ids[1:] < path_ids[:-1]) or \
+           np.any((path_ids[1:] == path_ids[:-1]) & (segment_ids[1:] < segment_ids[:-1])):
+            order = np.lexsort((segment_ids, path_ids))
+            np_path_XYs = np_path_XYs[order]
+            path_ids = np_path_XYs[:, 0]
+            segment_ids = np_path_XYs[:, 1]
+
+        new_path = path_ids[1:] != path_ids[:-1]
+        new_segment = new_path | (segment_ids[1:] != segment_ids[:-1])
+        segment_starts = np.flatnonzero(new_segment) + 1
+        path_starts = np.flatnonzero(new_path) + 1
+
+        segment_offsets = np.concatenate(([0], segment_starts, [len(np_path_XYs)]))
+        # Number of segments that precede each path boundary
+        path_offsets = np.concatenate(([0], np.searchsorted(segment_starts, path_starts) + 1,
+                                       [len(segment_offsets) - 1]))
+
+        points = np_path_XYs[:, 2:]
+        if copy:
+            points = np.ascontiguousarray(points)
+        return cls(points, segment_offsets, path_offsets)
+
+    @classmethod
+    def from_segments(cls, points, segment_offsets=None):
+        """
+        Build a single-path CurveSet from a flat point array.
+
+        Parameters:
+            points (np.ndarray): Array of shape (n, 2) with the points of all segments.
+            segment_offsets (np.ndarray): Point offsets of the segments; None for a single segment.
+
+        Returns:
+            CurveSet: One path holding the segments (points is not copied when already float).
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if segment_offsets is None:
+            segment_offsets = [0, len(points)]
+        return cls(points, segment_offsets, [0, len(segment_offsets) - 1])
+
+    @property
+    def n_points(self):
+        return len(self.points)
+
+    @property
+    def n_segments(self):
+        return len(self.segment_offsets) - 1
+
+    @property
+    def n_paths(self):
+        return len(self.path_offsets) - 1
+
+    def __len__(self):
+        return self.n_paths
+
+    def __repr__(self):
+        return f"CurveSet(paths={self.n_paths}, segments={self.n_segments}, points={self.n_points})"
+
+    @property
+    def segment_lengths(self):
+        """Number of points in each segment."""
+        return np.diff(self.segment_offsets)
+
+    @property
+    def segment_path_index(self):
+        """Index of the path each segment belongs to."""
+        return np.repeat(np.arange(self.n_paths), np.diff(self.path_offsets))
+
+    @property
+    def point_segment_index(self):
+        """Index of the segment each point belongs to."""
+        return np.repeat(np.arange(self.n_segments), self.segment_lengths)
+
+    def segment(self, index):
+        """
+        Return the points of one segment as a zero-copy view.
+
+        Parameters:
+            index (int): Global segment index (0 <= index < n_segments).
+
+        Returns:
+            np.ndarray: View of shape (m, 2) into ``points``.
+        """
+        return self.points[self.segment_offsets[index]:self.segment_offsets[index + 1]]
+
+    def path(self, index):
+        """
+        Return the segments of one path as a list of zero-copy views.
+
+        Parameters:
+            index (int): Path index (0 <= index < n_paths).
+
+        Returns:
+            list: List of (m, 2) views into ``points``.
+        """
+        start, end = self.path_offsets[index], self.path_offsets[index + 1]
+        return np.split(self.points[self.segment_offsets[start]:self.segment_offsets[end]],
+                        self.segment_offsets[start + 1:end] - self.segment_offsets[start])
+
+    def iter_segments(self):
+        """
+        Iterate over all segments in order as zero-copy views.
+        """
+        for start, end in zip(self.segment_offsets[:-1], self.segment_offsets[1:]):
+            yield self.points[start:end]
+
+    def to_paths(self):
+        """
+        Convert back to the nested ``[[XY, ...], ...]`` list form used by the detectors.
+
+        Returns:
+            list: A nested list where each element is a list of (m, 2) views into ``points``.
+        """
+        segments = np.split(self.points, self.segment_offsets[1:-1])
+        return [segments[start:end] for start, end in zip(self.path_offsets[:-1], self.path_offsets[1:])]
+
+    def to_rows(self):
+        """
+        Convert to the ``path_id, segment_id, x, y`` row layout of the CSV files.
+
+        Returns:
+            np.ndarray: Array of shape (n_points, 4); segment ids restart at 0 in every path.
+        """
+        segment_path = self.segment_path_index
+        local_segment = np.arange(self.n_segments) - self.path_offsets[segment_path]
+        lengths = self.segment_lengths
+        return np.column_stack([np.repeat(segment_path, lengths), np.repeat(local_segment, lengths),
+                                self.points]).astype(np.result_type(self.points.dtype, np.float32))
+
+    def segment_reduce(self, values, ufunc=np.add, empty=0):
+        """
+        Reduce a per-point array to one value per segment.
+
+        Unlike a bare ``ufunc.reduceat``, empty segments get ``empty`` instead of the
+        value of the next point.
+
+        Parameters:
+            values (np.ndarray): Array whose first axis has length n_points.
+            ufunc (np.ufunc): Binary ufunc to reduce with (np.add, np.maximum, ...).
+            empty: Value stored for segments without points.
+
+        Returns:
+            np.ndarray: Array whose first axis has length n_segments.
+        """
+        values = np.asarray(values)
+        lengths = self.segment_lengths
+        out = np.full((self.n_segments,) + values.shape[1:], empty,
+                      dtype=np.result_type(values.dtype, np.min_scalar_type(empty)))
+        nonempty = lengths > 0
+        if np.any(nonempty):
+            out[nonempty] = ufunc.reduceat(values, self.segment_offsets[:-1][nonempty], axis=0)
+        return out
+
+
+def iter_segment_batches(paths_XYs, batch_size, min_points=0):
+    """
+    Group the segments of a stream of paths into CurveSets of at most batch_size segments.
+
+    Batch kernels can then run over a stream (e.g. from ``iter_csv``) with bounded memory.
+    A CurveSet is passed through as a single batch.
+
+    Parameters:
+        paths_XYs (iterable or CurveSet): Paths, where each path is a list of (m, 2) point arrays.
+        batch_size (int): Maximum number of segments per batch.
+        min_points (int): Segments with fewer points are skipped.
+
+    Yields:
+        CurveSet: A single-path CurveSet per batch of segments, in input order.
+    """
+    if isinstance(paths_XYs, CurveSet):
+        lengths = paths_XYs.segment_lengths
+        keep = lengths >= min_points
+        if keep.all():
+            yield CurveSet.from_segments(paths_XYs.points, paths_XYs.segment_offsets)
+        else:
+            yield CurveSet.from_segments(paths_XYs.points[np.repeat(keep, lengths)], _offsets(lengths[keep]))
+        return
+
+    batch = []
+    for path in paths_XYs:
+        for XY in path:
+            if len(XY) < min_points:
+                continue
+            batch.append(XY)
+            if len(batch) == batch_size:
+                yield CurveSet.from_paths([batch])
+                batch = []
+    if batch:
+        yield CurveSet.from_paths([batch])
+
+
+def _offsets(lengths):
+    """
+    Turn a sequence of lengths into an offsets array starting at 0.
+    """
+    offsets = np.zeros(len(lengths) + 1, dtype=np.intp)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
@@ -1,58 +1,321 @@
 import numpy as np
 import os
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 
-def read_csv(csv_path):
+from .csv_reader import CHUNK_BYTES, iter_row_blocks, read_rows
+from .curve_set import CurveSet
+from .svg_loader import parse_svg_rows
+
+def group_paths(np_path_XYs):
+    """
+    Split a parsed ``path_id, segment_id, x, y`` array into nested paths.
+    
+    The rows are ordered once with a stable lexsort on (path_id, segment_id) and
+    split on the boundaries where either id changes, so the cost is a single sort
+    instead of one boolean mask per path and per segment. Points keep their
+    original order within each segment, and every returned XY array is a view
+    into the (sorted) input rather than a copy.
+    
+    Parameters:
+        np_path_XYs (np.ndarray): Array of shape (n, 4) with path_id, segment_id, x, y columns.
+    
+    Returns:
+        list: A nested list where each element is a list of (m, 2) XY arrays (paths).
+    """
+    return CurveSet.from_rows(np_path_XYs, copy=False).to_paths()
+
+def parse_rows(csv_path, dtype=np.float64):
+    """
+    Parse a CSV file into a raw ``path_id, segment_id, x, y`` array.
+    
+    ``.svg`` files are read with svg_loader and converted to the same row layout, so
+    they go through the parse cache and the loaders like the CSV files do.
+    
+    Parameters:
+        csv_path (str): The path to the CSV (or SVG) file.
+        dtype (np.dtype): Floating point type of the result (np.float64 or np.float32).
+    
+    Returns:
+        np.ndarray: The parsed rows, of shape (n, 4).
+    
+    Raises:
+        ValueError: If a row is malformed (see csv_reader.read_rows) or the SVG is invalid.
+    """
+    if os.path.splitext(csv_path)[1].lower() == '.svg':
+        return parse_svg_rows(csv_path).astype(dtype, copy=False)
+    return read_rows(csv_path, dtype=dtype)
+
+def _read_rows(csv_path, cache=None, dtype=np.float64):
+    """
+    Parse a CSV file, going through the parse cache when one is given.
+    """
+    if cache is None:
+        return parse_rows(csv_path, dtype)
+    return cache.load(csv_path, parse_rows).astype(dtype, copy=False)
+
+def read_csv(csv_path, cache=None, dtype=np.float64):
     """
     Read a CSV file and parse the data into a nested list structure.
     
     Parameters:
         csv_path (str): The path to the CSV file.
+        cache (ParseCache): Optional parse cache; on a hit the points are views of a memory map.
+        dtype (np.dtype): Floating point type of the points (np.float64 or np.float32).
     
     Returns:
         list: A nested list where each element is a list of points (paths).
+    
+    Raises:
+        ValueError: If a row is malformed.
     """
     try:
-        np_path_XYs = np.genfromtxt(csv_path, delimiter=',')
+        np_path_XYs = _read_rows(csv_path, cache, dtype)
     except IOError as e:
         print(f"Error reading {csv_path}: {e}")
         return []
     
-    path_XYs = []
-    if np_path_XYs.size == 0:
-        return path_XYs  # Return an empty list if the file is empty or unreadable
+    # Returns an empty list if the file is empty or unreadable
+    return group_paths(np_path_XYs)
+
+def read_curveset(csv_path, cache=None, dtype=np.float64):
+    """
+    Read a CSV file into a columnar CurveSet instead of nested lists.
+    
+    Parameters:
+        csv_path (str): The path to the CSV file.
+        cache (ParseCache): Optional parse cache to read through.
+        dtype (np.dtype): Floating point type of the points (np.float64 or np.float32).
     
-    for i in np.unique(np_path_XYs[:, 0]):
-        npXYs = np_path_XYs[np_path_XYs[:, 0] == i][:, 1:]
-        XYs = []
-        for j in np.unique(npXYs[:, 0]):
-            XY = npXYs[npXYs[:, 0] == j][:, 1:]
-            XYs.append(XY)
-        path_XYs.append(XYs)
+    Returns:
+        CurveSet: The parsed curves (empty if the file is empty or unreadable).
     
-    return path_XYs
+    Raises:
+        ValueError: If a row is malformed.
+    """
+    try:
+        np_path_XYs = _read_rows(csv_path, cache, dtype)
+    except IOError as e:
+        print(f"Error reading {csv_path}: {e}")
+        return CurveSet.from_rows(np.empty((0, 4)))
+    
+    return CurveSet.from_rows(np_path_XYs)
 
-def load_dataset(data_dir):
+def iter_csv(csv_path, by='path', dtype=np.float64, chunk_bytes=CHUNK_BYTES):
+    """
+    Stream a CSV file path by path (or segment by segment) without loading it whole.
+    
+    The file is parsed in blocks of about chunk_bytes, and a path is yielded as soon as
+    a row with a different id follows it, so memory stays bounded by the chunk size plus
+    the largest path. This relies on the rows of a path (or segment) being contiguous,
+    as they are in the files we produce; a path id that reappears after its path was
+    yielded raises a ValueError. Paths come out in file order, not sorted by id.
+    
+    The yielded paths have the same form as the elements of ``read_csv``'s result, so
+    the stream can be passed directly to the regularization detectors and ``fill_gaps``.
+    
+    Parameters:
+        csv_path (str): The path to the CSV file.
+        by (str): 'path' to yield lists of (m, 2) XY arrays, 'segment' to yield single XY arrays.
+        dtype (np.dtype): Floating point type of the points (np.float64 or np.float32).
+        chunk_bytes (int): Approximate number of bytes parsed at a time.
+    
+    Yields:
+        list or np.ndarray: One path (list of XY arrays) or one segment (XY array) at a time.
+    
+    Raises:
+        ValueError: If a row is malformed or the rows of a path are not contiguous.
+    """
+    if by not in ('path', 'segment'):
+        raise ValueError(f"by must be 'path' or 'segment', got {by!r}")
+    n_keys = 1 if by == 'path' else 2
+    
+    finished = set()
+    pending = []  # Pieces of the group that may continue in the next block
+    
+    def emit(pieces):
+        rows = pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+        key = tuple(rows[0, :n_keys].tolist())
+        if key in finished:
+            raise ValueError(f"{by} {key} of {csv_path} is not contiguous; use read_csv instead")
+        finished.add(key)
+        return group_paths(rows)[0] if by == 'path' else rows[:, 2:]
+    
+    for block in iter_row_blocks(csv_path, dtype, chunk_bytes):
+        if not len(block):
+            continue
+        keys = block[:, :n_keys]
+        if pending and np.any(pending[-1][-1, :n_keys] != keys[0]):
+            yield emit(pending)
+            pending = []
+        
+        change = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+        starts = np.concatenate(([0], change))
+        if len(starts) > 1:
+            pending.append(block[:starts[1]])
+            yield emit(pending)
+            pending = []
+            for start, end in zip(starts[1:-1], starts[2:]):
+                yield emit([block[start:end]])
+        pending.append(block[starts[-1]:])
+    
+    if pending:
+        yield emit(pending)
+
+class LazyDataset(Mapping):
+    """
+    Read-only mapping from file name to parsed paths that parses on access.
+    
+    With ``workers`` set, the files are parsed ahead of the caller on a process pool,
+    in iteration order: at most ``window`` files (two per worker by default) are in
+    flight, and a new one is submitted whenever a parsed file is taken, so parsing
+    overlaps with whatever the caller does with the files it already has while memory
+    stays bounded by the window. Files that are already in the parse cache are not
+    submitted. Workers only return the raw rows; grouping and cache writes happen in
+    this process, so the cache index has a single writer.
+    
+    Parsed files are not kept: every access returns freshly grouped paths (read from
+    the parse cache when there is one), so iterating over a large directory holds only
+    the files in flight. Keep the values you need, or use ``load_dataset``.
+    
+    Unlike the dict returned by ``load_dataset``, the mapping lists every CSV file,
+    including empty ones (which map to an empty list). Parse errors are raised when
+    the offending file is accessed. Call ``close`` (or use a ``with`` block) to shut
+    down the pool and flush the parse cache.
+    
+    Parameters:
+        csv_paths (dict): Mapping from name to CSV path, in iteration order.
+        cache (ParseCache): Optional parse cache.
+        workers (int): Number of worker processes; None or 0 parses lazily in this process.
+        window (int): Largest number of files parsed ahead; defaults to 2 * workers.
+    """
+    
+    def __init__(self, csv_paths, cache=None, workers=None, window=None):
+        self.csv_paths = dict(csv_paths)
+        self.cache = cache
+        self.window = window or 2 * (workers or 0)
+        self._futures = {}
+        self._ahead = iter(self.csv_paths)  # Files not yet considered for parsing ahead
+        self._taken = set()  # Files accessed before they were parsed ahead
+        self._executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+        self._refill()
+    
+    def _refill(self):
+        """
+        Submit the next files in iteration order until the window is full.
+        """
+        if self._executor is None:
+            return
+        while len(self._futures) < self.window:
+            name = next(self._ahead, None)
+            if name is None:
+                break
+            csv_path = self.csv_paths[name]
+            if name in self._taken or (self.cache is not None and self.cache.contains(csv_path, parse_rows)):
+                continue
+            self._futures[name] = self._executor.submit(parse_rows, csv_path)
+    
+    def __getitem__(self, name):
+        csv_path = self.csv_paths[name]
+        future = self._futures.pop(name, None)
+        if future is None and self._executor is not None:
+            self._taken.add(name)
+        try:
+            if future is None:
+                np_path_XYs = _read_rows(csv_path, self.cache)
+            else:
+                np_path_XYs = future.result()
+                if self.cache is not None:
+                    self.cache.put(csv_path, np_path_XYs, parse_rows)
+        except IOError as e:
+            print(f"Error reading {csv_path}: {e}")
+            np_path_XYs = np.empty((0, 4))
+        finally:
+            self._refill()
+        return group_paths(np_path_XYs)
+    
+    def __iter__(self):
+        return iter(self.csv_paths)
+    
+    def __len__(self):
+        return len(self.csv_paths)
+    
+    def close(self):
+        """
+        Shut down the worker pool, cancelling files that were never accessed, and flush the parse cache.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+            self._futures = {}
+        if self.cache is not None:
+            self.cache.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def find_csv_files(data_dir, extensions=('.csv',)):
+    """
+    List the input files of a directory.
+    
+    Parameters:
+        data_dir (str): The directory containing the CSV files.
+        extensions (tuple): File extensions to pick up, e.g. ('.csv', '.svg').
+    
+    Returns:
+        dict: Mapping from filename (without extension) to file path, in directory order.
+            When two files share a name, the one whose extension comes first in extensions wins.
+    """
+    extensions = [extension.lower() for extension in extensions]
+    csv_paths = {}
+    for filename in os.listdir(data_dir):
+        name, ext = os.path.splitext(filename)
+        ext = ext.lower()
+        if ext not in extensions:
+            continue
+        if name in csv_paths:
+            existing = os.path.splitext(csv_paths[name])[1].lower()
+            if extensions.index(existing) <= extensions.index(ext):
+                continue
+        csv_paths[name] = os.path.join(data_dir, filename)
+    return csv_paths
+
+def load_dataset(data_dir, cache=None, lazy=False, workers=None, extensions=('.csv',)):
     """
     Load all CSV files from a specified directory.
     
     Parameters:
         data_dir (str): The directory containing the CSV files.
+        cache (ParseCache): Optional parse cache, so unchanged files are not re-parsed.
+        lazy (bool): Return a LazyDataset that parses each file on first access.
+        workers (int): Number of worker processes used to parse files concurrently.
+        extensions (tuple): File extensions to load; add '.svg' to read SVG drawings directly.
     
     Returns:
-        dict: A dictionary where keys are filenames (without extension) and values are the parsed CSV data.
+        dict: A dictionary where keys are filenames (without extension) and values are the parsed CSV data
+            (a LazyDataset if lazy is True).
     """
     dataset = {}
     
     if not os.path.isdir(data_dir):
         print(f"Directory {data_dir} does not exist.")
-        return dataset
+        return LazyDataset({}) if lazy else dataset
     
-    for filename in os.listdir(data_dir):
-        name, ext = os.path.splitext(filename)
-        if ext.lower() == '.csv':
-            csv_path = os.path.join(data_dir, filename)
+    files = LazyDataset(find_csv_files(data_dir, extensions), cache=cache, workers=workers)
+    if lazy:
+        return files
+    
+    with files:
+        for name, csv_path in files.csv_paths.items():
             print(f"Loading {csv_path}")
-            csv_data = read_csv(csv_path)
+            try:
+                csv_data = files[name]
+            except ValueError as e:
+                print(f"Error parsing {csv_path}: {e}")
+                continue
             if csv_data:
                 dataset[name] = csv_data
             else:
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+
+from .parse_cache import file_digest
+
+MANIFEST_FILENAME = ".manifest.json"
+
+def params_digest(params):
+    """
+    Hash a JSON-serializable dict of build parameters, independent of key order.
+    """
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+def code_version(source_paths):
+    """
+    Hash the source files an output depends on, so editing any of them rebuilds it.
+
+    Parameters:
+        source_paths (list): Paths of the source files (e.g. module ``__file__`` values).
+
+    Returns:
+        str: Hex digest over the contents of all files, in the given order.
+    """
+    digest = hashlib.sha256()
+    for path in source_paths:
+        digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+class BuildManifest:
+    """
+    Record of which input, parameters and code version produced each output file.
+
+    Every entry maps an input name to its source file (size, mtime and content hash),
+    the hash of the build parameters, the code version and the output files it
+    produced. An input is fresh, and can be skipped, when all of these still match
+    and the outputs still exist. As in ``ParseCache``, a changed mtime with the same
+    size falls back to comparing the content hash, so touching a file does not
+    rebuild it.
+
+    Changes are kept in memory until ``save``, which replaces the manifest file
+    atomically, so an interrupted build never leaves a corrupt manifest.
+
+    Parameters:
+        output_dir (str): Directory holding the outputs and the manifest file.
+        code_version (str): Version of the code producing the outputs (see ``code_version``).
+    """
+
+    def __init__(self, output_dir, code_version=''):
+        self.output_dir = output_dir
+        self.code_version = code_version
+        self._path = os.path.join(output_dir, MANIFEST_FILENAME)
+        try:
+            with open(self._path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_fresh(self, name, input_path, params):
+        """
+        Check whether the recorded outputs of an input are up to date.
+
+        Parameters:
+            name (str): The input name (filename without extension).
+            input_path (str): The input file.
+            params (dict): The build parameters.
+
+        Returns:
+            bool: True if the input, parameters and code version are unchanged and all
+            recorded outputs exist.
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        if entry['params_sha256'] != params_digest(params) or entry['code_version'] != self.code_version:
+            return False
+        if entry['input'] != os.path.abspath(input_path):
+            return False
+        if not all(os.path.exists(os.path.join(self.output_dir, output)) for output in entry['outputs']):
+            return False
+
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return False
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime_ns != entry['mtime_ns']:
+            if file_digest(input_path) != entry['sha256']:
+                return False
+            entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+
+    def record(self, name, input_path, params, outputs):
+        """
+        Record that outputs were built from an input.
+
+        Parameters:
+            name (str): The input name.
+            input_path (str): The input file.
+            params (dict): The build parameters.
+            outputs (list): Output filenames, relative to output_dir.
+        """
+        stat = os.stat(input_path)
+        self._entries[name] = {
+            'input': os.path.abspath(input_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_digest(input_path),
+            'params_sha256': params_digest(params),
+            'code_version': self.code_version,
+            'outputs': list(outputs),
+        }
+
+    def remove(self, name):
+        """
+        Delete the recorded outputs of an input and forget it.
+
+        Parameters:
+            name (str): The input name.
+
+        Returns:
+            list: The output filenames that were deleted.
+        """
+        entry = self._entries.pop(name, None)
+        removed = []
+        for output in entry['outputs'] if entry else ():
+            try:
+                os.remove(os.path.join(self.output_dir, output))
+                removed.append(output)
+            except OSError:
+                pass
+        return removed
+
+    def prune(self, names):
+        """
+        Delete the outputs of every recorded input that is not in names.
+
+        Parameters:
+            names (iterable): Names of the current inputs.
+
+        Returns:
+            list: The output filenames that were deleted.
+        """
+        names = set(names)
+        removed = []
+        for name in [name for name in self._entries if name not in names]:
+            removed.extend(self.remove(name))
+        return removed
+
+    def save(self):
+        """
+        Write the manifest file atomically.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = f"{self._path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self._path)
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+INDEX_FILENAME = "index.json"
+# Version of the parsed arrays; bump it when a released parser changes what it returns
+# (new reader, new input format, different handling of malformed rows), so entries
+# written by the old parser are not served any more
+PARSER_VERSION = 1
+
+def parser_id(parse):
+    """
+    Qualified name of a parse function, recorded with every cache entry.
+    """
+    return f"{getattr(parse, '__module__', '')}.{getattr(parse, '__qualname__', repr(parse))}"
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 digest of a file's contents.
+
+    Parameters:
+        path (str): The file to hash.
+        chunk_size (int): Number of bytes read per call.
+
+    Returns:
+        str: Hex digest of the contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ParseCache:
+    """
+    On-disk cache of parsed CSV arrays, stored as memory-mappable ``.npy`` files.
+
+    Entries are keyed by the absolute path of the source file and validated against
+    the parser that wrote them (PARSER_VERSION and the parse function) and the
+    file's size, modification time and content hash. When size and mtime are unchanged
+    the entry is used directly (set ``verify=True`` to always re-hash the file); when
+    they changed, the content hash decides whether the entry is still valid, so a
+    file that was only touched is not re-parsed. Hits are returned as read-only
+    memory maps, so a rerun over an unchanged corpus never tokenizes text.
+
+    The cache is bounded by ``max_bytes``; the least recently used entries are
+    evicted first. Lookups only update the access times in memory; they are written
+    to the index with the next ``put``, ``invalidate`` or ``clear``, or by ``flush``
+    (also called when the cache is used as a context manager), so reading N cached
+    files does not rewrite the index N times.
+
+    Parameters:
+        cache_dir (str): Directory holding the cached arrays and the index.
+        max_bytes (int): Upper bound on the total size of cached arrays.
+        verify (bool): Re-hash the source file on every lookup.
+    """
+
+    def __init__(self, cache_dir, max_bytes=1 << 30, verify=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.verify = verify
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        self._index = self._read_index()
+        self._dirty = False
+
+    def _read_index(self):
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        self._dirty = False
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    @staticmethod
+    def _key(csv_path):
+        return hashlib.sha256(os.path.abspath(csv_path).encode()).hexdigest()[:32]
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _fresh_entry(self, key, csv_path, parse):
+        """
+        Index entry of a file if it is still valid for the file and parser, else None.
+        """
+        entry = self._index.get(key)
+        if entry is None or entry.get('parser_version') != PARSER_VERSION:
+            return None
+        if parse is not None and entry.get('parser') != parser_id(parse):
+            return None
+
+        try:
+            stat = os.stat(csv_path)
+        except OSError:
+            return None
+
+        if stat.st_size != entry['size']:
+            return None
+        if self.verify or stat.st_mtime_ns != entry['mtime_ns']:
+            if file_digest(csv_path) != entry['sha256']:
+                return None
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self._dirty = True
+        return entry
+
+    def contains(self, csv_path, parse=None):
+        """
+        Whether the cache holds a valid entry for a file, without loading it.
+
+        Parameters:
+            csv_path (str): The source CSV file.
+            parse (callable): The parse function the entry must have been written by (see get).
+
+        Returns:
+            bool: True if get would return the cached array.
+        """
+        key = self._key(csv_path)
+        return self._fresh_entry(key, csv_path, parse) is not None and os.path.exists(self._entry_path(key))
+
+    def get(self, csv_path, parse=None):
+        """
+        Look up the parsed array for a file.
+
+        Parameters:
+            csv_path (str): The source CSV file.
+            parse (callable): The parse function the entry must have been written by;
+                None accepts any parse function of the current PARSER_VERSION.
+
+        Returns:
+            np.ndarray or None: A read-only memory map of the cached array, or None on a miss.
+        """
+        key = self._key(csv_path)
+        entry = self._fresh_entry(key, csv_path, parse)
+        if entry is None:
+            return None
+
+        try:
+            array = np.load(self._entry_path(key), mmap_mode='r')
+        except (OSError, ValueError):
+            self.invalidate(csv_path)
+            return None
+
+        entry['last_access'] = time.time()
+        self._dirty = True
+        return array
+
+    def put(self, csv_path, array, parse=None):
+        """
+        Store the parsed array for a file and evict old entries if over budget.
+
+        Parameters:
+            csv_path (str): The source CSV file.
+            array (np.ndarray): The parsed array.
+            parse (callable): The parse function that produced it.
+        """
+        key = self._key(csv_path)
+        stat = os.stat(csv_path)
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp_path, entry_path)
+
+        self._index[key] = {
+            'path': os.path.abspath(csv_path),
+            'parser_version': PARSER_VERSION,
+            'parser': None if parse is None else parser_id(parse),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_digest(csv_path),
+            'nbytes': os.path.getsize(entry_path),
+            'last_access': time.time(),
+        }
+        self._evict()
+        self._write_index()
+
+    def load(self, csv_path, parse):
+        """
+        Return the cached array for a file, parsing and caching it on a miss.
+
+        Parameters:
+            csv_path (str): The source CSV file.
+            parse (callable): Function mapping csv_path to the parsed array.
+
+        Returns:
+            np.ndarray: The parsed array (a memory map on a hit).
+        """
+        array = self.get(csv_path, parse)
+        if array is None:
+            array = parse(csv_path)
+            self.put(csv_path, array, parse)
+        return array
+
+    def invalidate(self, csv_path):
+        """
+        Drop the cached entry for a file, if any.
+
+        Parameters:
+            csv_path (str): The source CSV file.
+        """
+        key = self._key(csv_path)
+        if self._index.pop(key, None) is not None:
+            self._write_index()
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def flush(self):
+        """
+        Write the access times and refreshed modification times of lookups to the index.
+        """
+        if self._dirty:
+            self._write_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def clear(self):
+        """
+        Remove every cached entry.
+        """
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.npy') or filename.endswith('.tmp'):
+                os.remove(os.path.join(self.cache_dir, filename))
+        self._index = {}
+        self._write_index()
+
+    @property
+    def nbytes(self):
+        """Total size in bytes of the cached arrays."""
+        return sum(entry['nbytes'] for entry in self._index.values())
+
+    def _evict(self):
+        """
+        Evict least recently used entries until the cache fits in max_bytes.
+        """
+        total = self.nbytes
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= entry['nbytes']
+            del self._index[key]
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
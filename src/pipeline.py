@@ -0,0 +1,256 @@
+"""
+End-to-end pipeline: load -> complete -> regularize -> symmetry -> export.
+
+Usage:
+    python -m src.pipeline [inputs ...] [--stages complete regularize symmetry export]
+                           [--detectors lines circles ...] [--symmetry-max-points 64]
+                           [--output-dir ./output] [--report report.json]
+
+Inputs are CSV/SVG files or directories of them (default ./src/problems). Every stage
+is timed, and the JSON report gives its wall time, points per second and peak
+traced memory per file, plus totals per stage over all files. A file whose stage
+raises gets the error in its report, and the run goes on with the next file.
+
+The symmetry stage only runs when selected: its checks are cubic in the number of
+points of a segment, so it also skips segments of more than --symmetry-max-points.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .curve_completion import fill_gaps, handle_occlusions
+from .data_loader import find_csv_files, read_csv
+from .rasterizer import blend_palette, rasterize_coverage, write_png
+from .regularization import SHAPE_DTYPE, SHAPE_TYPES, detect_all, records_to_shapes
+from .svg_writer import write_svg
+from .symmetry import detect_reflection_symmetries, detect_rotational_symmetries
+
+DATA_DIR = "./src/problems"
+OUTPUT_DIR = "./output"
+STAGES = ('load', 'complete', 'regularize', 'symmetry', 'export')
+DEFAULT_STAGES = ('complete', 'regularize', 'export')
+
+# Largest segment the symmetry checks are run on (about a second for this size)
+SYMMETRY_MAX_POINTS = 64
+
+# Regularization detectors, run together by detect_all; names match the SVGWriter.add_shapes keys
+DETECTORS = SHAPE_TYPES
+
+SYMMETRIES = {
+    'reflection': detect_reflection_symmetries,
+    'rotational': detect_rotational_symmetries,
+}
+
+def count_points(paths):
+    return sum(len(XY) for path in paths for XY in path)
+
+def throughput(points, seconds):
+    return points / seconds if seconds > 0 else None
+
+def measure(func, *args, n_points=0):
+    """
+    Run func(*args) and measure its wall time and peak memory.
+
+    Memory is the peak of the memory traced by tracemalloc (which sees NumPy
+    buffers too) above what was allocated when the call started; tracemalloc has to
+    be tracing already.
+
+    Returns:
+        tuple: (result, stats dict with seconds, points, points_per_second and
+        peak_memory_bytes).
+    """
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    return result, {
+        'seconds': seconds,
+        'points': n_points,
+        'points_per_second': throughput(n_points, seconds),
+        'peak_memory_bytes': max(peak, 0),
+    }
+
+def _run_each(functions, paths, errors):
+    """
+    Call every function on paths, recording errors instead of stopping the stage.
+    """
+    results = {}
+    for name, func in functions.items():
+        try:
+            results[name] = func(paths)
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+    return results
+
+def run_pipeline(input_path, stages=STAGES, detectors=tuple(DETECTORS), output_dir=OUTPUT_DIR,
+                 gap_threshold=10, symmetry_max_points=SYMMETRY_MAX_POINTS):
+    """
+    Run the selected stages on one input file.
+
+    Parameters:
+        input_path (str): The CSV (or SVG) file.
+        stages (iterable): Stages to run besides 'load', which always runs.
+        detectors (iterable): Names of the regularization detectors to run (see DETECTORS).
+        output_dir (str): Directory for the exported '<name>_pipeline.svg/.png'.
+        gap_threshold (float): Maximum endpoint distance bridged by fill_gaps.
+        symmetry_max_points (int): Segments with more points are left out of the symmetry
+            stage; None checks all of them.
+
+    Returns:
+        tuple: (state, report). state holds the 'paths', 'completed' curves, 'shapes'
+        (the detect_all 'records' as per-detector lists) and 'symmetries'; report is a JSON-serializable dict with per-stage stats,
+        result counts and per-step errors. A stage that raises is recorded in the errors
+        under its name, and the stages after it are skipped.
+    """
+    stages = set(stages)
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    report = {'name': name, 'input': input_path, 'stages': {}, 'results': {}, 'errors': {}}
+    state = {'paths': [], 'completed': [], 'records': np.zeros(0, dtype=SHAPE_DTYPE), 'shapes': {},
+             'symmetries': {}}
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    stage = 'load'
+    try:
+        state['paths'], load = measure(read_csv, input_path)
+        n_points = count_points(state['paths'])  # Only known once loaded
+        load.update(points=n_points, points_per_second=throughput(n_points, load['seconds']))
+        report['stages']['load'] = load
+        report['results']['paths'] = len(state['paths'])
+        report['results']['points'] = n_points
+
+        if 'complete' in stages:
+            stage = 'complete'
+
+            def complete(paths):
+                steps = _run_each({
+                    'fill_gaps': lambda paths: fill_gaps(paths, threshold=gap_threshold),
+                }, paths, report['errors'])
+                filled = steps.get('fill_gaps', paths)
+                occlusions = _run_each({
+                    'handle_occlusions': lambda paths: handle_occlusions([np.concatenate(path) for path in paths
+                                                                          if path]),
+                }, filled, report['errors'])
+                return filled, occlusions.get('handle_occlusions', [])
+
+            (state['paths'], state['completed']), report['stages']['complete'] = measure(
+                complete, state['paths'], n_points=count_points(state['paths']))
+            report['results']['paths_after_gap_filling'] = len(state['paths'])
+            report['results']['completed_curves'] = len(state['completed'])
+
+        if 'regularize' in stages:
+            stage = 'regularize'
+            # Every detector fails on its own, with its name in the report
+            state['records'], report['stages']['regularize'] = measure(
+                lambda paths: detect_all(paths, detectors, errors=report['errors']), state['paths'],
+                n_points=count_points(state['paths']))
+            shapes = records_to_shapes(state['records'])
+            state['shapes'] = {detector: shapes[detector] for detector in detectors}
+            for detector, detector_shapes in state['shapes'].items():
+                report['results'][detector] = len(detector_shapes)
+
+        if 'symmetry' in stages:
+            stage = 'symmetry'
+            checked = [[XY for XY in path if symmetry_max_points is None or len(XY) <= symmetry_max_points]
+                       for path in state['paths']]
+            state['symmetries'], report['stages']['symmetry'] = measure(
+                _run_each, SYMMETRIES, checked, report['errors'], n_points=count_points(checked))
+            for kind, symmetric in state['symmetries'].items():
+                report['results'][f"{kind}_symmetric_segments"] = len(symmetric)
+            report['results']['symmetry_skipped_segments'] = sum(len(path) for path in state['paths']) - \
+                sum(len(path) for path in checked)
+
+        if 'export' in stages:
+            stage = 'export'
+
+            def export(paths, completed, shapes):
+                os.makedirs(output_dir, exist_ok=True)
+                drawn = list(paths) + [[curve] for curve in completed]
+                svg_path = os.path.join(output_dir, f"{name}_pipeline.svg")
+                png_path = os.path.join(output_dir, f"{name}_pipeline.png")
+                write_svg(svg_path, drawn, shapes=shapes)
+                write_png(rasterize_coverage(drawn), png_path, palette=blend_palette('blue'))
+                return [svg_path, png_path]
+
+            report['outputs'], report['stages']['export'] = measure(
+                export, state['paths'], state['completed'], state['shapes'],
+                n_points=count_points(state['paths']))
+    except Exception as e:
+        report['errors'][stage] = f"{type(e).__name__}: {e}"
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    return state, report
+
+def summarize(reports):
+    """
+    Aggregate per-file stage stats into totals per stage.
+    """
+    totals = {}
+    for report in reports:
+        for stage, stats in report['stages'].items():
+            total = totals.setdefault(stage, {'files': 0, 'seconds': 0.0, 'points': 0, 'peak_memory_bytes': 0})
+            total['files'] += 1
+            total['seconds'] += stats['seconds']
+            total['points'] += stats['points']
+            total['peak_memory_bytes'] = max(total['peak_memory_bytes'], stats['peak_memory_bytes'])
+    for total in totals.values():
+        total['points_per_second'] = throughput(total['points'], total['seconds'])
+    return {stage: totals[stage] for stage in STAGES if stage in totals}
+
+def find_inputs(inputs):
+    """
+    Expand directories into their CSV/SVG files (CSV first when both exist).
+    """
+    input_paths = []
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            input_paths.extend(find_csv_files(input_path, extensions=('.csv', '.svg')).values())
+        else:
+            input_paths.append(input_path)
+    return input_paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='*', default=[DATA_DIR], help="CSV/SVG files or directories")
+    parser.add_argument('--stages', nargs='+', choices=STAGES[1:], default=list(DEFAULT_STAGES),
+                        help="Stages to run after loading (default: all but symmetry)")
+    parser.add_argument('--detectors', nargs='+', choices=list(DETECTORS), default=list(DETECTORS),
+                        help="Regularization detectors to run (default: all)")
+    parser.add_argument('--gap-threshold', type=float, default=10)
+    parser.add_argument('--symmetry-max-points', type=int, default=SYMMETRY_MAX_POINTS,
+                        help="Largest segment checked for symmetry (default: %(default)s)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--report', help="Write the JSON report here instead of to stdout")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for input_path in find_inputs(args.inputs):
+        _, report = run_pipeline(input_path, args.stages, args.detectors, args.output_dir, args.gap_threshold,
+                                 args.symmetry_max_points)
+        reports.append(report)
+        print(f"{report['name']}: " + ", ".join([f"{stage} {stats['seconds']:.3f} s"
+                                                   for stage, stats in report['stages'].items()] +
+                                                  [f"{step} failed" for step in report['errors']]), file=sys.stderr)
+
+    document = {'stages': ['load'] + args.stages, 'detectors': args.detectors,
+                'files': reports, 'totals': summarize(reports)}
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(document, f, indent=2)
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    return document
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,10 @@
-import numpy as np
+import os
+import sys
 import matplotlib.pyplot as plt
 
-def read_csv(csv_path):
-    np_path_XYs = np.genfromtxt(csv_path, delimiter=',')
-    path_XYs = []
-    for i in np.unique(np_path_XYs[:, 0]):
-        npXYs = np_path_XYs[np_path_XYs[:, 0] == i][:, 1:]
-        XYs = []
-        for j in np.unique(npXYs[:, 0]):
-            XY = npXYs[npXYs[:, 0] == j][:, 1:]
-            XYs.append(XY)
-        path_XYs.append(XYs)
-    return path_XYs
+PROBLEMS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(PROBLEMS_DIR)))  # The repository root, from any working directory
+from src.data_loader import read_csv
 
 def plot(paths_XYs):
     colours = ['b', 'g', 'r', 'c', 'm', 'y', 'k']  # Define a list of colors
@@ -24,7 +17,7 @@ def plot(paths_XYs):
     plt.show()
 
 # Example usage
-csv_path = './src/problems/frag1.csv'
+csv_path = os.path.join(PROBLEMS_DIR, 'frag1.csv')
 paths_XYs = read_csv(csv_path)
 plot(paths_XYs)
 
@@ -0,0 +1,224 @@
+import struct
+import zlib
+
+import numpy as np
+
+DEFAULT_SIZE = (640, 480)  # Same pixel size as a default matplotlib figure
+STAMP_CHUNK = 1 << 15  # Samples rasterized per batch, bounds temporary memory
+
+NAMED_COLORS = {
+    'black': (0, 0, 0),
+    'white': (255, 255, 255),
+    'red': (255, 0, 0),
+    'green': (0, 128, 0),
+    'blue': (0, 0, 255),
+    'cyan': (0, 191, 191),
+    'magenta': (191, 0, 191),
+    'yellow': (191, 191, 0),
+    'orange': (255, 165, 0),
+    'gray': (128, 128, 128),
+    'grey': (128, 128, 128),
+}
+
+def to_rgb(color):
+    """
+    Convert a color name, '#rrggbb' string or RGB tuple to a uint8 RGB array.
+
+    Parameters:
+        color (str or tuple): A name from NAMED_COLORS, a hex string, or three values
+            in [0, 1] as in matplotlib (values above 1 are taken as 0-255).
+
+    Returns:
+        np.ndarray: Array of shape (3,) and dtype uint8.
+    """
+    if isinstance(color, str):
+        if color.startswith('#') and len(color) == 7:
+            return np.array([int(color[i:i + 2], 16) for i in (1, 3, 5)], dtype=np.uint8)
+        if color not in NAMED_COLORS:
+            raise ValueError(f"Unknown color: {color!r}")
+        return np.array(NAMED_COLORS[color], dtype=np.uint8)
+
+    rgb = np.asarray(color, dtype=np.float64)[:3]
+    if np.all(rgb <= 1):
+        rgb = rgb * 255
+    return np.clip(np.round(rgb), 0, 255).astype(np.uint8)
+
+def fit_transform(points, size=DEFAULT_SIZE, padding=0.05):
+    """
+    Find the scale and offset that fit points into an image with equal aspect.
+
+    The y axis points down, like the SVG coordinate system (``plot_paths`` inverts
+    the matplotlib y axis for the same reason), so no flip is applied.
+
+    Parameters:
+        points (np.ndarray): Array of shape (n, 2) with all points to be drawn.
+        size (tuple): Image (width, height) in pixels.
+        padding (float): Fraction of each image dimension left empty on both sides.
+
+    Returns:
+        tuple: (scale, offset) such that pixel = points * scale + offset.
+    """
+    width, height = size
+    lo = points.min(axis=0)
+    hi = points.max(axis=0)
+    extent = np.maximum(hi - lo, 1e-12)
+    usable = np.array([width, height], dtype=np.float64) * (1 - 2 * padding)
+    scale = float(np.min(usable / extent))
+    # Center the drawing in the image
+    offset = np.array([width, height]) / 2 - (lo + hi) / 2 * scale
+    return scale, offset
+
+def rasterize_coverage(paths, size=DEFAULT_SIZE, linewidth=2.0, padding=0.05):
+    """
+    Draw paths as anti-aliased polylines into an 8-bit coverage image, without matplotlib.
+
+    Every line segment is sampled at least once per pixel along its length, and a
+    small disk of pixels around each sample gets a coverage computed from its exact
+    distance to that segment, so joins and caps come out round. Coverage of all
+    segments is combined with a maximum.
+
+    Parameters:
+        paths (list): A list of paths, where each path is a list of (m, 2) point arrays.
+        size (tuple): Image (width, height) in pixels.
+        linewidth (float): Line width in pixels.
+        padding (float): Fraction of each image dimension left empty on both sides.
+
+    Returns:
+        np.ndarray: Array of shape (height, width) and dtype uint8, 0 for background and
+        255 for pixels fully covered by a line.
+    """
+    width, height = size
+    coverage = np.zeros(width * height, dtype=np.float32)
+
+    segments = [np.asarray(XY, dtype=np.float64).reshape(-1, 2) for path in paths for XY in path]
+    segments = [XY for XY in segments if len(XY)]
+    if segments:
+        points = np.concatenate(segments)
+        scale, offset = fit_transform(points, size, padding)
+
+        # Line segments between consecutive points of each segment; a single point
+        # becomes a zero-length segment so it is still drawn as a dot.
+        starts = np.concatenate([XY[:-1] if len(XY) > 1 else XY for XY in segments]) * scale + offset
+        ends = np.concatenate([XY[1:] if len(XY) > 1 else XY for XY in segments]) * scale + offset
+        _draw_segments(coverage, starts, ends, size, linewidth / 2)
+
+    return (coverage * 255 + 0.5).astype(np.uint8).reshape(height, width)
+
+def blend_palette(color='blue', background='white'):
+    """
+    Build the 256-entry color table that maps coverage values to blended colors.
+
+    Parameters:
+        color: Line color (see ``to_rgb``).
+        background: Background color (see ``to_rgb``).
+
+    Returns:
+        np.ndarray: Array of shape (256, 3) and dtype uint8.
+    """
+    alpha = np.linspace(0, 1, 256)[:, np.newaxis]
+    return np.round(to_rgb(background) * (1 - alpha) + to_rgb(color) * alpha).astype(np.uint8)
+
+def rasterize_paths(paths, size=DEFAULT_SIZE, linewidth=2.0, color='blue', background='white',
+                    padding=0.05):
+    """
+    Draw paths as anti-aliased polylines into an RGB image, without matplotlib.
+
+    Parameters:
+        paths (list): A list of paths, where each path is a list of (m, 2) point arrays.
+        size (tuple): Image (width, height) in pixels.
+        linewidth (float): Line width in pixels.
+        color: Line color (see ``to_rgb``).
+        background: Background color (see ``to_rgb``).
+        padding (float): Fraction of each image dimension left empty on both sides.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, 3) and dtype uint8.
+    """
+    coverage = rasterize_coverage(paths, size, linewidth, padding)
+    return blend_palette(color, background)[coverage]
+
+def _draw_segments(coverage, starts, ends, size, radius):
+    """
+    Accumulate the coverage of thick line segments into a flat float32 buffer.
+    """
+    width, height = size
+    starts = starts.astype(np.float32)
+    direction = ends.astype(np.float32) - starts
+    length_sq = np.einsum('ij,ij->i', direction, direction)
+    n_samples = np.maximum(np.ceil(np.sqrt(length_sq)).astype(np.intp), 1)
+
+    # Samples at the middle of n equal pieces, so every point of a segment is within
+    # half a pixel of a sample and shared endpoints are not sampled twice.
+    owner = np.repeat(np.arange(len(starts)), n_samples)
+    first = np.cumsum(n_samples) - n_samples
+    t = (np.arange(len(owner)) - first[owner] + 0.5) / n_samples[owner]
+    samples = starts[owner] + direction[owner] * t[:, np.newaxis].astype(np.float32)
+
+    # Pixel offsets of the stamp around each sample: a covered pixel center is within
+    # radius + 0.5 of the segment, hence within radius + 1 of a sample, and flooring the
+    # sample moves the offset by less than sqrt(2) / 2 more.
+    reach = radius + 1 + np.sqrt(0.5)
+    dy, dx = np.mgrid[-int(reach):int(reach) + 1, -int(reach):int(reach) + 1]
+    disk = dx ** 2 + dy ** 2 <= reach ** 2
+    dx = dx[disk].astype(np.float32)
+    dy = dy[disk].astype(np.float32)
+
+    length_sq = np.maximum(length_sq, 1e-12)
+    for lo in range(0, len(owner), STAMP_CHUNK):
+        segment = owner[lo:lo + STAMP_CHUNK]
+        px = np.floor(samples[lo:lo + STAMP_CHUNK, 0])[:, np.newaxis] + dx
+        py = np.floor(samples[lo:lo + STAMP_CHUNK, 1])[:, np.newaxis] + dy
+
+        # Distance from each pixel center (at integer + 0.5) to the sample's segment
+        ux, uy = direction[segment, 0:1], direction[segment, 1:2]
+        rx = px + (0.5 - starts[segment, 0:1])
+        ry = py + (0.5 - starts[segment, 1:2])
+        u = np.clip((rx * ux + ry * uy) / length_sq[segment, np.newaxis], 0, 1)
+        rx -= u * ux
+        ry -= u * uy
+
+        # Linear coverage ramp one pixel wide around the stroke edge
+        alpha = radius + 0.5 - np.sqrt(rx * rx + ry * ry)
+        keep = (alpha > 0) & (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        index = (py[keep] * width + px[keep]).astype(np.intp)
+        np.maximum.at(coverage, index, np.minimum(alpha[keep], 1))
+
+def write_png(image, output_path, palette=None, compress_level=3):
+    """
+    Write an 8-bit image as a PNG file.
+
+    Parameters:
+        image (np.ndarray): Array of shape (h, w), (h, w, 3) or (h, w, 4) and dtype uint8.
+            With a palette, image is (h, w) and holds indices into it.
+        output_path (str): The path where the PNG should be saved.
+        palette (np.ndarray): Optional (n, 3) uint8 color table, n <= 256, to write an
+            indexed PNG; this is a third of the data of RGB and much faster to compress.
+        compress_level (int): zlib compression level (0-9); above 3 is much slower for
+            little gain on line drawings.
+    """
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    if image.ndim == 2:
+        image = image[:, :, np.newaxis]
+    height, width, channels = image.shape
+    if palette is not None:
+        if channels != 1:
+            raise ValueError("An indexed PNG needs a 2-D image of palette indices.")
+        color_type = 3
+    else:
+        color_type = {1: 0, 3: 2, 4: 6}[channels]
+
+    # Filter type 0 (None) byte in front of every scanline
+    raw = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, -1)
+
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    with open(output_path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)))
+        if palette is not None:
+            f.write(chunk(b'PLTE', np.asarray(palette, dtype=np.uint8).tobytes()))
+        f.write(chunk(b'IDAT', zlib.compress(raw.tobytes(), compress_level)))
+        f.write(chunk(b'IEND', b''))
@@ -6,3 +6,5 @@ from .ellipse_detector import detect_ellipses
 from .rectangle_detector import detect_rectangles
 from .polygon_detector import detect_polygons
 from .star_detector import detect_stars
+from .features import FeatureCache, SegmentFeatures
+from .shapes import SHAPE_DTYPE, SHAPE_TYPES, detect_all, records_to_shapes
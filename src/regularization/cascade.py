@@ -0,0 +1,99 @@
+import numpy as np
+
+class Cascade:
+    """
+    Early-rejection cascade for classifying the segments of a SegmentFeatures.
+
+    Stages run in order on the segments still in the running. Each is a vectorized
+    test that is cheap compared to the ones after it, so most segments (plain
+    strokes) are rejected from precomputed features, and the expensive tests (convex
+    hulls, shape fits) only see plausible candidates. How many segments every stage
+    pruned, and how many passed them all, is accumulated across calls.
+
+    Parameters:
+        stages (list): (name, test) pairs, where test(features, segments) returns a
+            boolean array over the segment indices in segments.
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.reset()
+
+    def reset(self):
+        """
+        Zero the counters.
+        """
+        self.tested = 0
+        self.accepted = 0
+        self.pruned = dict.fromkeys((name for name, _ in self.stages), 0)
+
+    def __call__(self, features):
+        """
+        Classify every segment.
+
+        Parameters:
+            features (SegmentFeatures): Features of the segments.
+
+        Returns:
+            numpy array: Boolean array with True for the segments that passed every stage.
+        """
+        segments = np.arange(len(features))
+        self.tested += len(segments)
+        for name, test in self.stages:
+            if not len(segments):
+                break
+            passed = np.asarray(test(features, segments), dtype=bool)
+            self.pruned[name] += int(len(segments) - passed.sum())
+            segments = segments[passed]
+        self.accepted += len(segments)
+
+        mask = np.zeros(len(features), dtype=bool)
+        mask[segments] = True
+        return mask
+
+    def counts(self):
+        """
+        Counters as a dict: tested, pruned per stage in order, and accepted.
+        """
+        return {'tested': self.tested, **self.pruned, 'accepted': self.accepted}
+
+def point_count(minimum, maximum=None):
+    """
+    Stage keeping segments with minimum to maximum (default: any number of) vertices.
+    """
+    def test(features, segments):
+        counts = features.lengths[segments]
+        return (counts >= minimum) & (counts <= (np.inf if maximum is None else maximum))
+    return test
+
+def bbox_aspect(minimum, slack=0):
+    """
+    Stage keeping segments whose bounding box is not empty and whose short side is at
+    least minimum times its long side, less slack per vertex.
+    """
+    def test(features, segments):
+        extents = features.bbox[segments, 2:] - features.bbox[segments, :2]
+        short, long = extents.min(axis=1), extents.max(axis=1)
+        return (long > 0) & (short + slack * features.lengths[segments] >= minimum * long)
+    return test
+
+def radial_spread(maximum, slack=0):
+    """
+    Stage keeping segments whose vertices are about equally far from their centroid:
+    standard deviation of the radii at most maximum times their mean, plus slack per
+    vertex.
+    """
+    def test(features, segments):
+        return features.radius_std[segments] <= \
+            maximum * features.radius_mean[segments] + slack * features.lengths[segments]
+    return test
+
+def closure(maximum):
+    """
+    Stage keeping segments whose ends are at most maximum times their bounding box
+    diagonal apart.
+    """
+    def test(features, segments):
+        extents = features.bbox[segments, 2:] - features.bbox[segments, :2]
+        return features.closure_gap[segments] <= maximum * np.hypot(extents[:, 0], extents[:, 1])
+    return test
@@ -1,61 +1,134 @@
+import itertools
 import numpy as np
-from scipy import optimize
 import matplotlib.pyplot as plt
 from sklearn.cluster import DBSCAN
 
-def hough_circle(points, radii_range, threshold=0.5):
+from .circle_fit import fit_circles
+from .ransac import ransac_circles
+
+# Directions every point votes along, every 5 degrees
+_HOUGH_ANGLES = np.radians(np.arange(0, 360, 5))
+_HOUGH_COS = np.cos(_HOUGH_ANGLES)
+_HOUGH_SIN = np.sin(_HOUGH_ANGLES)
+
+def hough_circle(points, radii_range, threshold=0.5, max_votes=2**22, max_cells=2**22):
     """
     Detect circles using Hough Transform.
-    
+
+    Every point votes, for every integer radius and every 5 degrees, for the centre
+    cell (a, b, r) at that distance. The votes are counted with NumPy in blocks of
+    radii and chunks of points, so at most max_votes votes are held at once. When a
+    block of radii fits in max_cells, the votes are counted on a dense grid;
+    otherwise (very large drawings) only the cells that receive votes are stored.
+    The returned circles are the cells above the threshold that are local maxima
+    among their 26 neighbours.
+
     :param points: numpy array of shape (n, 2) containing the points
     :param radii_range: tuple (min_radius, max_radius)
-    :param threshold: accumulator threshold for circle detection
-    :return: list of tuples (x, y, r) for detected circles
+    :param threshold: accumulator threshold for circle detection, as a fraction of the number of points
+    :param max_votes: maximum number of votes computed per step
+    :param max_cells: maximum number of cells of the dense accumulator
+    :return: list of tuples (x, y, r) for detected circles, most votes first
     """
     min_radius, max_radius = radii_range
-    x, y = points[:, 0], points[:, 1]
-    
-    # Create accumulator
-    accumulator = {}
-    
-    # Loop through all points and possible radii
-    for i in range(len(x)):
-        for r in range(min_radius, max_radius + 1):
-            for t in range(0, 360, 5):  # Step of 5 degrees
-                a = x[i] - r * np.cos(np.radians(t))
-                b = y[i] - r * np.sin(np.radians(t))
-                a, b = int(a), int(b)
-                if (a, b, r) in accumulator:
-                    accumulator[(a, b, r)] += 1
-                else:
-                    accumulator[(a, b, r)] = 1
-    
-    # Find peaks in accumulator
-    circles = [k for k, v in accumulator.items() if v > threshold * len(points)]
-    
-    return circles
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    radii = np.arange(min_radius, max_radius + 1)
+    if len(points) == 0 or len(radii) == 0:
+        return []
+    min_votes = threshold * len(points)
+
+    # Centres are truncated to integers like int(); truncation is monotonic, so the
+    # extreme points bound the grid
+    lo = np.trunc(points.min(axis=0) - max_radius).astype(np.int64)
+    width, height = np.trunc(points.max(axis=0) + max_radius).astype(np.int64) - lo + 1
+    plane = width * height
+    dense = plane <= max_cells
+    radii_per_block = max(1, max_cells // plane) if dense else 1
+
+    cells, votes = [], []
+    for start in range(0, len(radii), radii_per_block):
+        block = radii[start:start + radii_per_block]
+        dx = block[:, None] * _HOUGH_COS  # (radii, angles)
+        dy = block[:, None] * _HOUGH_SIN
+        radius_offsets = np.arange(len(block))[:, None] * height
+        chunk = max(1, max_votes // dx.size)
+
+        counts = np.zeros(len(block) * plane, dtype=np.int64) if dense else None
+        partial = []
+        for i in range(0, len(points), chunk):
+            x = points[i:i + chunk, 0, None, None]
+            y = points[i:i + chunk, 1, None, None]
+            a = (x - dx).astype(np.int64) - lo[0]
+            b = (y - dy).astype(np.int64) - lo[1]
+            keys = ((radius_offsets + b) * width + a).ravel()
+            if dense:
+                counts += np.bincount(keys, minlength=counts.size)
+            else:
+                partial.append(np.unique(keys, return_counts=True))
+
+        if dense:
+            keys = np.flatnonzero(counts > min_votes)
+            block_votes = counts[keys]
+        else:
+            keys, inverse = np.unique(np.concatenate([k for k, _ in partial]), return_inverse=True)
+            block_votes = np.bincount(inverse, weights=np.concatenate([c for _, c in partial])).astype(np.int64)
+            above = block_votes > min_votes
+            keys, block_votes = keys[above], block_votes[above]
+
+        radius_index, rest = np.divmod(keys, plane)
+        b, a = np.divmod(rest, width)
+        cells.append(np.column_stack([a + lo[0], b + lo[1], block[radius_index]]))
+        votes.append(block_votes)
+
+    cells, votes = np.concatenate(cells), np.concatenate(votes)
+    peaks = suppress_non_maxima(cells, votes)
+    order = np.argsort(-votes[peaks], kind='stable')
+    return [tuple(int(v) for v in cell) for cell in cells[peaks][order]]
+
+def suppress_non_maxima(cells, votes):
+    """
+    Find the accumulator cells not outvoted by any of their 26 neighbours.
+
+    Only the given cells are compared; as they are all above the threshold, a cell
+    left out can never outvote one of them. Neighbouring cells with equal votes are
+    both kept.
+
+    :param cells: integer numpy array of shape (m, 3) with the (a, b, r) cells
+    :param votes: numpy array of shape (m,) with the votes of each cell
+    :return: boolean numpy array of shape (m,), True for local maxima
+    """
+    keep = np.ones(len(cells), dtype=bool)
+    if len(cells) < 2:
+        return keep
+    lo = cells.min(axis=0) - 1
+    shape = tuple(cells.max(axis=0) - lo + 2)
+    keys = np.ravel_multi_index((cells - lo).T, shape)
+    order = np.argsort(keys)
+    sorted_keys, sorted_votes = keys[order], votes[order]
+    for offset in itertools.product((-1, 0, 1), repeat=3):
+        if offset == (0, 0, 0):
+            continue
+        neighbours = np.ravel_multi_index((cells - lo + offset).T, shape)
+        pos = np.searchsorted(sorted_keys, neighbours).clip(max=len(cells) - 1)
+        keep &= ~((sorted_keys[pos] == neighbours) & (sorted_votes[pos] > votes))
+    return keep
+
+# Gauss-Newton steps after the Taubin fit; the geometric fit converges in a few
+REFINE_ITERATIONS = 10
 
 def fit_circle_optimize(points):
     """
     Fit a circle to points using least squares optimization.
     
+    The algebraic Taubin fit is refined by Gauss-Newton on the geometric distances
+    (see fit_circles, which fits many point sets at once).
+    
     :param points: numpy array of shape (n, 2) containing the points
     :return: tuple (x, y, r) for the best-fit circle
     """
-    def calc_R(xc, yc):
-        return np.sqrt((points[:, 0] - xc)**2 + (points[:, 1] - yc)**2)
+    return tuple(fit_circles(points, iterations=REFINE_ITERATIONS)[0])
 
-    def f_2(c):
-        Ri = calc_R(*c)
-        return Ri - Ri.mean()
-
-    center_estimate = np.mean(points, axis=0)
-    center, _ = optimize.leastsq(f_2, center_estimate)
-    
-    radius = np.mean(calc_R(*center))
-    return (*center, radius)
-
-def detect_circles(points, min_radius=10, max_radius=100, min_points=5):
+def detect_circles(points, min_radius=10, max_radius=100, min_points=5, method='hough', seed=None):
     """
     Detect and fit circles in a set of points.
     
@@ -63,16 +136,27 @@ def detect_circles(points, min_radius=10, max_radius=100, min_points=5):
     :param min_radius: minimum radius to consider
     :param max_radius: maximum radius to consider
     :param min_points: minimum number of points to constitute a circle
+    :param method: 'hough' for the Hough transform, or 'ransac' for random 3-point
+                   samples (see ransac_circles), which needs no radius grid
+    :param seed: seed of the RANSAC random generator, for reproducible results
     :return: list of tuples (x, y, r) for detected circles
     """
+    if method == 'ransac':
+        return ransac_circles(points, min_inliers=min_points, radius_range=(min_radius, max_radius), seed=seed)
+    if method != 'hough':
+        raise ValueError(f"Unknown circle detection method: {method}")
+
     # Initial circle detection using Hough Transform
     initial_circles = hough_circle(points, (min_radius, max_radius))
+    if not initial_circles:
+        return []
     
-    # Cluster detected circles
+    # Cluster detected circles; the Hough peaks are already local maxima, so a single
+    # peak makes a cluster
     circle_params = np.array(initial_circles)
-    clustering = DBSCAN(eps=max_radius/2, min_samples=2).fit(circle_params)
+    clustering = DBSCAN(eps=max_radius/2, min_samples=1).fit(circle_params)
     
-    refined_circles = []
+    candidates = []
     for label in set(clustering.labels_):
         if label == -1:  # Noise points
             continue
@@ -87,11 +171,14 @@ def detect_circles(points, min_radius=10, max_radius=100, min_points=5):
         circle_points = points[distances < max_radius/10]
         
         if len(circle_points) >= min_points:
-            # Refine circle fit
-            x, y, r = fit_circle_optimize(circle_points)
-            refined_circles.append((x, y, r))
-    
-    return refined_circles
+            candidates.append(circle_points)
+    if not candidates:
+        return []
+    
+    # Refine all circle fits together
+    offsets = np.concatenate([[0], np.cumsum([len(circle_points) for circle_points in candidates])])
+    refined = fit_circles(np.concatenate(candidates), offsets, iterations=REFINE_ITERATIONS)
+    return [tuple(circle) for circle in refined]
 
 def plot_circles(points, circles):
     """
@@ -0,0 +1,156 @@
+import numpy as np
+
+from ..curve_set import CurveSet
+
+# Newton steps for the root of the Pratt/Taubin characteristic polynomial (as in
+# Chernov's reference implementations, which converge in a handful)
+NEWTON_ITERATIONS = 20
+NEWTON_EPSILON = 1e-12
+
+METHODS = ('kasa', 'pratt', 'taubin')
+
+def segment_moments(curves):
+    """
+    Centroids and central moments of every segment, from segment-wise sums.
+
+    Parameters:
+        curves (CurveSet): The segments.
+
+    Returns:
+        tuple: (centroids of shape (k, 2), dict of mean moments Mxx, Myy, Mxy, Mxz, Myz,
+        Mzz of shape (k,), with z = x^2 + y^2 in coordinates centered per segment).
+    """
+    counts = curves.segment_lengths
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centroids = curves.segment_reduce(curves.points) / counts[:, None]
+        centered = curves.points - np.repeat(centroids, counts, axis=0)
+        x, y = centered[:, 0], centered[:, 1]
+        z = x * x + y * y
+        sums = curves.segment_reduce(np.column_stack([x * x, y * y, x * y, x * z, y * z, z * z]))
+        means = sums / counts[:, None]
+    return centroids, dict(zip(('Mxx', 'Myy', 'Mxy', 'Mxz', 'Myz', 'Mzz'), means.T))
+
+def _newton_root(coefficients):
+    """
+    Smallest non-negative root of c0 + c1 x + c2 x^2 + c3 x^3 + c4 x^4 for every
+    segment, by Newton's method from 0; 0 where the iteration does not converge.
+    """
+    c0, c1, c2, c3, c4 = coefficients
+    x = np.zeros_like(c0)
+    y_old = np.full_like(c0, np.inf)
+    active = np.isfinite(c0)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(NEWTON_ITERATIONS):
+            y = c0 + x * (c1 + x * (c2 + x * (c3 + x * c4)))
+            diverged = active & ~(np.abs(y) <= np.abs(y_old))
+            x[diverged] = 0
+            active &= ~diverged
+            if not active.any():
+                break
+            dy = c1 + x * (2 * c2 + x * (3 * c3 + x * 4 * c4))
+            x_new = x - y / dy
+            failed = active & ~np.isfinite(x_new)
+            x[failed] = 0
+            active &= ~failed
+            converged = active & (np.abs(x_new - x) <= NEWTON_EPSILON * np.abs(x_new))
+            x = np.where(active, x_new, x)
+            active &= ~converged
+            x[active & (x < 0)] = 0
+            y_old = y
+    x[active] = 0
+    return x
+
+def fit_circles(curves, offsets=None, method='taubin', iterations=0):
+    """
+    Fit a circle to every segment at once.
+
+    The algebraic fits work on segment-wise moment sums, so all segments are solved
+    in one vectorized pass: 'kasa' solves the linear least-squares problem (biased
+    toward small circles on short arcs), while 'pratt' and 'taubin' find the root
+    of their characteristic polynomial with a few vectorized Newton steps (Chernov,
+    "Circular and Linear Regression", 2010). With iterations > 0, that many
+    Gauss-Newton steps then minimize the geometric distances |p - c| - r.
+
+    Parameters:
+        curves (CurveSet or numpy array): A CurveSet (one circle per segment), or an
+            (n, 2) array of points split by offsets.
+        offsets (numpy array): Segment offsets (as CurveSet.segment_offsets) when curves
+            is an array; None for a single segment.
+        method (str): 'kasa', 'pratt' or 'taubin'.
+        iterations (int): Number of Gauss-Newton refinement steps.
+
+    Returns:
+        numpy array: Array of shape (k, 3) with x, y, r per segment; NaN for segments
+        with fewer than 3 points or collinear points.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown circle fit method: {method}")
+    if not isinstance(curves, CurveSet):
+        curves = CurveSet.from_segments(curves, offsets)
+
+    centroids, moments = segment_moments(curves)
+    Mxx, Myy, Mxy, Mxz, Myz, Mzz = (moments[key] for key in ('Mxx', 'Myy', 'Mxy', 'Mxz', 'Myz', 'Mzz'))
+    Mz = Mxx + Myy
+    cov_xy = Mxx * Myy - Mxy * Mxy
+    var_z = Mzz - Mz * Mz
+    c1 = var_z * Mz + 4 * cov_xy * Mz - Mxz * Mxz - Myz * Myz
+    c0 = Mxz * (Mxz * Myy - Myz * Mxy) + Myz * (Myz * Mxx - Mxz * Mxy) - var_z * cov_xy
+    zeros = np.zeros_like(Mz)
+    if method == 'kasa':
+        x = zeros
+    elif method == 'pratt':
+        x = _newton_root((c0, c1, 4 * cov_xy - 3 * Mz * Mz - Mzz, zeros, np.full_like(Mz, 4)))
+    else:
+        x = _newton_root((c0, c1, -3 * Mz * Mz - Mzz, 4 * Mz, zeros))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        det = 2 * (x * x - x * Mz + cov_xy)
+        center_x = (Mxz * (Myy - x) - Myz * Mxy) / det
+        center_y = (Myz * (Mxx - x) - Mxz * Mxy) / det
+        radius = np.sqrt(center_x ** 2 + center_y ** 2 + Mz + (2 * x if method == 'pratt' else 0))
+    circles = np.column_stack([center_x + centroids[:, 0], center_y + centroids[:, 1], radius])
+    invalid = (curves.segment_lengths < 3) | ~np.isfinite(circles).all(axis=1)
+    circles[invalid] = np.nan
+
+    if iterations:
+        circles = refine_circles(curves, circles, iterations)
+    return circles
+
+def refine_circles(curves, circles, iterations=5):
+    """
+    Gauss-Newton steps on the geometric distances of every segment to its circle.
+
+    The 3x3 normal equations of all segments are built from segment-wise sums and
+    solved together; segments whose equations are singular keep their circle.
+
+    Parameters:
+        curves (CurveSet): The segments.
+        circles (numpy array): Array of shape (k, 3) with the starting x, y, r.
+        iterations (int): Number of steps.
+
+    Returns:
+        numpy array: The refined circles, shape (k, 3).
+    """
+    circles = circles.copy()
+    counts = curves.segment_lengths
+    for _ in range(iterations):
+        per_point = np.repeat(circles, counts, axis=0)
+        dx = curves.points[:, 0] - per_point[:, 0]
+        dy = curves.points[:, 1] - per_point[:, 1]
+        d = np.hypot(dx, dy)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ux, uy = dx / d, dy / d
+        residual = d - per_point[:, 2]
+        # Jacobian rows (-ux, -uy, -1); the sums of J^T J and J^T r per segment
+        sums = curves.segment_reduce(np.column_stack([ux * ux, ux * uy, uy * uy, ux, uy,
+                                                      ux * residual, uy * residual, residual]))
+        sxx, sxy, syy, sx, sy, sxr, syr, sr = sums.T
+        normal = np.stack([np.column_stack([sxx, sxy, sx]), np.column_stack([sxy, syy, sy]),
+                           np.column_stack([sx, sy, counts.astype(float)])], axis=1)
+        rhs = np.column_stack([sxr, syr, sr])
+        solvable = np.isfinite(normal).all(axis=(1, 2)) & np.isfinite(rhs).all(axis=1)
+        solvable[solvable] = np.abs(np.linalg.det(normal[solvable])) > 1e-12 * counts[solvable] ** 3.0
+        if not solvable.any():
+            break
+        circles[solvable] += np.linalg.solve(normal[solvable], rhs[solvable][..., None])[..., 0]
+    return circles
@@ -0,0 +1,122 @@
+import numpy as np
+
+from ..curve_set import CurveSet, _offsets
+
+# Default half-width, in points, of the chords the turning angle is measured over
+CORNER_WINDOW = 3
+# Default smallest turning angle of a corner, in radians
+MIN_CORNER_ANGLE = np.radians(20)
+
+def _closed_segments(curves, closed_tolerance):
+    """
+    Which segments end where they start, as a fraction of their bounding box diagonal.
+    """
+    lengths = curves.segment_lengths
+    low = curves.segment_reduce(curves.points, np.minimum, empty=0)
+    high = curves.segment_reduce(curves.points, np.maximum, empty=0)
+    closed = lengths >= 4
+    first, last = curves.segment_offsets[:-1][closed], curves.segment_offsets[1:][closed] - 1
+    gaps = np.hypot(*(curves.points[last] - curves.points[first]).T)
+    closed[closed] = gaps <= closed_tolerance * np.hypot(*(high - low)[closed].T)
+    return closed
+
+def _shift(local, counts, shift, closed):
+    """
+    Local index shift points away within every segment: wrapped around in closed
+    segments, clipped to the ends in open ones.
+    """
+    shifted = local + shift
+    return np.where(closed, shifted % np.maximum(counts, 1), np.clip(shifted, 0, np.maximum(counts - 1, 0)))
+
+def turning_angles(curves, window=CORNER_WINDOW, closed=None):
+    """
+    Turning angle at every point, measured between the chords to the points window
+    places before and after it.
+
+    Chords over several points smooth out the jitter of hand-drawn strokes while a
+    sharp corner still turns by its full angle. All segments are handled at once on
+    the flat point array; in closed segments the window wraps around (the last point
+    must not repeat the first), and it is shortened to fit segments with few points.
+
+    Parameters:
+        curves (CurveSet): The segments.
+        window (int): Number of points on each side of the chords.
+        closed (numpy array): Boolean array marking the closed segments; None for all open.
+
+    Returns:
+        numpy array: Signed turning angle of every point in radians, positive to the
+        left; 0 at the ends of open segments.
+    """
+    counts = curves.segment_lengths
+    closed = np.zeros(curves.n_segments, dtype=bool) if closed is None else np.asarray(closed)
+    segment = curves.point_segment_index
+    first = curves.segment_offsets[:-1][segment]
+    local = np.arange(curves.n_points) - first
+    widths = np.maximum(np.minimum(window, (counts - 1) // 2), 1)[segment]
+    point_counts, point_closed = counts[segment], closed[segment]
+
+    points = curves.points
+    incoming = points - points[first + _shift(local, point_counts, -widths, point_closed)]
+    outgoing = points[first + _shift(local, point_counts, widths, point_closed)] - points
+    cross = incoming[:, 0] * outgoing[:, 1] - incoming[:, 1] * outgoing[:, 0]
+    return np.arctan2(cross, (incoming * outgoing).sum(axis=1))
+
+def corner_indices(curves, window=CORNER_WINDOW, min_angle=MIN_CORNER_ANGLE, closed_tolerance=0.02):
+    """
+    Corners of every segment, found as peaks of the turning angle.
+
+    A point is a corner when its absolute turning angle (see turning_angles) is at
+    least min_angle and the largest within window points on either side (the first
+    of equal values wins). Segments whose ends are within closed_tolerance of their
+    bounding box diagonal are closed: their repeated end point is ignored and the
+    window wraps around. The ends of open segments are always kept.
+
+    Parameters:
+        curves (CurveSet): The segments.
+        window (int): Half-width of the turning angle chords and of the peak search.
+        min_angle (float): Smallest turning angle of a corner, in radians.
+        closed_tolerance (float): Largest gap between the ends of a closed segment,
+            relative to its bounding box diagonal.
+
+    Returns:
+        tuple: (indices, offsets). indices are the corner points as indices into
+        curves.points, in order; the corners of segment s are
+        indices[offsets[s]:offsets[s + 1]].
+    """
+    closed = _closed_segments(curves, closed_tolerance)
+    # Drop the repeated end point of closed segments, keeping track of the original indices
+    repeated = np.zeros(curves.n_points, dtype=bool)
+    repeated[curves.segment_offsets[1:][closed] - 1] = True
+    original = np.flatnonzero(~repeated)
+    counts = curves.segment_lengths - closed
+    loops = CurveSet(curves.points[original], _offsets(counts), curves.path_offsets)
+
+    angles = np.abs(turning_angles(loops, window, closed))
+    segment = loops.point_segment_index
+    first = loops.segment_offsets[:-1][segment]
+    local = np.arange(loops.n_points) - first
+    widths = np.maximum(np.minimum(window, (counts - 1) // 2), 1)[segment]
+    point_counts, point_closed = counts[segment], closed[segment]
+
+    peaks = angles >= min_angle
+    for shift in range(1, window + 1):
+        in_window = shift <= widths
+        before = first + _shift(local, point_counts, -shift, point_closed)
+        after = first + _shift(local, point_counts, shift, point_closed)
+        peaks &= ~in_window | (((angles > angles[before]) | (before == np.arange(loops.n_points))) &
+                               ((angles >= angles[after]) | (after == np.arange(loops.n_points))))
+
+    ends = ~point_closed & ((local == 0) | (local == point_counts - 1))
+    corners = np.flatnonzero(ends | peaks)
+    corner_counts = np.bincount(segment[corners], minlength=loops.n_segments)
+    return original[corners], _offsets(corner_counts)
+
+def corner_curves(curves, window=CORNER_WINDOW, min_angle=MIN_CORNER_ANGLE, closed_tolerance=0.02):
+    """
+    Reduce every segment to its corners (see corner_indices).
+
+    Returns:
+        CurveSet: The corner points, with the same paths and segments as curves.
+    """
+    indices, offsets = corner_indices(curves, window, min_angle, closed_tolerance)
+    return CurveSet(curves.points[indices], offsets, curves.path_offsets)
@@ -1,5 +1,10 @@
 import numpy as np
-from scipy import linalg
+
+from ..curve_set import CurveSet
+from .features import iter_features
+
+# Segments fitted together by detect_ellipses, which may be given a stream of paths
+ELLIPSE_BATCH = 1024
 
 def fit_ellipse(x, y):
     """
@@ -9,38 +14,122 @@ def fit_ellipse(x, y):
     x, y: Arrays of x and y coordinates of the points
     
     Returns:
-    center_x, center_y, a, b, angle: Parameters of the fitted ellipse
-    """
-    x = x[:, np.newaxis]
-    y = y[:, np.newaxis]
-    D = np.hstack((x*x, x*y, y*y, x, y, np.ones_like(x)))
-    S = np.dot(D.T, D)
-    C = np.zeros((6, 6))
-    C[0, 2] = C[2, 0] = 2
-    C[1, 1] = -1
-    E, V = linalg.eig(np.dot(linalg.inv(S), C))
-    n = np.argmax(np.abs(E))
-    a = V[:, n]
-    
-    # Extract ellipse parameters
-    b, c, d, f, g, a = a[1]/2., a[2], a[3]/2., a[4]/2., a[5], a[0]
-    num = b*b - a*c
-    center_x = (c*d - b*f) / num
-    center_y = (a*f - b*d) / num
-    
-    up = 2 * (a*f*f + c*d*d + g*b*b - 2*b*d*f - a*c*g)
-    down1 = (b*b - a*c) * ((c-a) * np.sqrt(1 + 4*b*b/((a-c)*(a-c))) - (c+a))
-    down2 = (b*b - a*c) * ((a-c) * np.sqrt(1 + 4*b*b/((a-c)*(a-c))) - (c+a))
-    res1 = np.sqrt(up / down1)
-    res2 = np.sqrt(up / down2)
-    
-    # Semi-major and semi-minor axes
-    a, b = max(res1, res2), min(res1, res2)
-    
-    # Angle of rotation
-    angle = 0.5 * np.arctan(2*b / (a-c))
-    
-    return center_x, center_y, a, b, angle
+    center_x, center_y, a, b, angle: Parameters of the fitted ellipse (NaN if no ellipse fits)
+    """
+    return tuple(fit_ellipses(np.column_stack([x, y]))[0])
+
+def fit_ellipses(curves, offsets=None, features=None):
+    """
+    Fit an ellipse to every segment with the direct least-squares method, all at once.
+
+    This is the numerically stable form of Fitzgibbon's direct fit (Halir and Flusser,
+    1998): every segment is centered and scaled to unit RMS radius, its 6x6 scatter
+    matrix is built from segment-wise sums and split into 3x3 blocks, and the
+    ellipse-constrained eigenproblem is reduced to a 3x3 one. The blocks of all
+    segments are stacked, so a batch costs one solve and one eig call, and no
+    scatter matrix is inverted.
+
+    Args:
+    curves: CurveSet (one ellipse per segment), or an (n, 2) array of points split by offsets
+    offsets: Segment offsets (as CurveSet.segment_offsets) when curves is an array;
+             None for a single segment
+    features: SegmentFeatures of curves, whose centroids and RMS radii are reused
+
+    Returns:
+    Array of shape (k, 5) with center_x, center_y, a, b, angle per segment; NaN for
+    segments with fewer than 5 points or without an ellipse fit
+    """
+    if not isinstance(curves, CurveSet):
+        curves = CurveSet.from_segments(curves, offsets)
+    counts = curves.segment_lengths
+    ellipses = np.full((curves.n_segments, 5), np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if features is None:
+            centroids = curves.segment_reduce(curves.points) / counts[:, None]
+            centered = curves.points - np.repeat(centroids, counts, axis=0)
+            scales = np.sqrt(curves.segment_reduce((centered ** 2).sum(axis=1)) / counts)
+        else:
+            centroids, centered, scales = features.centroid, features.radial_vectors, features.radius_rms
+        x, y = (centered / np.repeat(scales, counts)[:, None]).T
+    D = np.column_stack([x*x, x*y, y*y, x, y, np.ones_like(x)])
+    S = curves.segment_reduce(D[:, :, None] * D[:, None, :])
+
+    # Quadratic (S1), mixed (S2) and linear (S3) blocks of the scatter matrices
+    S1, S2, S3 = S[:, :3, :3], S[:, :3, 3:], S[:, 3:, 3:]
+    valid = (counts >= 5) & (scales > 0) & np.isfinite(S).all(axis=(1, 2))
+    valid[valid] = np.abs(np.linalg.det(S3[valid])) > 1e-12 * counts[valid] ** 3.0
+    if not valid.any():
+        return ellipses
+
+    T = -np.linalg.solve(S3[valid], np.swapaxes(S2[valid], 1, 2))  # Linear part = T @ quadratic part
+    M = S1[valid] + S2[valid] @ T
+    M = np.stack([M[:, 2] / 2, -M[:, 1], M[:, 0] / 2], axis=1)  # Inverse of the constraint matrix times M
+    eigenvalues, eigenvectors = np.linalg.eig(M)
+    eigenvectors = eigenvectors.real
+    constraint = 4 * eigenvectors[:, 0] * eigenvectors[:, 2] - eigenvectors[:, 1] ** 2
+    constraint[np.abs(eigenvalues.imag) > 0] = -np.inf
+    best = np.argmax(constraint, axis=1)
+    quadratic = eigenvectors[np.arange(len(best)), :, best]
+    linear = (T @ quadratic[:, :, None])[:, :, 0]
+
+    params = conic_to_ellipse(np.concatenate([quadratic, linear], axis=1))
+    params[constraint[np.arange(len(best)), best] <= 0] = np.nan
+    scale = scales[valid, None]
+    params[:, :2] = params[:, :2] * scale + centroids[valid]
+    params[:, 2:4] *= scale
+    ellipses[valid] = params
+    return ellipses
+
+def ellipse_errors(curves, ellipses):
+    """
+    Mean algebraic distance |x'^2/a^2 + y'^2/b^2 - 1| of every segment to its ellipse.
+
+    Args:
+    curves: CurveSet with the segments
+    ellipses: Array of shape (k, 5) with one ellipse per segment
+
+    Returns:
+    Array of shape (k,); NaN for segments without an ellipse
+    """
+    counts = curves.segment_lengths
+    center_x, center_y, a, b, angle = np.repeat(ellipses, counts, axis=0).T
+    cos_angle, sin_angle = np.cos(angle), np.sin(angle)
+    x_centered = curves.points[:, 0] - center_x
+    y_centered = curves.points[:, 1] - center_y
+    x_rot = x_centered * cos_angle + y_centered * sin_angle
+    y_rot = -x_centered * sin_angle + y_centered * cos_angle
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distances = np.abs(x_rot**2 / a**2 + y_rot**2 / b**2 - 1)
+        return curves.segment_reduce(distances, empty=np.nan) / counts
+
+def conic_to_ellipse(conics):
+    """
+    Convert conic coefficients to ellipse parameters.
+
+    Args:
+    conics: Array of shape (..., 6) with the coefficients (A, B, C, D, E, F) of
+            A x^2 + B xy + C y^2 + D x + E y + F = 0, in any scale and sign
+
+    Returns:
+    Array of shape (..., 5) with center_x, center_y, a, b, angle (a >= b, angle of the
+    a axis in (-pi/2, pi/2]); NaN where the conic is not a real ellipse
+    """
+    conics = np.asarray(conics, dtype=float)
+    conics = conics * np.where(conics[..., 0] + conics[..., 2] < 0, -1.0, 1.0)[..., None]
+    A, B, C, D, E, F = np.moveaxis(conics, -1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        det = 4*A*C - B*B
+        center_x = (B*E - 2*C*D) / det
+        center_y = (B*D - 2*A*E) / det
+        f0 = F + (D*center_x + E*center_y) / 2  # Conic value at the center
+        half_sum, radius = (A + C) / 2, np.hypot((A - C) / 2, B / 2)
+        a = np.sqrt(-f0 / (half_sum - radius))  # Along the smaller eigenvalue
+        b = np.sqrt(-f0 / (half_sum + radius))
+    angle = 0.5 * np.arctan2(-B, C - A)  # Perpendicular to the axis of the larger eigenvalue
+    params = np.stack([center_x, center_y, a, b, angle], axis=-1)
+    valid = (det > 0) & np.isfinite(params).all(axis=-1)
+    return np.where(valid[..., None], params, np.nan)
 
 def detect_ellipse(points, tolerance=0.1):
     """
@@ -54,28 +143,22 @@ def detect_ellipse(points, tolerance=0.1):
     is_ellipse: boolean indicating if the points form an ellipse
     params: parameters of the fitted ellipse (center_x, center_y, a, b, angle) if is_ellipse is True, else None
     """
-    x, y = points[:, 0], points[:, 1]
-    
-    # Fit ellipse
-    center_x, center_y, a, b, angle = fit_ellipse(x, y)
-    
-    # Calculate distances from points to the fitted ellipse
-    cos_angle, sin_angle = np.cos(angle), np.sin(angle)
-    x_centered = x - center_x
-    y_centered = y - center_y
-    x_rot = x_centered * cos_angle + y_centered * sin_angle
-    y_rot = -x_centered * sin_angle + y_centered * cos_angle
-    distances = np.abs(x_rot**2 / a**2 + y_rot**2 / b**2 - 1)
-    
-    # Check if the average distance is within the tolerance
-    is_ellipse = np.mean(distances) < tolerance
-    
-    return is_ellipse, (center_x, center_y, a, b, angle) if is_ellipse else None
+    return _detect_batch(CurveSet.from_segments(points), tolerance)[0]
+
+def _detect_batch(curves, tolerance, features=None):
+    """
+    Fit and test every segment of a CurveSet; a list of (is_ellipse, params) pairs.
+    """
+    ellipses = fit_ellipses(curves, features=features)
+    is_ellipse = ellipse_errors(curves, ellipses) < tolerance
+    return [(bool(ok), tuple(params) if ok else None) for ok, params in zip(is_ellipse, ellipses)]
 
 def detect_ellipses_in_curves(curves, tolerance=0.1):
     """
     Detect ellipses in the given set of curves.
     
+    All curves are fitted together in one batch.
+    
     Args:
     curves: List of curves, where each curve is a list of numpy arrays
     tolerance: Maximum allowed average distance from points to the fitted ellipse
@@ -83,13 +166,32 @@ def detect_ellipses_in_curves(curves, tolerance=0.1):
     Returns:
     List of tuples (is_ellipse, params) for each curve
     """
-    results = []
-    for curve in curves:
-        # Concatenate all points in the curve
-        points = np.concatenate(curve)
-        is_ellipse, params = detect_ellipse(points, tolerance)
-        results.append((is_ellipse, params))
-    return results
+    # Concatenate all points in each curve; every curve becomes one segment
+    segments = [np.concatenate(curve) for curve in curves]
+    return _detect_batch(CurveSet.from_paths([segments]), tolerance)
+
+def detect_ellipses(paths_XYs, tolerance=0.1, cache=None):
+    """
+    Detect ellipses in every segment of the given paths.
+    
+    Segments are fitted in batches of ELLIPSE_BATCH, so a stream of paths is never
+    held in memory as a whole; a CurveSet, or paths with a cache, are fitted in one batch.
+    
+    Args:
+    paths_XYs: Iterable of paths, where each path is a list of numpy arrays of points
+               (a list from read_csv or a stream from iter_csv), or a CurveSet
+    tolerance: Maximum allowed average distance from points to the fitted ellipse
+    cache: FeatureCache shared with the other detectors of the same paths
+    
+    Returns:
+    List of ellipse parameters (center_x, center_y, a, b, angle), one per detected ellipse
+    """
+    ellipses = []
+    # Five points are needed to determine a conic (fit_ellipses rejects shorter segments)
+    for features in iter_features(paths_XYs, cache=cache, batch_size=ELLIPSE_BATCH):
+        ellipses.extend(params for is_ellipse, params in _detect_batch(features.curves, tolerance, features)
+                        if is_ellipse)
+    return ellipses
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,271 @@
+from functools import cached_property
+
+import numpy as np
+from scipy.spatial import ConvexHull, QhullError
+
+from ..curve_set import CurveSet, _offsets, iter_segment_batches
+from .simplify import reduce_to_corners
+
+# Segments per batch when features are computed over a stream of paths
+FEATURE_BATCH = 4096
+
+class SegmentFeatures:
+    """
+    Geometric features of every segment of a CurveSet, computed once for all segments.
+
+    Each feature is computed on first access with array operations over the whole
+    CurveSet and then kept, so detectors reading the same features share one pass.
+    Per-segment features have n_segments rows; per-vertex features are flat arrays
+    aligned with curves.points. Side vectors and turning angles treat every segment
+    as a closed polygon (the last vertex is joined back to the first).
+
+    Fits that a detector runs on some segments only can be kept in fits, by name, so a
+    fit made in a cascade stage is reused when the detected shapes are built.
+
+    Parameters:
+        curves (CurveSet): The segments.
+    """
+
+    def __init__(self, curves):
+        self.curves = curves
+        self.fits = {}
+        self._hulls = {}
+
+    def __len__(self):
+        return self.curves.n_segments
+
+    @cached_property
+    def lengths(self):
+        """Number of vertices of each segment."""
+        return self.curves.segment_lengths
+
+    @cached_property
+    def first(self):
+        """Index into curves.points of the first vertex of each segment (clipped for empty segments)."""
+        return np.minimum(self.curves.segment_offsets[:-1], max(self.curves.n_points - 1, 0))
+
+    @cached_property
+    def last(self):
+        """Index into curves.points of the last vertex of each segment (clipped for empty segments)."""
+        return np.maximum(self.curves.segment_offsets[1:] - 1, 0)
+
+    @cached_property
+    def next_index(self):
+        """Index of the next vertex of every vertex, wrapping around within its segment."""
+        index = np.arange(1, self.curves.n_points + 1)
+        nonempty = self.lengths > 0
+        index[self.last[nonempty]] = self.first[nonempty]
+        return index
+
+    @cached_property
+    def previous_index(self):
+        """Index of the previous vertex of every vertex, wrapping around within its segment."""
+        index = np.empty(self.curves.n_points, dtype=np.intp)
+        index[self.next_index] = np.arange(self.curves.n_points)
+        return index
+
+    @cached_property
+    def centroid(self):
+        """Mean vertex of each segment, shape (k, 2); NaN for empty segments."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.curves.segment_reduce(self.curves.points) / self.lengths[:, None]
+
+    @cached_property
+    def bbox(self):
+        """Bounding box (min_x, min_y, max_x, max_y) of each segment, shape (k, 4); NaN for empty segments."""
+        low = self.curves.segment_reduce(self.curves.points, np.minimum, empty=np.nan)
+        high = self.curves.segment_reduce(self.curves.points, np.maximum, empty=np.nan)
+        return np.column_stack([low, high])
+
+    @cached_property
+    def closure_gap(self):
+        """Distance between the first and the last vertex of each segment; NaN for empty segments."""
+        if not self.curves.n_points:
+            return np.full(len(self), np.nan)
+        gap = np.hypot(*(self.curves.points[self.last] - self.curves.points[self.first]).T)
+        return np.where(self.lengths > 0, gap, np.nan)
+
+    @cached_property
+    def radial_vectors(self):
+        """Vector from the segment centroid to every vertex, shape (n, 2)."""
+        return self.curves.points - np.repeat(self.centroid, self.lengths, axis=0)
+
+    @cached_property
+    def radii(self):
+        """Distance of every vertex to its segment centroid."""
+        return np.hypot(*self.radial_vectors.T)
+
+    @cached_property
+    def polar_angles(self):
+        """Angle of every vertex around its segment centroid, in radians."""
+        return np.arctan2(self.radial_vectors[:, 1], self.radial_vectors[:, 0])
+
+    @cached_property
+    def radius_mean(self):
+        """Mean distance of the vertices to the centroid of each segment."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.curves.segment_reduce(self.radii) / self.lengths
+
+    @cached_property
+    def radius_rms(self):
+        """Root mean square distance of the vertices to the centroid of each segment."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.sqrt(self.curves.segment_reduce(self.radii ** 2) / self.lengths)
+
+    @cached_property
+    def radius_std(self):
+        """Standard deviation of the distances of the vertices to the centroid of each segment."""
+        return np.sqrt(np.maximum(self.radius_rms ** 2 - self.radius_mean ** 2, 0))
+
+    @cached_property
+    def sides(self):
+        """Vector from every vertex to the next one, shape (n, 2); the last vertex closes the segment."""
+        return self.curves.points[self.next_index] - self.curves.points
+
+    @cached_property
+    def side_lengths(self):
+        """Length of every side."""
+        return np.hypot(*self.sides.T)
+
+    @cached_property
+    def arc_length(self):
+        """Length of each segment as an open polyline (without the closing side)."""
+        open_sides = self.side_lengths.copy()
+        open_sides[self.last[self.lengths > 0]] = 0
+        return self.curves.segment_reduce(open_sides)
+
+    @cached_property
+    def area(self):
+        """Signed (shoelace) area of each segment as a closed polygon, positive when counterclockwise."""
+        x, y = self.curves.points.T
+        following = self.curves.points[self.next_index]
+        return 0.5 * self.curves.segment_reduce(x * following[:, 1] - following[:, 0] * y)
+
+    @cached_property
+    def turning_angles(self):
+        """Signed angle from the incoming to the outgoing side at every vertex, in radians."""
+        incoming, outgoing = self.sides[self.previous_index], self.sides
+        cross = incoming[:, 0] * outgoing[:, 1] - incoming[:, 1] * outgoing[:, 0]
+        return np.arctan2(cross, (incoming * outgoing).sum(axis=1))
+
+    def vertex_rows(self, values, segments, size):
+        """
+        Gather a per-vertex array for segments that all have the same number of vertices.
+
+        Parameters:
+            values (numpy array): Per-vertex array (n, ...).
+            segments (numpy array): Indices of segments with size vertices each.
+            size (int): Number of vertices of these segments.
+
+        Returns:
+            numpy array: Array of shape (len(segments), size, ...).
+        """
+        return values[self.curves.segment_offsets[:-1][segments][:, None] + np.arange(size)]
+
+    def subset(self, segments):
+        """
+        Features of some segments only, for tests that need not run over all of them.
+        
+        Parameters:
+            segments (numpy array): Segment indices.
+        
+        Returns:
+            SegmentFeatures: Features of a CurveSet (one path) of these segments, in this order.
+        """
+        segments = np.asarray(segments, dtype=np.intp)
+        lengths = self.lengths[segments]
+        offsets = _offsets(lengths)
+        index = np.arange(offsets[-1]) + np.repeat(self.curves.segment_offsets[:-1][segments] - offsets[:-1], lengths)
+        return SegmentFeatures(CurveSet(self.curves.points[index], offsets, np.array([0, len(segments)])))
+
+    def hull(self, index):
+        """
+        Convex hull of one segment, computed on first use.
+
+        Parameters:
+            index (int): Segment index.
+
+        Returns:
+            scipy.spatial.ConvexHull: The hull, or None for fewer than 3 or collinear vertices.
+        """
+        if index not in self._hulls:
+            XY = self.curves.segment(index)
+            try:
+                self._hulls[index] = ConvexHull(XY) if len(XY) >= 3 else None
+            except QhullError:
+                self._hulls[index] = None
+        return self._hulls[index]
+
+class FeatureCache:
+    """
+    Memo of SegmentFeatures keyed by the identity of the segment arrays.
+
+    Detectors given the same cache and the same paths (the same list of the same
+    arrays, or the same CurveSet) share one SegmentFeatures, so running all of them
+    costs one feature pass. The cache keeps references to the segments it has seen,
+    so their identities stay valid; use one cache per drawing.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    @staticmethod
+    def _key(paths_XYs):
+        if isinstance(paths_XYs, CurveSet):
+            return id(paths_XYs), (paths_XYs,)
+        segments = tuple(XY for path in paths_XYs for XY in path)
+        return tuple(len(path) for path in paths_XYs) + tuple(map(id, segments)), segments
+
+    def features(self, paths_XYs, simplify=None):
+        """
+        Features of all segments of paths, computed on the first request.
+
+        Parameters:
+            paths_XYs (list or CurveSet): Paths from read_csv (a list, not a stream), or a CurveSet.
+            simplify (float or str): When given, the features of the segments reduced to
+                their corners with this ratio or method (see simplify.reduce_to_corners).
+
+        Returns:
+            SegmentFeatures: Features of a CurveSet with the paths and segments of paths_XYs.
+        """
+        key, segments = self._key(paths_XYs)
+        entry = self._entries.get((key, simplify))
+        if entry is None:
+            if simplify is None:
+                curves = paths_XYs if isinstance(paths_XYs, CurveSet) else CurveSet.from_paths(paths_XYs)
+            else:
+                curves = self.features(paths_XYs).curves
+                curves = reduce_to_corners(curves, simplify)
+            entry = self._entries[key, simplify] = (segments, SegmentFeatures(curves))
+        return entry[1]
+
+def iter_features(paths_XYs, simplify=None, cache=None, batch_size=FEATURE_BATCH):
+    """
+    Iterate over the features of the segments of paths.
+
+    With a cache, a list of paths or a CurveSet is looked up (or computed once) as a
+    whole; otherwise, and for streams, segments are processed in batches of batch_size.
+
+    Parameters:
+        paths_XYs (iterable or CurveSet): Paths from read_csv or iter_csv, or a CurveSet.
+        simplify (float or str): When given, segments are first reduced to their corners
+            with this ratio or method (see simplify.reduce_to_corners).
+        cache (FeatureCache): Shared features of a drawing.
+        batch_size (int): Segments per batch without a cache.
+
+    Yields:
+        SegmentFeatures: Features of consecutive groups of segments, in input order.
+    """
+    if cache is not None and isinstance(paths_XYs, (list, tuple, CurveSet)):
+        yield cache.features(paths_XYs, simplify)
+        return
+    for batch in iter_segment_batches(paths_XYs, batch_size):
+        if simplify is not None:
+            batch = reduce_to_corners(batch, simplify)
+        yield SegmentFeatures(batch)
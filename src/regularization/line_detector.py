@@ -1,36 +1,79 @@
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error
 
-def detect_lines(paths_XYs, threshold=0.01):
+from ..curve_set import CurveSet
+from .features import iter_features
+
+# Segments fitted together by detect_lines, which may be given a stream of paths
+LINE_BATCH = 65536
+
+def fit_lines(curves, offsets=None, features=None):
+    """
+    Fit a total-least-squares line to every segment at once.
+
+    The centroid and the 2x2 covariance of every segment come from segment-wise sums
+    (np.add.reduceat through CurveSet.segment_reduce). The line runs through the
+    centroid along the principal axis, and its residual is the smaller eigenvalue of
+    the covariance: the mean squared perpendicular distance of the points, which
+    treats vertical lines like any other.
+
+    Parameters:
+        curves (CurveSet or numpy array): A CurveSet (one line per segment), or an (n, 2)
+            array of points split by offsets.
+        offsets (numpy array): Segment offsets (as CurveSet.segment_offsets) when curves is
+            an array; None for a single segment.
+        features (SegmentFeatures): Features of curves, whose centroids are reused.
+
+    Returns:
+        tuple: (endpoints, residuals). endpoints has shape (k, 2, 2): the first and last
+        point of every segment projected onto its line. residuals has shape (k,); NaN for
+        segments with fewer than 2 points.
+    """
+    if not isinstance(curves, CurveSet):
+        curves = CurveSet.from_segments(curves, offsets)
+    counts = curves.segment_lengths
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if features is None:
+            centroids = curves.segment_reduce(curves.points) / counts[:, None]
+            x, y = (curves.points - np.repeat(centroids, counts, axis=0)).T
+        else:
+            centroids, (x, y) = features.centroid, features.radial_vectors.T
+        sxx, syy, sxy = (curves.segment_reduce(np.column_stack([x * x, y * y, x * y])) / counts[:, None]).T
+
+    half_trace, radius = (sxx + syy) / 2, np.hypot((sxx - syy) / 2, sxy)
+    residuals = np.where(counts >= 2, np.maximum(half_trace - radius, 0), np.nan)
+    angle = 0.5 * np.arctan2(2 * sxy, sxx - syy)
+    direction = np.column_stack([np.cos(angle), np.sin(angle)])
+
+    # First and last point of every segment (empty segments read a neighbour; their residual is NaN)
+    ends = np.clip(np.column_stack([curves.segment_offsets[:-1], curves.segment_offsets[1:] - 1]),
+                   0, max(curves.n_points - 1, 0))
+    endpoints = curves.points[ends] if curves.n_points else np.zeros((curves.n_segments, 2, 2))
+    along = ((endpoints - centroids[:, None]) * direction[:, None]).sum(axis=2)
+    endpoints = centroids[:, None] + along[:, :, None] * direction[:, None]
+    return endpoints, residuals
+
+def detect_lines(paths_XYs, threshold=0.01, cache=None):
     """
     Detects straight lines from given paths (polylines).
     
+    Segments are fitted in batches of LINE_BATCH (see fit_lines); a CurveSet, or paths
+    with a cache, are fitted in one batch.
+    
     Parameters:
-        paths_XYs (list): List of paths, where each path is a numpy array of points.
-        threshold (float): Error threshold to determine if a polyline can be approximated as a straight line.
+        paths_XYs (iterable): Paths from read_csv or iter_csv, where each path is a list of numpy arrays of
+            points, or a CurveSet.
+        threshold (float): Error threshold to determine if a polyline can be approximated as a straight line,
+            on the mean squared perpendicular distance of its points.
+        cache (FeatureCache): Features shared with the other detectors of the same paths.
 
     Returns:
         line_segments (list): List of detected line segments. Each line is represented by two points.
     """
     line_segments = []
-
-    for path in paths_XYs:
-        for XY in path:
-            if XY.shape[0] < 2:  # Less than 2 points cannot form a line
-                continue
-            
-            # Perform linear regression to fit a line
-            model = LinearRegression()
-            X = XY[:, 0].reshape(-1, 1)
-            y = XY[:, 1]
-            model.fit(X, y)
-            predictions = model.predict(X)
-            
-            # Calculate the mean squared error to check if it's a straight line
-            error = mean_squared_error(y, predictions)
-            if error < threshold:
-                line_segments.append([XY[0], XY[-1]])  # Store as line segment (start and end points)
+    # Less than 2 points cannot form a line (their residual is NaN)
+    for features in iter_features(paths_XYs, cache=cache, batch_size=LINE_BATCH):
+        endpoints, residuals = fit_lines(features.curves, features=features)
+        line_segments.extend(list(segment) for segment in endpoints[residuals < threshold])
 
     return line_segments
 
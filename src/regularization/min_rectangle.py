@@ -0,0 +1,160 @@
+import numpy as np
+from scipy.spatial import ConvexHull, QhullError
+
+from ..curve_set import CurveSet, _offsets
+
+def _qhull(XY):
+    try:
+        return ConvexHull(XY) if len(XY) >= 3 else None
+    except QhullError:  # Collinear or repeated points
+        return None
+
+def convex_hulls(curves, segments=None, hull=None):
+    """
+    Convex hull of every segment, counterclockwise.
+
+    Every hull is computed by Qhull in O(n log n). Collinear segments get their two
+    extreme points, and segments of fewer than 3 points their distinct points.
+
+    Parameters:
+        curves (CurveSet): The segments.
+        segments (numpy array): Indices of the segments to compute hulls of; the others
+            get empty hulls. None computes all of them.
+        hull (callable): Maps a segment index to its scipy ConvexHull, or None when it
+            has none, e.g. SegmentFeatures.hull to reuse hulls other detectors computed;
+            None runs Qhull here.
+
+    Returns:
+        tuple: (indices, offsets). indices are the hull vertices as indices into
+        curves.points; the hull of segment s is indices[offsets[s]:offsets[s + 1]].
+    """
+    hulls = [np.zeros(0, dtype=np.intp)] * curves.n_segments
+    for index in range(curves.n_segments) if segments is None else segments:
+        XY = curves.segment(index)
+        segment_hull = _qhull(XY) if hull is None else hull(index)
+        if segment_hull is not None:
+            vertices = segment_hull.vertices
+        else:
+            order = np.lexsort((XY[:, 1], XY[:, 0]))
+            vertices = np.unique(order[[0, -1]]) if len(XY) else order
+        hulls[index] = curves.segment_offsets[index] + vertices
+    indices = np.concatenate(hulls).astype(np.intp) if hulls else np.zeros(0, dtype=np.intp)
+    return indices, _offsets([len(vertices) for vertices in hulls])
+
+def min_area_rectangles(curves, hulls=None, segments=None):
+    """
+    Minimum-area enclosing rectangle of every segment, by rotating calipers.
+
+    The smallest enclosing rectangle has a side on an edge of the convex hull
+    (Freeman and Shapira, 1975). The calipers are run for all hull edges of all
+    segments at once: the hull edge angles increase around every hull, so the vertex
+    touching a caliper of any direction is found with one searchsorted call over the
+    edge angles of all hulls. Every edge then gives the width, height and area of its
+    rectangle, and the smallest area per segment wins.
+
+    Parameters:
+        curves (CurveSet): The segments.
+        hulls (tuple): (indices, offsets) from convex_hulls, if already computed.
+        segments (numpy array): Indices of the segments to fit, when hulls is None; None
+            fits all of them.
+
+    Returns:
+        numpy array: Array of shape (k, 5) with center_x, center_y, width, height, angle
+        per segment, where width runs along the direction angle in [0, pi/2); NaN for
+        empty segments and the ones not fitted.
+    """
+    indices, offsets = convex_hulls(curves, segments) if hulls is None else hulls
+    sizes = np.diff(offsets)
+    rectangles = np.full((curves.n_segments, 5), np.nan)
+    if not len(indices):
+        return rectangles
+    segment = np.repeat(np.arange(curves.n_segments), sizes)
+    first = offsets[:-1][segment]
+    local = np.arange(len(indices)) - first
+    hull = curves.points[indices]
+
+    following = np.where(local == sizes[segment] - 1, first, np.arange(len(indices)) + 1)
+    edges = hull[following] - hull
+    angles = np.arctan2(edges[:, 1], edges[:, 0])
+    # Edge angles unwrapped to increase from 0 within every hull
+    turns = np.where(local == 0, 0, np.mod(angles - np.roll(angles, 1), 2 * np.pi))
+    cumulative = np.cumsum(turns)
+    unwrapped = cumulative - cumulative[first]
+    keys = unwrapped + segment * 4 * np.pi
+
+    def support(turn):
+        # The vertex touching a caliper turned by turn from every edge: the first vertex
+        # whose outgoing edge is at least as far around the hull
+        queries = np.mod(unwrapped + turn, 2 * np.pi) + segment * 4 * np.pi
+        vertex = np.searchsorted(keys, queries)
+        return np.where(vertex == offsets[1:][segment], first, vertex)
+
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u = np.where(lengths[:, None] > 0, edges / lengths[:, None], [1.0, 0.0])
+    normal = np.column_stack([-u[:, 1], u[:, 0]])  # Points inside the counterclockwise hull
+    high = (hull[support(np.pi / 2)] * u).sum(axis=1)
+    low = (hull[support(3 * np.pi / 2)] * u).sum(axis=1)
+    near = (hull * normal).sum(axis=1)
+    far = (hull[support(np.pi)] * normal).sum(axis=1)
+    width, height = high - low, far - near
+
+    best = np.lexsort((width * height, segment))[offsets[:-1][sizes > 0]]
+    center = u[best] * (high[best] + low[best])[:, None] / 2 + normal[best] * (near[best] + far[best])[:, None] / 2
+    width, height, angle = width[best], height[best], angles[best]
+    # Turn the rectangle by quarter turns until its angle is in [0, pi/2)
+    quarter_turns = np.floor(angle / (np.pi / 2)).astype(int)
+    swap = quarter_turns % 2 == 1
+    width, height = np.where(swap, height, width), np.where(swap, width, height)
+    rectangles[sizes > 0] = np.column_stack([center, width, height, angle - quarter_turns * np.pi / 2])
+    return rectangles
+
+def rectangle_corners(rectangles):
+    """
+    Corners of rectangles (center_x, center_y, width, height, angle), counterclockwise.
+
+    Returns:
+        numpy array: Array of shape (k, 4, 2).
+    """
+    center_x, center_y, width, height, angle = np.asarray(rectangles, dtype=float).reshape(-1, 5).T
+    u = np.column_stack([np.cos(angle), np.sin(angle)])
+    v = np.column_stack([-u[:, 1], u[:, 0]])
+    signs = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]]) / 2
+    return np.column_stack([center_x, center_y])[:, None] + signs[:, :1] * (width[:, None] * u)[:, None] + \
+        signs[:, 1:] * (height[:, None] * v)[:, None]
+
+def rectangle_residuals(curves, rectangles):
+    """
+    Root mean square distance of the points of every segment to the outline of its rectangle.
+
+    Parameters:
+        curves (CurveSet): The segments.
+        rectangles (numpy array): Array of shape (k, 5) with one rectangle per segment.
+
+    Returns:
+        numpy array: Array of shape (k,); NaN for empty segments.
+    """
+    center_x, center_y, width, height, angle = np.repeat(rectangles, curves.segment_lengths, axis=0).T
+    dx, dy = curves.points[:, 0] - center_x, curves.points[:, 1] - center_y
+    # Distances beyond the half sides along both rectangle axes (negative inside)
+    over_x = np.abs(dx * np.cos(angle) + dy * np.sin(angle)) - width / 2
+    over_y = np.abs(-dx * np.sin(angle) + dy * np.cos(angle)) - height / 2
+    outside = np.hypot(np.maximum(over_x, 0), np.maximum(over_y, 0))
+    distances = np.where((over_x > 0) | (over_y > 0), outside, -np.maximum(over_x, over_y))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sqrt(curves.segment_reduce(distances ** 2, empty=np.nan) / curves.segment_lengths)
+
+def fit_min_area_rectangle(points):
+    """
+    Minimum-area rectangle around a set of points, with its residual.
+
+    Parameters:
+        points (numpy array): Array of shape (n, 2).
+
+    Returns:
+        tuple: ((center_x, center_y, width, height, angle), root mean square distance
+        of the points to the rectangle outline).
+    """
+    curves = CurveSet.from_segments(points)
+    rectangles = min_area_rectangles(curves)
+    return tuple(rectangles[0]), float(rectangle_residuals(curves, rectangles)[0])
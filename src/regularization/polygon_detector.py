@@ -1,68 +1,115 @@
 import numpy as np
-from scipy.spatial import ConvexHull
 
-def is_polygon(XY, tolerance=0.01):
+from ..curve_set import CurveSet
+from .cascade import Cascade, bbox_aspect, point_count, radial_spread
+from .features import SegmentFeatures, iter_features
+from .simplify import CORNER_TOLERANCE
+
+# Loose bounds that every regular polygon meets, checked before its convex hull is built:
+# its bounding box is at least as square as an equilateral triangle's and its vertices
+# lie on a circle. Both get a slack of POLYGON_SLACK times the tolerance per vertex, as
+# much as the sides of a polygon passing the regularity test can move its vertices, and
+# neither depends on the order of the points.
+POLYGON_MIN_ASPECT = 0.5
+POLYGON_RADIAL_SPREAD = 0.1
+POLYGON_SLACK = 2
+
+def _is_regular(hull_points, tolerance):
     """
-    Determines if a given set of points forms a regular polygon.
+    Whether the vertices of a convex hull (in hull order) have equal sides and angles.
+    """
+    # Calculate distances between consecutive points
+    vectors = np.roll(hull_points, -1, axis=0) - hull_points
+    side_lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+
+    # Calculate angles between consecutive sides using the dot product
+    next_vectors = np.roll(vectors, -1, axis=0)
+    cos_angles = (vectors * next_vectors).sum(axis=1) / (side_lengths * np.roll(side_lengths, -1))
+    angles = np.degrees(np.arccos(np.clip(cos_angles, -1.0, 1.0)))
+
+    # Check for equal side lengths and angles within the given tolerance
+    return np.allclose(side_lengths, side_lengths[0], atol=tolerance) and \
+        np.allclose(angles, angles[0], atol=tolerance)
+
+def polygon_mask(features, tolerance=0.01, segments=None):
+    """
+    Tests segments of a SegmentFeatures for being a regular polygon.
     
     Parameters:
-        XY (numpy array): Array of points representing a polyline.
+        features (SegmentFeatures): Features of the segments (their convex hulls).
         tolerance (float): Tolerance for checking regularity of sides and angles.
+        segments (numpy array): Indices of the segments to test; None tests all of them.
     
     Returns:
-        is_polygon (bool): True if the points form a regular polygon, False otherwise.
+        mask (numpy array): Boolean array over all segments with True for the tested ones that form a
+            regular polygon.
     """
-    if len(XY) < 3:  # A polygon must have at least 3 sides
-        return False
-    
-    # Compute the convex hull of the points
-    hull = ConvexHull(XY)
-    hull_points = XY[hull.vertices]
-
-    # Check if the number of hull points matches the number of points in the array (simple polygon)
-    if len(hull_points) != len(XY):
-        return False
-
-    # Calculate distances between consecutive points
-    side_lengths = np.sqrt(np.sum(np.diff(hull_points, axis=0)**2, axis=1))
-    side_lengths = np.append(side_lengths, np.linalg.norm(hull_points[0] - hull_points[-1]))
+    mask = np.zeros(len(features), dtype=bool)
+    segments = np.arange(len(features)) if segments is None else np.asarray(segments)
+    # A polygon must have at least 3 sides
+    for index in segments[features.lengths[segments] >= 3]:
+        hull = features.hull(index)
+        # All points must be hull vertices (simple convex polygon)
+        if hull is None or len(hull.vertices) != features.lengths[index]:
+            continue
+        mask[index] = _is_regular(features.curves.segment(index)[hull.vertices], tolerance)
+    return mask
 
-    # Calculate angles between consecutive sides using the dot product
-    vectors = np.diff(hull_points, axis=0)
-    vectors = np.vstack((vectors, hull_points[0] - hull_points[-1]))
+def polygon_cascade(tolerance=0.01):
+    """
+    Classification cascade for regular polygons: vertex count, bounding box aspect,
+    and radial spread (see POLYGON_*) prune segments before the regularity test of
+    polygon_mask, and never reject a segment it accepts.
+    
+    Parameters:
+        tolerance (float): Tolerance for checking regularity of sides and angles.
+    
+    Returns:
+        cascade (Cascade): The cascade, with zeroed counters.
+    """
+    return Cascade([
+        ('points', point_count(3)),
+        ('bbox', bbox_aspect(POLYGON_MIN_ASPECT, POLYGON_SLACK * tolerance)),
+        ('radial', radial_spread(POLYGON_RADIAL_SPREAD, POLYGON_SLACK * tolerance)),
+        ('regular', lambda features, segments: polygon_mask(features, tolerance, segments)[segments]),
+    ])
 
-    angles = []
-    for i in range(len(vectors)):
-        vec1 = vectors[i]
-        vec2 = vectors[(i+1) % len(vectors)]
-        cos_angle = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
-        angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
-        angles.append(np.degrees(angle))
+def is_polygon(XY, tolerance=0.01):
+    """
+    Determines if a given set of points forms a regular polygon.
     
-    # Check for equal side lengths and angles within the given tolerance
-    if np.allclose(side_lengths, side_lengths[0], atol=tolerance) and \
-       np.allclose(angles, angles[0], atol=tolerance):
-        return True
+    Parameters:
+        XY (numpy array): Array of points representing a polyline.
+        tolerance (float): Tolerance for checking regularity of sides and angles.
     
-    return False
+    Returns:
+        is_polygon (bool): True if the points form a regular polygon, False otherwise.
+    """
+    return bool(polygon_cascade(tolerance)(SegmentFeatures(CurveSet.from_segments(XY)))[0])
 
-def detect_polygons(paths_XYs, tolerance=0.01):
+def detect_polygons(paths_XYs, tolerance=0.01, simplify=CORNER_TOLERANCE, cache=None, cascade=None):
     """
     Detects regular polygons from given paths (polylines).
     
     Parameters:
-        paths_XYs (list): List of paths, where each path is a numpy array of points.
+        paths_XYs (iterable): Paths from read_csv or iter_csv, where each path is a list of numpy arrays of points.
         tolerance (float): Tolerance for detecting regular polygons.
+        simplify (float or str): Segments are first reduced to their corners, within this fraction of their
+            size or at the peaks of their turning angle with 'curvature' (see reduce_to_corners); None tests
+            the points as given.
+        cache (FeatureCache): Features shared with the other detectors of the same paths.
+        cascade (Cascade): Classification cascade, whose counters record how many segments each
+            stage pruned; defaults to polygon_cascade(tolerance).
     
     Returns:
         polygons (list): List of detected polygons. Each polygon is represented by its vertices.
     """
     polygons = []
+    cascade = polygon_cascade(tolerance) if cascade is None else cascade
 
-    for path in paths_XYs:
-        for XY in path:
-            if is_polygon(XY, tolerance):
-                polygons.append(XY)
+    for features in iter_features(paths_XYs, simplify, cache):
+        for index in np.flatnonzero(cascade(features)):
+            polygons.append(features.curves.segment(index))
 
     return polygons
 
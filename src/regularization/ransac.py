@@ -0,0 +1,279 @@
+import numpy as np
+
+from .circle_fit import fit_circles
+from .ellipse_detector import conic_to_ellipse
+
+# Elements of the (models, points) residual array scored at once
+SCORE_CHUNK = 2**20
+# Largest number of RANSAC searches per detection call, accepted or rejected
+MAX_ATTEMPTS = 50
+
+def normalize(points):
+    """
+    Center points on their mean and scale them to unit RMS distance, so thresholds and
+    conic coefficients are well conditioned whatever the drawing size.
+
+    Returns:
+        tuple: (normalized points, origin, scale), with points = normalized * scale + origin.
+    """
+    origin = points.mean(axis=0)
+    scale = np.sqrt(((points - origin) ** 2).sum(axis=1).mean()) or 1.0
+    return (points - origin) / scale, origin, scale
+
+def sample_indices(rng, n, n_samples, sample_size):
+    """
+    Draw n_samples sets of sample_size distinct indices below n.
+
+    Every index is drawn among the n - j not drawn yet, in O(sample_size**2) per
+    sample whatever n is.
+    """
+    samples = np.empty((n_samples, sample_size), dtype=np.intp)
+    for j in range(sample_size):
+        index = rng.integers(0, n - j, size=n_samples)
+        # Step over the indices already drawn, in increasing order
+        for drawn in np.sort(samples[:, :j], axis=1).T:
+            index += index >= drawn
+        samples[:, j] = index
+    return samples
+
+def ransac(points, sample_size, fit, residuals, threshold, confidence=0.99, max_iterations=2000,
+           batch_size=64, rng=None):
+    """
+    Find the model with the most inliers by random minimal samples.
+
+    Samples are drawn and fitted in batches, and every batch of models is scored
+    against all points with one array operation (in chunks of SCORE_CHUNK residuals).
+    The number of iterations adapts to the best inlier ratio w found so far: it stops
+    once log(1 - confidence) / log(1 - w**sample_size) samples have been drawn, or at
+    max_iterations.
+
+    Parameters:
+        points (numpy array): Array of shape (n, 2).
+        sample_size (int): Points per minimal sample.
+        fit (callable): Maps samples of shape (m, sample_size, 2) to (models of shape
+            (m, k), boolean array of shape (m,) marking the valid ones).
+        residuals (callable): Maps models (m, k) and points (n, 2) to distances (m, n).
+        threshold (float): Maximum distance of an inlier.
+        confidence (float): Probability of drawing at least one all-inlier sample.
+        max_iterations (int): Upper bound on the number of samples.
+        batch_size (int): Samples fitted and scored together.
+        rng (numpy.random.Generator): Random generator; a seeded one gives reproducible results.
+
+    Returns:
+        tuple: (model, inliers) with the best model and the boolean inlier mask of the
+        points, or (None, None) if no valid model was found.
+    """
+    rng = np.random.default_rng(rng)
+    n = len(points)
+    if n < sample_size:
+        return None, None
+
+    best_model, best_count = None, 0
+    iterations, needed = 0, max_iterations
+    chunk = max(1, SCORE_CHUNK // batch_size)
+    while iterations < needed:
+        samples = points[sample_indices(rng, n, min(batch_size, needed - iterations), sample_size)]
+        iterations += len(samples)
+        models, valid = fit(samples)
+        if not valid.any():
+            continue
+        models = models[valid]
+        counts = np.zeros(len(models), dtype=np.int64)
+        for start in range(0, n, chunk):
+            counts += (residuals(models, points[start:start + chunk]) < threshold).sum(axis=1)
+
+        best = np.argmax(counts)
+        if counts[best] > best_count:
+            best_model, best_count = models[best], counts[best]
+            inlier_ratio = best_count / n
+            if inlier_ratio >= 1:
+                break
+            needed = min(max_iterations,
+                         int(np.ceil(np.log(1 - confidence) / np.log1p(-inlier_ratio ** sample_size))))
+
+    if best_model is None:
+        return None, None
+    return best_model, residuals(best_model[None], points)[0] < threshold
+
+def arc_coverage(angles, bins=36):
+    """
+    Fraction of the 360 degrees around a shape covered by points at the given angles.
+    """
+    occupied = np.unique((np.mod(angles, 2 * np.pi) * bins / (2 * np.pi)).astype(int) % bins)
+    return len(occupied) / bins
+
+def fit_circle_samples(samples):
+    """
+    Circles through every triple of points (circumcircles).
+
+    Returns:
+        tuple: (models of shape (m, 3) with x, y, r, validity mask; collinear triples are invalid).
+    """
+    (ax, ay), (bx, by), (cx, cy) = np.moveaxis(samples, (1, 2), (0, 1))
+    d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    a2, b2, c2 = ax * ax + ay * ay, bx * bx + by * by, cx * cx + cy * cy
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ux = (a2 * (by - cy) + b2 * (cy - ay) + c2 * (ay - by)) / d
+        uy = (a2 * (cx - bx) + b2 * (ax - cx) + c2 * (bx - ax)) / d
+    models = np.column_stack([ux, uy, np.hypot(ax - ux, ay - uy)])
+    return models, np.isfinite(models).all(axis=1)
+
+def circle_residuals(models, points):
+    """
+    Distances of points (n, 2) to circles (m, 3), shape (m, n).
+    """
+    dx = points[None, :, 0] - models[:, 0, None]
+    dy = points[None, :, 1] - models[:, 1, None]
+    return np.abs(np.hypot(dx, dy) - models[:, 2, None])
+
+def refine_circle(points):
+    """
+    Algebraic (Taubin) circle through the points (x, y, r).
+    """
+    return fit_circles(points)[0]
+
+def conic_design(points):
+    """
+    Rows (x^2, xy, y^2, x, y, 1) for points of shape (..., 2).
+    """
+    x, y = points[..., 0], points[..., 1]
+    return np.stack([x * x, x * y, y * y, x, y, np.ones_like(x)], axis=-1)
+
+def fit_ellipse_samples(samples):
+    """
+    Conics through every 5 points, kept when they are real ellipses.
+
+    Returns:
+        tuple: (conic coefficients of shape (m, 6), validity mask).
+    """
+    conics = np.linalg.svd(conic_design(samples))[2][:, -1]
+    return conics, ~np.isnan(conic_to_ellipse(conics)[:, 0])
+
+def conic_residuals(conics, points):
+    """
+    Sampson distances of points (n, 2) to conics (m, 6), shape (m, n): the conic value
+    over its gradient norm, a first-order approximation of the geometric distance.
+    """
+    x, y = points[None, :, 0], points[None, :, 1]
+    A, B, C, D, E, F = (conics[:, i, None] for i in range(6))
+    value = A * x * x + B * x * y + C * y * y + D * x + E * y + F
+    gx, gy = 2 * A * x + B * y + D, B * x + 2 * C * y + E
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.abs(value) / np.hypot(gx, gy)
+
+def refine_ellipse(points):
+    """
+    Algebraic least-squares conic through the points.
+    """
+    return np.linalg.svd(conic_design(points), full_matrices=False)[2][-1]
+
+def _detect(points, sample_size, fit, residuals, refine, accept, threshold, min_inliers, max_shapes, seed,
+            max_attempts=MAX_ATTEMPTS, **ransac_kwargs):
+    """
+    Find shapes one after the other, removing the inliers of every accepted shape.
+
+    Models are fitted in normalized coordinates; accept(model, inlier points, origin,
+    scale) turns a refined model into output parameters in drawing coordinates, or
+    returns None to reject it. The inliers of rejected models (a partial arc, a circle
+    out of the radius range) are removed as well, so they do not hide the shapes after
+    them; the search stops when no model has min_inliers inliers, or after
+    max_attempts searches.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) < max(sample_size, min_inliers):
+        return []
+    normalized, origin, scale = normalize(points)
+    rng = np.random.default_rng(seed)
+    remaining = np.arange(len(points))
+    shapes = []
+    for _ in range(max_attempts):
+        if len(shapes) >= max_shapes or len(remaining) < max(sample_size, min_inliers):
+            break
+        model, inliers = ransac(normalized[remaining], sample_size, fit, residuals, threshold / scale,
+                                rng=rng, **ransac_kwargs)
+        if model is None or inliers.sum() < min_inliers:
+            break
+        model = refine(normalized[remaining][inliers])
+        refined = residuals(model[None], normalized[remaining])[0] < threshold / scale
+        shape = accept(model, normalized[remaining][refined], origin, scale) if refined.sum() >= min_inliers else None
+        if shape is None:
+            refined |= inliers
+        else:
+            shapes.append(shape)
+        remaining = remaining[~refined]
+    return shapes
+
+def ransac_circles(points, threshold=2.0, min_inliers=20, radius_range=(0, np.inf), min_coverage=0.5,
+                   max_circles=10, confidence=0.99, max_iterations=2000, seed=None):
+    """
+    Detect circles among all points with RANSAC on 3-point samples.
+
+    Circles are found one at a time: the circle with the most inliers is refined by
+    least squares on them, and its inliers are removed before the next search.
+
+    Parameters:
+        points (numpy array): Array of shape (n, 2) with all points.
+        threshold (float): Maximum distance of an inlier to the circle, in drawing units.
+        min_inliers (int): Minimum number of inliers of a circle.
+        radius_range (tuple): (min_radius, max_radius) of the circles.
+        min_coverage (float): Minimum fraction of the circumference the inliers must cover.
+        max_circles (int): Maximum number of circles to detect.
+        confidence (float): RANSAC confidence, which sets the adaptive iteration count.
+        max_iterations (int): Maximum number of samples per circle.
+        seed (int or numpy.random.Generator): Seed for reproducible results.
+
+    Returns:
+        list: Tuples (x, y, r), one per detected circle, most inliers first.
+    """
+    min_radius, max_radius = radius_range
+
+    def accept(model, inliers, origin, scale):
+        x, y, r = model[0] * scale + origin[0], model[1] * scale + origin[1], model[2] * scale
+        if not min_radius <= r <= max_radius:
+            return None
+        if arc_coverage(np.arctan2(inliers[:, 1] - model[1], inliers[:, 0] - model[0])) < min_coverage:
+            return None
+        return (float(x), float(y), float(r))
+
+    return _detect(points, 3, fit_circle_samples, circle_residuals, refine_circle, accept, threshold,
+                   min_inliers, max_circles, seed, confidence=confidence, max_iterations=max_iterations)
+
+def ransac_ellipses(points, threshold=2.0, min_inliers=20, axis_range=(0, np.inf), min_coverage=0.5,
+                    max_ellipses=10, confidence=0.99, max_iterations=2000, seed=None):
+    """
+    Detect ellipses among all points with RANSAC on 5-point samples.
+
+    Works like ransac_circles, with conics through 5 points scored by their Sampson
+    distance.
+
+    Parameters:
+        points (numpy array): Array of shape (n, 2) with all points.
+        threshold (float): Maximum (Sampson) distance of an inlier, in drawing units.
+        min_inliers (int): Minimum number of inliers of an ellipse.
+        axis_range (tuple): Minimum semi-minor and maximum semi-major axis.
+        min_coverage (float): Minimum fraction of the ellipse the inliers must cover.
+        max_ellipses (int): Maximum number of ellipses to detect.
+        confidence (float): RANSAC confidence, which sets the adaptive iteration count.
+        max_iterations (int): Maximum number of samples per ellipse.
+        seed (int or numpy.random.Generator): Seed for reproducible results.
+
+    Returns:
+        list: Tuples (center_x, center_y, a, b, angle), one per detected ellipse, most
+        inliers first.
+    """
+    min_axis, max_axis = axis_range
+
+    def accept(model, inliers, origin, scale):
+        cx, cy, a, b, angle = conic_to_ellipse(model)
+        if np.isnan(cx) or not (min_axis <= b * scale and a * scale <= max_axis):
+            return None
+        dx, dy = inliers[:, 0] - cx, inliers[:, 1] - cy
+        u = dx * np.cos(angle) + dy * np.sin(angle)
+        v = -dx * np.sin(angle) + dy * np.cos(angle)
+        if arc_coverage(np.arctan2(v / b, u / a)) < min_coverage:
+            return None
+        return (float(cx * scale + origin[0]), float(cy * scale + origin[1]), float(a * scale), float(b * scale),
+                float(angle))
+
+    return _detect(points, 5, fit_ellipse_samples, conic_residuals, refine_ellipse, accept, threshold,
+                   min_inliers, max_ellipses, seed, confidence=confidence, max_iterations=max_iterations)
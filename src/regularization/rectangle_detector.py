@@ -1,61 +1,160 @@
 import numpy as np
 
-def is_rectangle(XY, tolerance=0.01):
+from ..curve_set import CurveSet
+from .cascade import Cascade, bbox_aspect, closure, point_count
+from .features import SegmentFeatures, iter_features
+from .min_rectangle import convex_hulls, min_area_rectangles, rectangle_corners, rectangle_residuals
+from .simplify import CORNER_TOLERANCE
+
+# Largest gap between the ends of a fitted rectangle, relative to its bounding box diagonal
+RECTANGLE_MAX_GAP = 0.1
+# Smallest and largest length of a fitted rectangle's stroke relative to the fitted perimeter
+RECTANGLE_COVERAGE = (0.9, 1.1)
+
+def rectangle_mask(features, tolerance=0.01, segments=None):
     """
-    Determines if a given set of points forms a rectangle.
+    Tests segments of a SegmentFeatures for being a rectangle.
     
     Parameters:
-        XY (numpy array): Array of points representing a polyline.
+        features (SegmentFeatures): Features of the segments (their vertices, side vectors and lengths).
         tolerance (float): Tolerance for checking the right angles and parallel sides.
+        segments (numpy array): Indices of the segments to test; None tests all of them.
     
     Returns:
-        is_rectangle (bool): True if the points form a rectangle, False otherwise.
+        mask (numpy array): Boolean array over all segments with True for the tested ones that form a
+            rectangle.
     """
-    if len(XY) != 4:  # A rectangle must have exactly 4 vertices
-        return False
+    mask = np.zeros(len(features), dtype=bool)
+    candidates = np.arange(len(features)) if segments is None else np.asarray(segments)
+    candidates = candidates[features.lengths[candidates] == 4]  # A rectangle must have exactly 4 vertices
+    dists = features.vertex_rows(features.side_lengths, candidates, 4)
+    vectors = features.vertex_rows(features.sides, candidates, 4)
+    
+    # Opposite sides are equal and all angles are right angles
+    equal_sides = np.isclose(dists[:, 0], dists[:, 2], atol=tolerance) & \
+        np.isclose(dists[:, 1], dists[:, 3], atol=tolerance)
+    dot_products = (vectors * np.roll(vectors, -1, axis=1)).sum(axis=2)
+    right_angles = np.isclose(dot_products, 0, atol=tolerance).all(axis=1)
+    
+    mask[candidates] = equal_sides & right_angles
+    return mask
 
-    def distance(p1, p2):
-        return np.linalg.norm(p1 - p2)
+def fitted_rectangle_errors(features, segments=None):
+    """
+    Fits the minimum-area rectangle to segments of a SegmentFeatures, for dense outlines.
+    
+    Every segment is fitted once: the fits are kept in features.fits['rectangles'], and
+    the residuals and stroke lengths are computed over the points of the newly fitted
+    segments only.
     
-    def is_right_angle(v1, v2):
-        dot_product = np.dot(v1, v2)
-        return np.isclose(dot_product, 0, atol=tolerance)
+    Parameters:
+        features (SegmentFeatures): Features of the segments (their points, convex hulls and lengths).
+        segments (numpy array): Indices of the segments to fit; None fits all of them.
     
-    # Calculate distances between consecutive points
-    dists = [distance(XY[i], XY[(i + 1) % 4]) for i in range(4)]
+    Returns:
+        rectangles (numpy array): Array of shape (k, 5) with the fitted rectangle (center_x, center_y,
+            width, height, angle) of every segment; NaN for the ones not fitted.
+        errors (numpy array): Root mean square distance of the points to the rectangle outline relative
+            to the bounding box diagonal of the segment, or infinity when the stroke does not go around the
+            rectangle once; NaN for the segments not fitted.
+    """
+    segments = np.arange(len(features)) if segments is None else np.asarray(segments, dtype=np.intp)
+    if 'rectangles' not in features.fits:
+        features.fits['rectangles'] = (np.full((len(features), 5), np.nan), np.full(len(features), np.nan),
+                                       np.zeros(len(features), dtype=bool))
+    rectangles, errors, fitted = features.fits['rectangles']
+
+    new = np.unique(segments[~fitted[segments]])
+    if len(new):
+        hulls = convex_hulls(features.curves, new, features.hull)  # Shared with the other detectors
+        rectangles[new] = min_area_rectangles(features.curves, hulls)[new]
+        candidates = features.subset(new)
+        width, height = rectangles[new, 2], rectangles[new, 3]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            new_errors = rectangle_residuals(candidates.curves, rectangles[new]) / np.hypot(width, height)
+            coverage = candidates.arc_length / (2 * (width + height))
+        new_errors[~((coverage >= RECTANGLE_COVERAGE[0]) & (coverage <= RECTANGLE_COVERAGE[1]))] = np.inf
+        errors[new] = new_errors
+        fitted[new] = True
+    return rectangles.copy(), errors.copy()
+
+def rectangle_cascade(tolerance=0.01, method='corners'):
+    """
+    Classification cascade for rectangles: vertex count and a non-empty bounding box
+    prune segments before the side and angle tests of rectangle_mask, or, with the
+    'calipers' method, before the rectangle fit of fitted_rectangle_errors on closed
+    segments.
     
-    # Check if opposite sides are equal
-    if not np.isclose(dists[0], dists[2], atol=tolerance) or \
-       not np.isclose(dists[1], dists[3], atol=tolerance):
-        return False
+    Parameters:
+        tolerance (float): Tolerance for checking the right angles and parallel sides ('corners'), or
+            largest root mean square distance to the fitted rectangle relative to its diagonal ('calipers').
+        method (str): 'corners' tests segments of exactly 4 vertices; 'calipers' fits a rectangle to
+            segments of any number of points.
     
-    # Calculate vectors for the sides
-    vectors = [XY[(i + 1) % 4] - XY[i] for i in range(4)]
+    Returns:
+        cascade (Cascade): The cascade, with zeroed counters.
+    """
+    if method == 'corners':
+        return Cascade([
+            ('points', point_count(4, 4)),
+            ('bbox', bbox_aspect(0)),
+            ('rectangle', lambda features, segments: rectangle_mask(features, tolerance, segments)[segments]),
+        ])
+    if method == 'calipers':
+        return Cascade([
+            ('points', point_count(4)),
+            ('bbox', bbox_aspect(0)),
+            ('closure', closure(RECTANGLE_MAX_GAP)),
+            ('rectangle', lambda features, segments:
+                fitted_rectangle_errors(features, segments)[1][segments] <= tolerance),
+        ])
+    raise ValueError(f"Unknown rectangle method: {method!r}")
+
+def is_rectangle(XY, tolerance=0.01, method='corners'):
+    """
+    Determines if a given set of points forms a rectangle.
     
-    # Check if all angles are right angles
-    for i in range(4):
-        if not is_right_angle(vectors[i], vectors[(i + 1) % 4]):
-            return False
+    Parameters:
+        XY (numpy array): Array of points representing a polyline.
+        tolerance (float): Tolerance of the method (see rectangle_cascade).
+        method (str): 'corners' for the 4 vertices of a rectangle, 'calipers' for a dense outline.
     
-    return True
+    Returns:
+        is_rectangle (bool): True if the points form a rectangle, False otherwise.
+    """
+    return bool(rectangle_cascade(tolerance, method)(SegmentFeatures(CurveSet.from_segments(XY)))[0])
 
-def detect_rectangles(paths_XYs, tolerance=0.01):
+def detect_rectangles(paths_XYs, tolerance=0.01, simplify=CORNER_TOLERANCE, cache=None, cascade=None,
+                      method='corners'):
     """
     Detects rectangles from given paths (polylines).
     
     Parameters:
-        paths_XYs (list): List of paths, where each path is a numpy array of points.
+        paths_XYs (iterable): Paths from read_csv or iter_csv, where each path is a list of numpy arrays of points.
         tolerance (float): Tolerance for detecting rectangles.
+        simplify (float or str): Segments are first reduced to their corners, within this fraction of their
+            size or at the peaks of their turning angle with 'curvature' (see reduce_to_corners); None tests
+            the points as given. Not used by the 'calipers' method, which fits the points as given.
+        cache (FeatureCache): Features shared with the other detectors of the same paths.
+        cascade (Cascade): Classification cascade, whose counters record how many segments each
+            stage pruned; defaults to rectangle_cascade(tolerance, method).
+        method (str): 'corners' tests the corners of the segments; 'calipers' fits the minimum-area
+            rectangle to all their points (see rectangle_cascade).
     
     Returns:
-        rectangles (list): List of detected rectangles. Each rectangle is represented by its vertices.
+        rectangles (list): List of detected rectangles. Each rectangle is represented by its vertices (the
+            corners of the fitted rectangle with 'calipers').
     """
     rectangles = []
+    cascade = rectangle_cascade(tolerance, method) if cascade is None else cascade
+    simplify = None if method == 'calipers' else simplify
 
-    for path in paths_XYs:
-        for XY in path:
-            if is_rectangle(XY, tolerance):
-                rectangles.append(XY)
+    for features in iter_features(paths_XYs, simplify, cache):
+        segments = np.flatnonzero(cascade(features))
+        if method == 'calipers':
+            rectangles.extend(rectangle_corners(fitted_rectangle_errors(features, segments)[0][segments]))
+        else:
+            rectangles.extend(features.curves.segment(index) for index in segments)
 
     return rectangles
 
@@ -0,0 +1,252 @@
+import numpy as np
+
+from ..curve_set import CurveSet
+from .circle_detector import detect_circles
+from .ellipse_detector import ellipse_errors, fit_ellipses
+from .features import FeatureCache
+from .line_detector import fit_lines
+from .polygon_detector import polygon_cascade
+from .rectangle_detector import fitted_rectangle_errors, rectangle_cascade
+from .simplify import CORNER_TOLERANCE
+from .star_detector import star_cascade, star_radii
+
+# Shape kinds, in the order of their codes in the 'shape' column; the names match the
+# SVGWriter.add_shapes keys
+SHAPE_TYPES = ('lines', 'circles', 'ellipses', 'rectangles', 'polygons', 'stars')
+
+# One record per detected shape. 'path' and 'segment' (the index within the path) locate
+# the segment it was found in (-1 for circles, which are found among all points), and
+# 'shape' indexes SHAPE_TYPES. 'params' is
+#   lines:                  x0, y0, x1, y1, nan, nan
+#   circles:                x, y, r, r, 0, nan
+#   ellipses:               center_x, center_y, a, b, angle, nan
+#   rectangles:             center_x, center_y, width, height, angle, 4
+#   polygons:               center_x, center_y, radius, radius, angle, sides
+#   stars:                  center_x, center_y, outer radius, inner radius, angle, points
+# with angle the direction of the first side (rectangles) or of the first (outer) vertex
+# seen from the center; a negative height marks a clockwise rectangle. 'error' is the
+# quantity the detector compared with its tolerance (see detect_all).
+SHAPE_DTYPE = np.dtype([('path', np.int32), ('segment', np.int32), ('shape', np.int8),
+                        ('params', np.float64, (6,)), ('error', np.float64)])
+
+# Default keyword arguments of every shape test
+DEFAULT_OPTIONS = {
+    'lines': {'threshold': 0.01},
+    'circles': {'min_radius': 10, 'max_radius': 100, 'min_points': 5},
+    'ellipses': {'tolerance': 0.1},
+    'rectangles': {'tolerance': 0.01, 'method': 'corners'},
+    'polygons': {'tolerance': 0.01},
+    'stars': {'num_points': None, 'tolerance': 0.05},
+}
+
+def _records(kind, curves, segments, params, errors):
+    """
+    Records of shapes of one kind found in the given segments of curves (None for circles).
+    """
+    records = np.zeros(len(params), dtype=SHAPE_DTYPE)
+    if curves is None:
+        records['path'] = records['segment'] = -1
+    else:
+        paths = curves.segment_path_index[segments]
+        records['path'] = paths
+        records['segment'] = segments - curves.path_offsets[paths]
+    records['shape'] = SHAPE_TYPES.index(kind)
+    records['params'] = params
+    records['error'] = errors
+    return records
+
+def _lines(features, threshold):
+    endpoints, residuals = fit_lines(features.curves, features=features)
+    segments = np.flatnonzero(residuals < threshold)
+    params = np.full((len(segments), 6), np.nan)
+    params[:, :4] = endpoints[segments].reshape(-1, 4)
+    return segments, params, residuals[segments]
+
+def _circles(features, **kwargs):
+    points = features.curves.points
+    circles = np.array(detect_circles(points, **kwargs), dtype=float).reshape(-1, 3)
+    # Mean distance to the circle of the points within a tenth of its radius, which all lie in
+    # its bounding box grown by that margin
+    errors = np.full(len(circles), np.nan)
+    for i, (x, y, r) in enumerate(circles):
+        margin = r * 1.1
+        nearby = points[(np.abs(points[:, 0] - x) <= margin) & (np.abs(points[:, 1] - y) <= margin)]
+        distances = np.abs(np.hypot(nearby[:, 0] - x, nearby[:, 1] - y) - r)
+        distances = distances[distances < r / 10]
+        if len(distances):
+            errors[i] = distances.mean()
+    params = np.column_stack([circles, circles[:, 2], np.zeros(len(circles)), np.full(len(circles), np.nan)])
+    return None, params, errors
+
+def _ellipses(features, tolerance):
+    ellipses = fit_ellipses(features.curves, features=features)
+    errors = ellipse_errors(features.curves, ellipses)
+    segments = np.flatnonzero(errors < tolerance)
+    return segments, np.column_stack([ellipses[segments], np.full(len(segments), np.nan)]), errors[segments]
+
+def _rectangles(features, tolerance, method):
+    segments = np.flatnonzero(rectangle_cascade(tolerance, method)(features))
+    if method == 'calipers':
+        rectangles, errors = fitted_rectangle_errors(features, segments)
+        orientation = np.sign(features.area[segments])
+        params = np.column_stack([rectangles[segments, :3], orientation * rectangles[segments, 3],
+                                  rectangles[segments, 4], np.full(len(segments), 4.0)])
+        return segments, params, errors[segments]
+    dists = features.vertex_rows(features.side_lengths, segments, 4)
+    vectors = features.vertex_rows(features.sides, segments, 4)
+    dot_products = (vectors * np.roll(vectors, -1, axis=1)).sum(axis=2)
+    errors = np.max(np.column_stack([np.abs(dists[:, 0] - dists[:, 2]), np.abs(dists[:, 1] - dists[:, 3]),
+                                     np.abs(dot_products)]), axis=1, initial=0)
+    orientation = np.sign(vectors[:, 0, 0] * vectors[:, 1, 1] - vectors[:, 0, 1] * vectors[:, 1, 0])
+    params = np.column_stack([features.centroid[segments], (dists[:, 0] + dists[:, 2]) / 2,
+                              orientation * (dists[:, 1] + dists[:, 3]) / 2,
+                              np.arctan2(vectors[:, 0, 1], vectors[:, 0, 0]), np.full(len(segments), 4.0)])
+    return segments, params, errors
+
+def _polygons(features, tolerance):
+    segments = np.flatnonzero(polygon_cascade(tolerance)(features))
+    errors = np.zeros(len(segments))
+    for i, index in enumerate(segments):
+        hull_points = features.curves.segment(index)[features.hull(index).vertices]
+        vectors = np.roll(hull_points, -1, axis=0) - hull_points
+        side_lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+        cos_angles = (vectors * np.roll(vectors, -1, axis=0)).sum(axis=1) / (side_lengths * np.roll(side_lengths, -1))
+        angles = np.degrees(np.arccos(np.clip(cos_angles, -1.0, 1.0)))
+        errors[i] = max(np.abs(side_lengths - side_lengths[0]).max(), np.abs(angles - angles[0]).max())
+    first = features.curves.segment_offsets[:-1][segments]
+    params = np.column_stack([features.centroid[segments], features.radius_mean[segments],
+                              features.radius_mean[segments], features.polar_angles[first],
+                              features.lengths[segments]])
+    return segments, params, errors
+
+def _stars(features, num_points, tolerance):
+    segments = np.flatnonzero(star_cascade(num_points, tolerance)(features))
+    points = features.lengths[segments] // 2
+    angles = features.polar_angles
+    steps = np.degrees(np.mod(angles[features.next_index] - angles, 2 * np.pi))
+    with np.errstate(divide='ignore'):
+        deviations = np.abs(steps - np.repeat(360 / features.lengths, features.lengths))
+    errors = features.curves.segment_reduce(deviations, np.maximum)[segments]
+    # Outer vertices are the ones with the larger radii (every other vertex)
+    radii = star_radii(features, segments)
+    outer_first = radii[:, 0] >= radii[:, 1]
+    first = features.curves.segment_offsets[:-1][segments] + np.where(outer_first, 0, 1)
+    params = np.column_stack([features.centroid[segments], radii.max(axis=1), radii.min(axis=1),
+                              angles[first], points.astype(float)])
+    return segments, params, errors
+
+_DETECTORS = {'lines': _lines, 'circles': _circles, 'ellipses': _ellipses,
+              'rectangles': _rectangles, 'polygons': _polygons, 'stars': _stars}
+
+def detect_all(paths_XYs, shapes=SHAPE_TYPES, simplify=CORNER_TOLERANCE, cache=None, options=None, errors=None):
+    """
+    Run every shape detector over one traversal of the paths.
+
+    The paths are read once into a CurveSet whose SegmentFeatures (raw, and reduced
+    to corners for the polygon family) are shared by all detectors, which test every
+    segment with the same criteria as the matching detect_* function. The error of a
+    shape is the quantity its detector compares with its tolerance: the mean squared
+    distance to the line, the mean distance to the circle of the points within r/10
+    of it, the mean algebraic ellipse error, the largest difference of opposite
+    sides or dot product of adjacent ones (rectangles; with the 'calipers' method,
+    the relative distance to the fitted rectangle, see fitted_rectangle_errors), the largest deviation of a
+    side length or angle in degrees (polygons), and the largest deviation of the angle
+    between points in degrees (stars).
+
+    Parameters:
+        paths_XYs (iterable or CurveSet): Paths from read_csv or iter_csv, or a CurveSet.
+        shapes (iterable): Kinds of shapes to detect (see SHAPE_TYPES).
+        simplify (float or str): Ratio or method of the corner simplification before the
+            rectangle, polygon and star tests (see reduce_to_corners); None tests the
+            points as given.
+        cache (FeatureCache): Features shared with other calls on the same paths.
+        options (dict): Keyword arguments of the shape tests by kind, overriding
+            DEFAULT_OPTIONS, e.g. {'stars': {'num_points': 6}} (stars of any number of
+            points are detected by default).
+        errors (dict): When given, an exception raised by the test of one kind is recorded
+            here under the kind ('TypeName: message') and the other kinds still run;
+            otherwise it propagates.
+
+    Returns:
+        numpy array: Record array of SHAPE_DTYPE, ordered by path, segment and shape kind.
+    """
+    unknown = set(shapes) - set(SHAPE_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown shape types: {sorted(unknown)}")
+    if not isinstance(paths_XYs, (list, tuple, CurveSet)):
+        paths_XYs = list(paths_XYs)
+    cache = FeatureCache() if cache is None else cache
+    options = options or {}
+
+    records = [np.zeros(0, dtype=SHAPE_DTYPE)]
+    for kind in SHAPE_TYPES:
+        if kind not in shapes:
+            continue
+        kwargs = {**DEFAULT_OPTIONS[kind], **options.get(kind, {})}
+        corners = kind in ('polygons', 'stars') or kind == 'rectangles' and kwargs['method'] == 'corners'
+        try:
+            features = cache.features(paths_XYs, simplify if corners else None)
+            segments, params, shape_errors = _DETECTORS[kind](features, **kwargs)
+        except Exception as e:
+            if errors is None:
+                raise
+            errors[kind] = f"{type(e).__name__}: {e}"
+            continue
+        records.append(_records(kind, None if segments is None else features.curves, segments, params,
+                                shape_errors))
+
+    records = np.concatenate(records)
+    return records[np.lexsort((records['shape'], records['segment'], records['path']))]
+
+def shape_vertices(record):
+    """
+    Vertices of the ideal shape of a rectangle, polygon or star record.
+
+    Parameters:
+        record (numpy.void): One record of SHAPE_DTYPE.
+
+    Returns:
+        numpy array: Array of shape (m, 2), counterclockwise for polygons and stars.
+    """
+    kind = SHAPE_TYPES[record['shape']]
+    center_x, center_y, a, b, angle, count = record['params']
+    if kind == 'rectangles':
+        u = np.array([np.cos(angle), np.sin(angle)])
+        v = np.array([-u[1], u[0]])
+        corners = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]]) / 2 * [a, b]
+        return np.array([center_x, center_y]) + corners[:, :1] * u + corners[:, 1:] * v
+    if kind == 'polygons':
+        angles, radii = angle + 2 * np.pi * np.arange(count) / count, np.full(int(count), a)
+    elif kind == 'stars':
+        angles = angle + np.pi * np.arange(2 * count) / count
+        radii = np.tile([a, b], int(count))
+    else:
+        raise ValueError(f"{kind} records have no vertices")
+    return np.column_stack([center_x + radii * np.cos(angles), center_y + radii * np.sin(angles)])
+
+def records_to_shapes(records):
+    """
+    Convert a record array to the per-kind lists of the detect_* functions.
+
+    Rectangles, polygons and stars become the vertices of their ideal shapes (see
+    shape_vertices).
+
+    Parameters:
+        records (numpy array): Records of SHAPE_DTYPE.
+
+    Returns:
+        dict: Lists keyed by kind, as taken by SVGWriter.add_shapes.
+    """
+    shapes = {kind: [] for kind in SHAPE_TYPES}
+    for record in records:
+        kind = SHAPE_TYPES[record['shape']]
+        params = record['params']
+        if kind == 'lines':
+            shapes[kind].append(list(params[:4].reshape(2, 2)))
+        elif kind == 'circles':
+            shapes[kind].append(tuple(params[:3]))
+        elif kind == 'ellipses':
+            shapes[kind].append(tuple(params[:5]))
+        else:
+            shapes[kind].append(shape_vertices(record))
+    return shapes
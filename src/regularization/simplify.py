@@ -0,0 +1,201 @@
+import numpy as np
+
+from ..curve_set import CurveSet, _offsets, iter_segment_batches
+from .corners import corner_curves
+
+# Default epsilon of the corner detectors, as a fraction of each segment's bounding box diagonal
+CORNER_TOLERANCE = 0.02
+# Segments simplified together when the input is a stream of paths
+SIMPLIFY_BATCH = 4096
+
+def _interval_points(starts, ends):
+    """
+    Indices of the interior points of every interval (start, end), and the offsets
+    of each interval's run in that flat index array.
+    """
+    counts = ends - starts - 1
+    offsets = _offsets(counts)
+    index = np.arange(offsets[-1]) - np.repeat(offsets[:-1] - starts - 1, counts)
+    return index, offsets
+
+def _chord_distances(points, index, a, b):
+    """
+    Distances of points[index] to the chords a-b (to a itself when the chord is a point).
+    """
+    p = points[index]
+    chord = b - a
+    length = np.hypot(chord[:, 0], chord[:, 1])
+    rel = p - a
+    cross = np.abs(chord[:, 0] * rel[:, 1] - chord[:, 1] * rel[:, 0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(length > 0, cross / length, np.hypot(rel[:, 0], rel[:, 1]))
+
+def rdp_mask(curves, epsilon):
+    """
+    Ramer-Douglas-Peucker vertex selection for every segment of a CurveSet at once.
+
+    The recursion is replaced by a work list of intervals: every round computes the
+    distances of the interior points of all open intervals (of all segments) to
+    their chords in one array operation, keeps the farthest point of every interval
+    whose distance exceeds epsilon and splits it there. The number of rounds is the
+    depth of the recursion, not the number of points.
+
+    Parameters:
+        curves (CurveSet): The segments.
+        epsilon (float or numpy array): Maximum distance of a dropped point to the
+            simplified polyline; one value or one per segment.
+
+    Returns:
+        numpy array: Boolean mask over curves.points of the vertices to keep.
+    """
+    points = curves.points
+    lengths = curves.segment_lengths
+    epsilon = np.broadcast_to(np.asarray(epsilon, dtype=float), (curves.n_segments,))
+    keep = np.zeros(curves.n_points, dtype=bool)
+    nonempty = lengths > 0
+    keep[curves.segment_offsets[:-1][nonempty]] = True
+    keep[curves.segment_offsets[1:][nonempty] - 1] = True
+
+    long = lengths > 2
+    starts = curves.segment_offsets[:-1][long]
+    ends = curves.segment_offsets[1:][long] - 1
+    tolerances = epsilon[long]
+    while len(starts):
+        index, offsets = _interval_points(starts, ends)
+        counts = np.diff(offsets)
+        distances = _chord_distances(points, index, np.repeat(points[starts], counts, axis=0),
+                                     np.repeat(points[ends], counts, axis=0))
+        farthest = np.maximum.reduceat(distances, offsets[:-1])
+        # First point reaching the maximum of its interval
+        position = np.where(distances == np.repeat(farthest, counts), np.arange(len(index)), len(index))
+        split = index[np.minimum.reduceat(position, offsets[:-1])]
+
+        splitting = farthest > tolerances
+        keep[split[splitting]] = True
+        starts, ends, split, tolerances = (starts[splitting], ends[splitting], split[splitting],
+                                           tolerances[splitting])
+        starts, ends = np.concatenate([starts, split]), np.concatenate([split, ends])
+        tolerances = np.concatenate([tolerances, tolerances])
+        open_intervals = ends - starts > 1
+        starts, ends, tolerances = starts[open_intervals], ends[open_intervals], tolerances[open_intervals]
+    return keep
+
+def _redundant_vertices(vertices, offsets, closed, epsilon):
+    """
+    Mask of the vertices within epsilon of the line through their neighbours (wrapping
+    around in closed segments; the ends of open segments are always kept). Of two
+    adjacent redundant vertices only the closer one to its line is marked, so no edge
+    moves by more than epsilon.
+    """
+    counts = np.diff(offsets)
+    index = np.arange(len(vertices))
+    segment = np.repeat(np.arange(len(counts)), counts)
+    first, last = offsets[:-1][segment], offsets[1:][segment] - 1
+    previous = np.where(index == first, last, index - 1)
+    following = np.where(index == last, first, index + 1)
+    eligible = np.where(closed[segment], counts[segment] >= 4, (index != first) & (index != last))
+
+    distances = _chord_distances(vertices, index, vertices[previous], vertices[following])
+    redundant = eligible & (distances <= epsilon[segment])
+    # Ties are broken by position, so exactly one of two adjacent vertices wins
+    rank = np.lexsort((index, distances))
+    order = np.empty_like(rank)
+    order[rank] = index
+    return redundant & ~(redundant[previous] & (order[previous] < order)) & \
+        ~(redundant[following] & (order[following] < order))
+
+def simplify_curves(curves, epsilon, closed_tolerance=None):
+    """
+    Reduce every segment to its corner vertices with Ramer-Douglas-Peucker.
+
+    A segment whose ends are within closed_tolerance of each other is treated as
+    closed, and its repeated end point is dropped. Vertices left within epsilon of
+    the line through their neighbours (the start of a closed segment drawn from the
+    middle of an edge, or a point RDP kept on an edge because of tied distances) are
+    dropped too, so a closed rectangle comes out as its 4 corners.
+
+    Parameters:
+        curves (CurveSet): The segments.
+        epsilon (float or numpy array): Maximum distance of a dropped point to the
+            simplified polyline; one value or one per segment.
+        closed_tolerance (float or numpy array): Maximum distance between the ends of
+            a closed segment; defaults to epsilon.
+
+    Returns:
+        CurveSet: The simplified segments, with the same paths and segments as curves.
+    """
+    epsilon = np.broadcast_to(np.asarray(epsilon, dtype=float), (curves.n_segments,))
+    closed_tolerance = epsilon if closed_tolerance is None else \
+        np.broadcast_to(np.asarray(closed_tolerance, dtype=float), (curves.n_segments,))
+    keep = rdp_mask(curves, epsilon)
+
+    # Vertices kept per segment, and which segments are closed loops of at least a triangle
+    kept_offsets = _offsets(curves.segment_reduce(keep.astype(np.intp)))
+    vertices = curves.points[keep]
+    first, last = kept_offsets[:-1], kept_offsets[1:] - 1
+    counts = last - first + 1
+    closed = counts >= 4
+    closed[closed] = np.hypot(*(vertices[first[closed]] - vertices[last[closed]]).T) <= closed_tolerance[closed]
+
+    repeated = np.zeros(len(vertices), dtype=bool)
+    repeated[last[closed]] = True
+    vertices, offsets = vertices[~repeated], _offsets(counts - closed)
+
+    redundant = _redundant_vertices(vertices, offsets, closed, epsilon)
+    counts = np.diff(offsets)
+    counts -= np.bincount(np.repeat(np.arange(len(counts)), counts)[redundant], minlength=len(counts))
+    return CurveSet(vertices[~redundant], _offsets(counts), curves.path_offsets)
+
+def simplify_tolerances(curves, ratio):
+    """
+    Per-segment epsilon as a fraction of each segment's bounding box diagonal.
+    """
+    low = curves.segment_reduce(curves.points, np.minimum, empty=0)
+    high = curves.segment_reduce(curves.points, np.maximum, empty=0)
+    return ratio * np.hypot(*(high - low).T)
+
+def reduce_to_corners(curves, ratio):
+    """
+    Reduce every segment to its corner vertices.
+
+    Parameters:
+        curves (CurveSet): The segments.
+        ratio (float or str): Ramer-Douglas-Peucker epsilon relative to each segment's
+            bounding box diagonal (see simplify_curves), or 'curvature' for the peaks of
+            the turning angle (see corners.corner_curves).
+
+    Returns:
+        CurveSet: The corner vertices, with the same paths and segments as curves.
+    """
+    if ratio == 'curvature':
+        return corner_curves(curves)
+    return simplify_curves(curves, simplify_tolerances(curves, ratio))
+
+def iter_corner_segments(paths_XYs, ratio=CORNER_TOLERANCE, min_points=0):
+    """
+    Iterate over the segments of paths reduced to their corner vertices.
+
+    This is the simplification stage in front of the polygon, rectangle and star
+    detectors, which compare vertex lists: densely sampled segments are simplified
+    in batches of SIMPLIFY_BATCH with epsilon = ratio * bounding box diagonal, or
+    reduced to the peaks of their turning angle (see reduce_to_corners).
+
+    Parameters:
+        paths_XYs (iterable or CurveSet): Paths from read_csv or iter_csv, or a CurveSet.
+        ratio (float or str): Epsilon relative to each segment's size, or 'curvature'; None yields
+            the segments unchanged.
+        min_points (int): Segments with fewer points (before simplification) are skipped.
+
+    Yields:
+        numpy array: The (m, 2) vertices of every segment, in input order.
+    """
+    if ratio is None and not isinstance(paths_XYs, CurveSet):
+        for path in paths_XYs:
+            for XY in path:
+                if len(XY) >= min_points:
+                    yield XY
+        return
+    for batch in iter_segment_batches(paths_XYs, SIMPLIFY_BATCH, min_points):
+        if ratio is not None:
+            batch = reduce_to_corners(batch, ratio)
+        yield from batch.iter_segments()
@@ -1,67 +1,179 @@
 import numpy as np
 
+from ..curve_set import CurveSet
+from .cascade import Cascade, bbox_aspect, point_count
+from .features import SegmentFeatures, iter_features
+from .simplify import CORNER_TOLERANCE
+
+# Minimum short/long side ratio of the bounding box of a regular star (about 0.95 for 5 points)
+STAR_MIN_ASPECT = 0.5
+# Fewest points of a star
+MIN_STAR_POINTS = 3
+# Largest spread of the outer and of the inner radii of a star, and smallest difference between
+# them, relative to the mean outer radius
+STAR_RADIUS_TOLERANCE = 0.01
+
+def _odd_vertices(curves):
+    """
+    Which points are at odd positions within their segment.
+    """
+    return (np.arange(curves.n_points) - curves.segment_offsets[:-1][curves.point_segment_index]) % 2 == 1
+
+def star_radii(features, segments=None):
+    """
+    Mean radius of the even and of the odd vertices of every segment, around its centroid.
+    
+    Parameters:
+        features (SegmentFeatures): Features of the segments.
+        segments (numpy array): Indices of the segments to measure; None measures all of them.
+    
+    Returns:
+        radii (numpy array): Array of shape (k, 2) with the mean radius of the vertices 0, 2, 4, ... and
+            of the vertices 1, 3, 5, ... of every (given) segment; NaN where there are none.
+    """
+    if segments is not None:
+        features = features.subset(segments)
+    odd = _odd_vertices(features.curves)
+    sums = features.curves.segment_reduce(np.column_stack([features.radii * ~odd, features.radii * odd]))
+    counts = np.column_stack([features.lengths - features.lengths // 2, features.lengths // 2])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return sums / counts
+
+def star_points(features, tolerance=0.05, segments=None):
+    """
+    Estimates the number of points of segments of a SegmentFeatures that are regular stars.
+    
+    A star's vertices alternate between an outer and an inner radius around the centroid, so its point
+    count is read from the alternation of its radius signature: every vertex must lie on the other side of
+    the mean radius than the next one, which makes the number of vertices even and the number of points half
+    of it. The outer and the inner radii must each agree within STAR_RADIUS_TOLERANCE, and consecutive
+    vertices must be 360 / (2 * points) degrees apart within tolerance. All tests run at once on the flat
+    vertex arrays, so stars of any number of points are classified in one pass.
+    
+    Parameters:
+        features (SegmentFeatures): Features of the segments (their radii and angles around the centroid).
+        tolerance (float): Tolerance in degrees for checking the angles between consecutive vertices.
+        segments (numpy array): Indices of the segments to test; None tests all of them.
+    
+    Returns:
+        points (numpy array): Number of points of every segment that is a regular star with at least
+            MIN_STAR_POINTS points, 0 for the others and for the segments not tested.
+    """
+    points = np.zeros(len(features), dtype=int)
+    candidates = np.arange(len(features)) if segments is None else np.asarray(segments, dtype=np.intp)
+    counts = features.lengths[candidates]
+    candidates = candidates[(counts >= 2 * MIN_STAR_POINTS) & (counts % 2 == 0)]
+    if not len(candidates):
+        return points
+    # The reductions below only run over the vertices of the candidates
+    if len(candidates) < len(features):
+        features = features.subset(candidates)
+    curves, counts = features.curves, features.lengths
+    
+    # The radius signature alternates around its mean (inner and outer points)
+    deviations = features.radii - np.repeat(features.radius_mean, counts)
+    alternating = curves.segment_reduce(deviations * deviations[features.next_index] < 0, np.logical_and)
+    
+    # Each of the outer and inner radii are about equal, and clearly apart from each other
+    odd = _odd_vertices(curves)
+    highest = curves.segment_reduce(np.column_stack([np.where(odd, -np.inf, features.radii),
+                                                     np.where(odd, features.radii, -np.inf)]), np.maximum)
+    lowest = curves.segment_reduce(np.column_stack([np.where(odd, np.inf, features.radii),
+                                                    np.where(odd, features.radii, np.inf)]), np.minimum)
+    radii = star_radii(features)
+    outer = radii.max(axis=1)
+    two_radii = ((highest - lowest).max(axis=1) <= STAR_RADIUS_TOLERANCE * outer) & \
+        (np.abs(radii[:, 0] - radii[:, 1]) > STAR_RADIUS_TOLERANCE * outer)
+    
+    # Angles between consecutive points around the centroid, in [0, 360), all 360 / (2 * points)
+    angles = features.polar_angles
+    steps = np.degrees(np.mod(angles[features.next_index] - angles, 2 * np.pi))
+    regular = curves.segment_reduce(np.abs(steps - np.repeat(360 / counts, counts)), np.maximum) <= tolerance
+    
+    points[candidates] = np.where(alternating & two_radii & regular, counts // 2, 0)
+    return points
+
+def star_mask(features, num_points=5, tolerance=0.05, segments=None):
+    """
+    Tests segments of a SegmentFeatures for being a regular star shape.
+    
+    Parameters:
+        features (SegmentFeatures): Features of the segments (their radii and angles around the centroid).
+        num_points (int): Expected number of points of the star (typically 5 for a regular star); None
+            accepts stars of any number of points (see star_points).
+        tolerance (float): Tolerance for checking the regularity of the star shape.
+        segments (numpy array): Indices of the segments to test; None tests all of them.
+    
+    Returns:
+        mask (numpy array): Boolean array over all segments with True for the tested ones that form a
+            regular star shape.
+    """
+    points = star_points(features, tolerance, segments)
+    return points > 0 if num_points is None else points == num_points
+
+def star_cascade(num_points=5, tolerance=0.05):
+    """
+    Classification cascade for regular stars: vertex count and bounding box aspect
+    (see STAR_MIN_ASPECT) prune segments before the radius and angle tests of star_mask.
+    
+    Parameters:
+        num_points (int): Expected number of points of the star; None for any number.
+        tolerance (float): Tolerance for checking the regularity of the star shape.
+    
+    Returns:
+        cascade (Cascade): The cascade, with zeroed counters.
+    """
+    if num_points is None:
+        counts = ('points', lambda features, segments: (features.lengths[segments] >= 2 * MIN_STAR_POINTS) &
+                  (features.lengths[segments] % 2 == 0))
+    else:
+        counts = ('points', point_count(num_points * 2, num_points * 2))
+    return Cascade([
+        counts,
+        ('bbox', bbox_aspect(STAR_MIN_ASPECT)),
+        ('star', lambda features, segments: star_mask(features, num_points, tolerance, segments)[segments]),
+    ])
+
 def is_star(XY, num_points=5, tolerance=0.05):
     """
     Determines if a given set of points forms a regular star shape.
     
     Parameters:
         XY (numpy array): Array of points representing a polyline.
-        num_points (int): Expected number of points of the star (typically 5 for a regular star).
+        num_points (int): Expected number of points of the star (typically 5 for a regular star); None
+            for any number.
         tolerance (float): Tolerance for checking the regularity of the star shape.
     
     Returns:
         is_star (bool): True if the points form a regular star shape, False otherwise.
     """
-    if len(XY) != num_points * 2:
-        return False
-    
-    def distance(p1, p2):
-        return np.linalg.norm(p1 - p2)
-    
-    # Calculate distances from the center to the points (radii)
-    centroid = np.mean(XY, axis=0)
-    radii = np.array([distance(point, centroid) for point in XY])
-    
-    # Check that the star alternates between two radii (inner and outer points)
-    if len(set(np.round(radii, decimals=2))) != 2:
-        return False
-    
-    # Calculate the angles between consecutive points
-    angles = []
-    for i in range(len(XY)):
-        v1 = XY[i] - centroid
-        v2 = XY[(i + 1) % len(XY)] - centroid
-        angle = np.arctan2(v2[1], v2[0]) - np.arctan2(v1[1], v1[0])
-        angle = np.degrees(angle)
-        if angle < 0:
-            angle += 360
-        angles.append(angle)
-    
-    # Check if angles are approximately the same within tolerance
-    expected_angle = 360 / (num_points * 2)
-    if not np.allclose(angles, expected_angle, atol=tolerance):
-        return False
-    
-    return True
+    return bool(star_cascade(num_points, tolerance)(SegmentFeatures(CurveSet.from_segments(XY)))[0])
 
-def detect_stars(paths_XYs, num_points=5, tolerance=0.05):
+def detect_stars(paths_XYs, num_points=5, tolerance=0.05, simplify=CORNER_TOLERANCE, cache=None, cascade=None):
     """
     Detects regular star shapes from given paths (polylines).
     
     Parameters:
-        paths_XYs (list): List of paths, where each path is a numpy array of points.
-        num_points (int): Expected number of points of the star.
+        paths_XYs (iterable): Paths from read_csv or iter_csv, where each path is a list of numpy arrays of points.
+        num_points (int): Expected number of points of the star; None detects stars of any number of points
+            in the same pass.
         tolerance (float): Tolerance for detecting regular star shapes.
+        simplify (float or str): Segments are first reduced to their corners, within this fraction of their
+            size or at the peaks of their turning angle with 'curvature' (see reduce_to_corners); None tests
+            the points as given.
+        cache (FeatureCache): Features shared with the other detectors of the same paths.
+        cascade (Cascade): Classification cascade, whose counters record how many segments each
+            stage pruned; defaults to star_cascade(num_points, tolerance).
     
     Returns:
         stars (list): List of detected stars. Each star is represented by its vertices.
     """
     stars = []
+    cascade = star_cascade(num_points, tolerance) if cascade is None else cascade
 
-    for path in paths_XYs:
-        for XY in path:
-            if is_star(XY, num_points, tolerance):
-                stars.append(XY)
+    for features in iter_features(paths_XYs, simplify, cache):
+        for index in np.flatnonzero(cascade(features)):
+            stars.append(features.curves.segment(index))
 
     return stars
 
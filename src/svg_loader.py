@@ -0,0 +1,349 @@
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from .curve_set import CurveSet
+
+SVG_NS = '{http://www.w3.org/2000/svg}'
+SKIPPED_TAGS = {'defs', 'clipPath', 'mask', 'symbol', 'marker', 'pattern', 'style', 'title', 'desc', 'metadata'}
+
+_COMMAND_RE = re.compile(r'([MmLlHhVvCcSsQqTtAaZz])([^MmLlHhVvCcSsQqTtAaZz]*)')
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_FLAG_RE = re.compile(r'[\s,]*([01])')
+_ARC_NUMBER_RE = re.compile(r'[\s,]*(' + _NUMBER_RE.pattern + ')')
+_TRANSFORM_RE = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+_ARGS_PER_COMMAND = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+
+def read_svg(svg_path, tolerance=0.1):
+    """
+    Read the drawable elements of an SVG file into the nested path/segment structure.
+
+    Every ``<path>``, ``<polyline>``, ``<polygon>``, ``<line>``, ``<circle>``, ``<ellipse>``
+    and ``<rect>`` element becomes one path, and every subpath of a ``<path>`` becomes one
+    segment, matching what ``read_csv`` returns for the CSV form of the same drawing.
+    Curves are flattened to polylines: each Bezier gets as many pieces as its control
+    polygon needs to stay within tolerance (Wang's bound), and arcs, circles and
+    ellipses are sampled so the chord never strays more than tolerance from the arc.
+    Element and group ``transform`` attributes are applied.
+
+    Parameters:
+        svg_path (str): The path to the SVG file.
+        tolerance (float): Maximum distance between a curve and its polyline, in output units.
+
+    Returns:
+        list: A nested list where each element is a list of (m, 2) XY arrays (paths).
+    
+    Raises:
+        ValueError: If the file is not well-formed XML.
+    """
+    try:
+        root = ET.parse(svg_path).getroot()
+    except ET.ParseError as e:
+        raise ValueError(f"{svg_path} is not valid SVG: {e}") from e
+    paths_XYs = []
+    _collect(root, np.eye(3), tolerance, paths_XYs)
+    return paths_XYs
+
+def parse_svg_rows(svg_path, tolerance=0.1):
+    """
+    Read an SVG file into a ``path_id, segment_id, x, y`` array, like the CSV files.
+
+    Parameters:
+        svg_path (str): The path to the SVG file.
+        tolerance (float): Maximum distance between a curve and its polyline.
+
+    Returns:
+        np.ndarray: Array of shape (n, 4).
+    """
+    return CurveSet.from_paths(read_svg(svg_path, tolerance)).to_rows()
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+def _collect(element, transform, tolerance, paths_XYs):
+    """
+    Walk the element tree depth first, appending one path per drawable element.
+    """
+    tag = _local_name(element.tag)
+    if tag in SKIPPED_TAGS or element.get('display') == 'none':
+        return
+    if element.get('transform'):
+        transform = transform @ parse_transform(element.get('transform'))
+
+    # Flatten in local units with the tolerance scaled so it holds after the transform.
+    scale = np.sqrt(abs(np.linalg.det(transform[:2, :2]))) or 1.0
+    local_tolerance = tolerance / scale
+
+    segments = None
+    if tag == 'path':
+        segments = parse_path_data(element.get('d', ''), local_tolerance)
+    elif tag in ('polyline', 'polygon'):
+        points = np.array(_numbers(element.get('points', '')), dtype=float)
+        points = points[:len(points) // 2 * 2].reshape(-1, 2)
+        if tag == 'polygon' and len(points):
+            points = np.vstack([points, points[:1]])
+        segments = [points] if len(points) else []
+    elif tag == 'line':
+        x1, y1, x2, y2 = (_length(element, name) for name in ('x1', 'y1', 'x2', 'y2'))
+        segments = [np.array([[x1, y1], [x2, y2]])]
+    elif tag in ('circle', 'ellipse'):
+        cx, cy = _length(element, 'cx'), _length(element, 'cy')
+        if tag == 'circle':
+            rx = ry = _length(element, 'r')
+        else:
+            rx, ry = _length(element, 'rx'), _length(element, 'ry')
+        if rx > 0 and ry > 0:
+            theta = np.linspace(0, 2 * np.pi, _arc_steps(max(rx, ry), 2 * np.pi, local_tolerance) + 1)
+            segments = [np.column_stack([cx + rx * np.cos(theta), cy + ry * np.sin(theta)])]
+    elif tag == 'rect':
+        x, y = _length(element, 'x'), _length(element, 'y')
+        width, height = _length(element, 'width'), _length(element, 'height')
+        if width > 0 and height > 0:
+            segments = [np.array([[x, y], [x + width, y], [x + width, y + height], [x, y + height], [x, y]])]
+
+    if segments:
+        paths_XYs.append([_apply(transform, XY) for XY in segments])
+
+    for child in element:
+        _collect(child, transform, tolerance, paths_XYs)
+
+def _length(element, name):
+    value = element.get(name)
+    if not value:
+        return 0.0
+    match = _NUMBER_RE.match(value.strip())
+    return float(match.group()) if match else 0.0
+
+def _numbers(text):
+    return [float(token) for token in _NUMBER_RE.findall(text)]
+
+def _apply(transform, XY):
+    if np.array_equal(transform, np.eye(3)):
+        return XY
+    return XY @ transform[:2, :2].T + transform[:2, 2]
+
+def parse_transform(text):
+    """
+    Parse an SVG ``transform`` attribute into a 3x3 affine matrix.
+
+    Parameters:
+        text (str): The attribute value, e.g. "translate(10 20) rotate(45)".
+
+    Returns:
+        np.ndarray: The 3x3 matrix mapping local to parent coordinates.
+    """
+    matrix = np.eye(3)
+    for name, args in _TRANSFORM_RE.findall(text):
+        values = _numbers(args)
+        step = np.eye(3)
+        if name == 'matrix' and len(values) == 6:
+            a, b, c, d, e, f = values
+            step = np.array([[a, c, e], [b, d, f], [0, 0, 1]])
+        elif name == 'translate' and values:
+            step[0, 2] = values[0]
+            step[1, 2] = values[1] if len(values) > 1 else 0.0
+        elif name == 'scale' and values:
+            step[0, 0] = values[0]
+            step[1, 1] = values[1] if len(values) > 1 else values[0]
+        elif name == 'rotate' and values:
+            angle = np.radians(values[0])
+            rotation = np.array([[np.cos(angle), -np.sin(angle), 0], [np.sin(angle), np.cos(angle), 0], [0, 0, 1]])
+            if len(values) == 3:
+                cx, cy = values[1], values[2]
+                to_center = np.array([[1, 0, cx], [0, 1, cy], [0, 0, 1]])
+                from_center = np.array([[1, 0, -cx], [0, 1, -cy], [0, 0, 1]])
+                rotation = to_center @ rotation @ from_center
+            step = rotation
+        elif name == 'skewX' and values:
+            step[0, 1] = np.tan(np.radians(values[0]))
+        elif name == 'skewY' and values:
+            step[1, 0] = np.tan(np.radians(values[0]))
+        matrix = matrix @ step
+    return matrix
+
+def _arc_steps(radius, sweep, tolerance):
+    """
+    Number of chords needed so an arc of the given radius and sweep stays within tolerance.
+    """
+    if radius <= tolerance:
+        return max(1, int(np.ceil(abs(sweep) / (np.pi / 2))))
+    max_step = 2 * np.arccos(1 - tolerance / radius)
+    return max(1, int(np.ceil(abs(sweep) / max_step)))
+
+def _bezier_steps(control, tolerance):
+    """
+    Number of uniform pieces that keep a Bezier within tolerance of its polyline.
+
+    Uses Wang's bound on the second differences of the control polygon, so flat
+    curves get a single piece and tight ones get more.
+    """
+    degree = len(control) - 1
+    if degree < 2:
+        return 1
+    second = control[2:] - 2 * control[1:-1] + control[:-2]
+    bound = degree * (degree - 1) / 8 * np.max(np.hypot(second[:, 0], second[:, 1]))
+    return max(1, int(np.ceil(np.sqrt(bound / tolerance))))
+
+def _flatten_bezier(control, tolerance):
+    """
+    Sample a quadratic or cubic Bezier curve, excluding its start point.
+    """
+    control = np.asarray(control, dtype=float)
+    t = np.linspace(0, 1, _bezier_steps(control, tolerance) + 1)[1:, np.newaxis]
+    s = 1 - t
+    if len(control) == 3:
+        return s * s * control[0] + 2 * s * t * control[1] + t * t * control[2]
+    return (s ** 3 * control[0] + 3 * s * s * t * control[1]
+            + 3 * s * t * t * control[2] + t ** 3 * control[3])
+
+def _flatten_arc(start, rx, ry, phi_degrees, large_arc, sweep, end, tolerance):
+    """
+    Sample an SVG elliptical arc (endpoint parameterization), excluding its start point.
+
+    Follows the endpoint-to-center conversion of the SVG specification (F.6.5),
+    including the radius correction for arcs whose radii are too small.
+    """
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0 or np.allclose(start, end):
+        return np.array([end])
+
+    phi = np.radians(phi_degrees)
+    cos_phi, sin_phi = np.cos(phi), np.sin(phi)
+    dx, dy = (start - end) / 2
+    x1 = cos_phi * dx + sin_phi * dy
+    y1 = -sin_phi * dx + cos_phi * dy
+
+    scale = x1 ** 2 / rx ** 2 + y1 ** 2 / ry ** 2
+    if scale > 1:
+        rx, ry = rx * np.sqrt(scale), ry * np.sqrt(scale)
+
+    numerator = rx ** 2 * ry ** 2 - rx ** 2 * y1 ** 2 - ry ** 2 * x1 ** 2
+    denominator = rx ** 2 * y1 ** 2 + ry ** 2 * x1 ** 2
+    factor = np.sqrt(max(numerator, 0) / denominator)
+    if large_arc == sweep:
+        factor = -factor
+    cx1 = factor * rx * y1 / ry
+    cy1 = -factor * ry * x1 / rx
+    center = np.array([cos_phi * cx1 - sin_phi * cy1, sin_phi * cx1 + cos_phi * cy1]) + (start + end) / 2
+
+    theta1 = np.arctan2((y1 - cy1) / ry, (x1 - cx1) / rx)
+    theta2 = np.arctan2((-y1 - cy1) / ry, (-x1 - cx1) / rx)
+    delta = theta2 - theta1
+    if sweep and delta < 0:
+        delta += 2 * np.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * np.pi
+
+    theta = theta1 + delta * np.linspace(0, 1, _arc_steps(max(rx, ry), delta, tolerance) + 1)[1:]
+    x, y = rx * np.cos(theta), ry * np.sin(theta)
+    points = np.column_stack([cos_phi * x - sin_phi * y, sin_phi * x + cos_phi * y]) + center
+    points[-1] = end  # Land exactly on the endpoint despite rounding
+    return points
+
+def _path_arguments(command, text):
+    """
+    Split the argument string of one path command into groups of numbers.
+
+    Arc flags may be written without separators ("a5 5 0 011 1"), so they are read
+    one character at a time.
+    """
+    upper = command.upper()
+    n_args = _ARGS_PER_COMMAND[upper]
+    if n_args == 0:
+        return [[]]
+    if upper != 'A':
+        values = _numbers(text)
+        return [values[i:i + n_args] for i in range(0, len(values) - n_args + 1, n_args)]
+
+    groups = []
+    position = 0
+    while True:
+        group = []
+        for index in range(7):
+            pattern = _FLAG_RE if index in (3, 4) else _ARC_NUMBER_RE
+            match = pattern.match(text, position)
+            if not match:
+                return groups
+            group.append(float(match.group(1)))
+            position = match.end()
+        groups.append(group)
+
+def parse_path_data(d, tolerance=0.1):
+    """
+    Flatten SVG path data into polylines, one per subpath.
+
+    Parameters:
+        d (str): The ``d`` attribute of a ``<path>`` element.
+        tolerance (float): Maximum distance between a curve and its polyline.
+
+    Returns:
+        list: List of (m, 2) arrays, one per subpath; closed subpaths end at their start point.
+    """
+    segments = []
+    current = []
+    position = np.zeros(2)
+    subpath_start = np.zeros(2)
+    last_control = None
+    last_command = ''
+
+    def finish():
+        if len(current) > 1:
+            segments.append(np.vstack(current))
+
+    for command, text in _COMMAND_RE.findall(d):
+        upper = command.upper()
+        relative = command.islower()
+        for index, args in enumerate(_path_arguments(command, text)):
+            origin = position if relative else np.zeros(2)
+            if upper == 'M' and index == 0:
+                finish()
+                position = origin + args
+                subpath_start = position
+                current = [position[np.newaxis]]
+            elif upper in ('M', 'L'):  # Extra moveto pairs are implicit linetos
+                position = origin + args
+                current.append(position[np.newaxis])
+            elif upper == 'H':
+                position = np.array([(position[0] if relative else 0.0) + args[0], position[1]])
+                current.append(position[np.newaxis])
+            elif upper == 'V':
+                position = np.array([position[0], (position[1] if relative else 0.0) + args[0]])
+                current.append(position[np.newaxis])
+            elif upper in ('C', 'S'):
+                if upper == 'C':
+                    control1 = origin + args[0:2]
+                    control2, end = origin + args[2:4], origin + args[4:6]
+                else:
+                    reflect = last_control is not None and last_command in ('C', 'S')
+                    control1 = 2 * position - last_control if reflect else position
+                    control2, end = origin + args[0:2], origin + args[2:4]
+                current.append(_flatten_bezier([position, control1, control2, end], tolerance))
+                last_control, position = control2, end
+            elif upper in ('Q', 'T'):
+                if upper == 'Q':
+                    control, end = origin + args[0:2], origin + args[2:4]
+                else:
+                    reflect = last_control is not None and last_command in ('Q', 'T')
+                    control = 2 * position - last_control if reflect else position
+                    end = origin + args[0:2]
+                current.append(_flatten_bezier([position, control, end], tolerance))
+                last_control, position = control, end
+            elif upper == 'A':
+                rx, ry, phi, large_arc, sweep = args[:5]
+                end = origin + args[5:7]
+                current.append(_flatten_arc(position, rx, ry, phi, large_arc, sweep, end, tolerance))
+                position = end
+            elif upper == 'Z':
+                if current and not np.allclose(current[-1][-1], subpath_start):
+                    current.append(subpath_start[np.newaxis])
+                finish()
+                position = subpath_start
+                current = [position[np.newaxis]]
+
+            if upper not in ('C', 'S', 'Q', 'T'):
+                last_control = None
+            last_command = upper
+
+    finish()
+    return segments
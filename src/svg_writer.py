@@ -0,0 +1,296 @@
+import re
+
+import numpy as np
+
+# Trailing zeros of fixed-point numbers ("1.50" -> "1.5", "2.00" -> "2")
+_TRAILING_ZEROS_RE = re.compile(r'(\.\d*?)0+\b')
+# A zero before the decimal point ("0.5" -> ".5", "-0.5" -> "-.5")
+_LEADING_ZERO_RE = re.compile(r'(?<![\d.])0\.')
+
+def format_points(XY, precision=2):
+    """
+    Format points as ``x,y x,y ...`` with at most precision decimals.
+
+    All points are formatted by a single ``%`` operation, which is much faster than
+    formatting each number separately.
+
+    Parameters:
+        XY (np.ndarray): Array of shape (n, 2).
+        precision (int): Number of decimals kept.
+
+    Returns:
+        str: The formatted coordinates.
+    """
+    XY = np.asarray(XY, dtype=np.float64).reshape(-1, 2)
+    # Adding 0.0 turns the -0.0 of rounded tiny negative values into 0.0
+    values = np.round(XY, precision).ravel() + 0.0
+    text = (f"%.{precision}f,%.{precision}f " * len(XY) % tuple(values)).rstrip()
+    return _TRAILING_ZEROS_RE.sub(_strip_zeros, text)
+
+def format_path_data(XY, precision=2):
+    """
+    Format one open subpath as compact path data: ``M x,y l dx,dy dx,dy ...``.
+
+    Relative moves need fewer digits than absolute coordinates. They are taken between
+    the already rounded absolute points, so rounding errors do not accumulate along
+    the path, and leading zeros (``0.5`` -> ``.5``) are dropped.
+
+    Parameters:
+        XY (np.ndarray): Array of shape (n, 2) with n >= 1.
+        precision (int): Number of decimals kept.
+
+    Returns:
+        str: The path data.
+    """
+    rounded = np.round(np.asarray(XY, dtype=np.float64).reshape(-1, 2), precision)
+    text = 'M' + format_points(rounded[:1], precision)
+    if len(rounded) > 1:
+        deltas = np.round(np.diff(rounded, axis=0), precision)
+        text += 'l' + format_points(deltas, precision)
+    return _LEADING_ZERO_RE.sub('.', text)
+
+def format_number(value, precision=2):
+    """
+    Format one number like ``format_points`` does.
+    """
+    return _TRAILING_ZEROS_RE.sub(_strip_zeros, f"{round(float(value), precision) + 0.0:.{precision}f}")
+
+def _strip_zeros(match):
+    kept = match.group(1)
+    return '' if kept == '.' else kept
+
+class SVGWriter:
+    """
+    Stream curves and detected shapes to an SVG file element by element.
+
+    Unlike ``save_plot_as_svg``, nothing goes through matplotlib: every segment is
+    written as a ``<path>`` directly from its point array, and detected primitives
+    become native ``<circle>``, ``<ellipse>``, ``<rect>``, ``<polygon>`` and ``<line>``
+    elements. Coordinates are written in the data coordinate system, whose y axis
+    points down like SVG's, with ``precision`` decimals.
+
+    Use as a context manager; elements are written as they are added::
+
+        with SVGWriter(path, viewbox=(0, 0, 100, 100)) as svg:
+            svg.add_path(segments)
+            svg.add_circle(50, 50, 10)
+
+    Parameters:
+        output_path (str): The path where the SVG should be saved.
+        viewbox (tuple): (min_x, min_y, width, height) of the drawing in data units.
+        size (tuple): Displayed (width, height) in pixels; the drawing keeps its aspect ratio.
+        precision (int): Number of decimals written for coordinates.
+    """
+
+    def __init__(self, output_path, viewbox, size=None, precision=2):
+        self.output_path = output_path
+        self.viewbox = viewbox
+        self.size = size
+        self.precision = precision
+        self._file = None
+        self._group_open = False
+
+    def __enter__(self):
+        self._file = open(self.output_path, 'w')
+        viewbox = ' '.join(self._number(value) for value in self.viewbox)
+        size = ''
+        if self.size is not None:
+            size = f' width="{self.size[0]}" height="{self.size[1]}"'
+        self._file.write(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewbox}"{size}>\n')
+        return self
+
+    def __exit__(self, *exc_info):
+        self.end_group()
+        self._file.write('</svg>\n')
+        self._file.close()
+        self._file = None
+
+    def _number(self, value):
+        return format_number(value, self.precision)
+
+    def begin_group(self, color='blue', linewidth=2):
+        """
+        Start a ``<g>`` whose elements are stroked with the given color and width.
+
+        Parameters:
+            color (str): Stroke color.
+            linewidth (float): Stroke width in data (viewBox) units.
+        """
+        self.end_group()
+        self._file.write(f'<g fill="none" stroke="{color}" stroke-width="{linewidth:.4g}" '
+                         f'stroke-linecap="round" stroke-linejoin="round">\n')
+        self._group_open = True
+
+    def end_group(self):
+        """
+        Close the current ``<g>``, if any.
+        """
+        if self._group_open:
+            self._file.write('</g>\n')
+            self._group_open = False
+
+    def _element(self, text):
+        self._file.write(text + '\n')
+
+    def add_path(self, segments):
+        """
+        Write one path as a single ``<path>`` with one subpath per segment.
+
+        A segment whose last point repeats its first is closed with ``z``.
+
+        Parameters:
+            segments (list): List of (m, 2) point arrays.
+        """
+        subpaths = []
+        for XY in segments:
+            XY = np.asarray(XY, dtype=np.float64).reshape(-1, 2)
+            if len(XY) == 0:
+                continue
+            closed = len(XY) > 2 and np.array_equal(XY[0], XY[-1])
+            if closed:
+                XY = XY[:-1]
+            subpaths.append(format_path_data(XY, self.precision) + ('z' if closed else ''))
+        if subpaths:
+            self._element(f'<path d="{"".join(subpaths)}"/>')
+
+    def add_polyline(self, XY):
+        """
+        Write an open polyline.
+        """
+        self._element(f'<polyline points="{format_points(XY, self.precision)}"/>')
+
+    def add_polygon(self, XY):
+        """
+        Write a closed polygon through the given vertices (used for polygons and stars).
+        """
+        XY = np.asarray(XY, dtype=np.float64).reshape(-1, 2)
+        if len(XY) > 2 and np.array_equal(XY[0], XY[-1]):
+            XY = XY[:-1]
+        self._element(f'<polygon points="{format_points(XY, self.precision)}"/>')
+
+    def add_line(self, start, end):
+        """
+        Write a straight line between two points.
+        """
+        (x1, y1), (x2, y2) = start, end
+        n = self._number
+        self._element(f'<line x1="{n(x1)}" y1="{n(y1)}" x2="{n(x2)}" y2="{n(y2)}"/>')
+
+    def add_circle(self, cx, cy, r):
+        """
+        Write a circle, as returned by ``detect_circles``.
+        """
+        n = self._number
+        self._element(f'<circle cx="{n(cx)}" cy="{n(cy)}" r="{n(r)}"/>')
+
+    def add_ellipse(self, cx, cy, a, b, angle=0.0):
+        """
+        Write an ellipse, as returned by ``detect_ellipses``.
+
+        Parameters:
+            cx, cy (float): Center.
+            a, b (float): Semi-axes along the rotated x and y axes.
+            angle (float): Rotation in radians.
+        """
+        n = self._number
+        rotate = self._rotate(angle, cx, cy)
+        self._element(f'<ellipse cx="{n(cx)}" cy="{n(cy)}" rx="{n(a)}" ry="{n(b)}"{rotate}/>')
+
+    def add_rect(self, vertices):
+        """
+        Write a (possibly rotated) rectangle given its four corners in order, as
+        returned by ``detect_rectangles``.
+        """
+        vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)[:4]
+        width_vector = vertices[1] - vertices[0]
+        width = np.hypot(*width_vector)
+        height = np.hypot(*(vertices[2] - vertices[1]))
+        cx, cy = vertices.mean(axis=0)
+        n = self._number
+        rotate = self._rotate(np.arctan2(width_vector[1], width_vector[0]), cx, cy)
+        self._element(f'<rect x="{n(cx - width / 2)}" y="{n(cy - height / 2)}" '
+                      f'width="{n(width)}" height="{n(height)}"{rotate}/>')
+
+    def _rotate(self, angle, cx, cy):
+        degrees = self._number(np.degrees(angle))
+        if degrees == '0':
+            return ''
+        return f' transform="rotate({degrees} {self._number(cx)} {self._number(cy)})"'
+
+    def add_shapes(self, shapes):
+        """
+        Write detected primitives as native SVG elements.
+
+        Parameters:
+            shapes (dict): Detector results keyed by kind: 'lines', 'circles',
+                'ellipses', 'rectangles', 'polygons' and 'stars', in the formats
+                returned by the matching ``regularization.detect_*`` function.
+        """
+        for start, end in shapes.get('lines', ()):
+            self.add_line(start, end)
+        for circle in shapes.get('circles', ()):
+            self.add_circle(*circle)
+        for ellipse in shapes.get('ellipses', ()):
+            self.add_ellipse(*ellipse)
+        for rectangle in shapes.get('rectangles', ()):
+            self.add_rect(rectangle)
+        for kind in ('polygons', 'stars'):
+            for polygon in shapes.get(kind, ()):
+                self.add_polygon(polygon)
+
+def shapes_bounds(shapes):
+    """
+    Return the corner points of the bounding boxes of detected shapes, shape (n, 2).
+    """
+    corners = [np.empty((0, 2))]
+    for line in shapes.get('lines', ()):
+        corners.append(np.asarray(line, dtype=np.float64).reshape(-1, 2))
+    for cx, cy, r in shapes.get('circles', ()):
+        corners.append([[cx - r, cy - r], [cx + r, cy + r]])
+    for cx, cy, a, b, _ in shapes.get('ellipses', ()):
+        r = max(abs(a), abs(b))  # Enough for any rotation
+        corners.append([[cx - r, cy - r], [cx + r, cy + r]])
+    for kind in ('rectangles', 'polygons', 'stars'):
+        for vertices in shapes.get(kind, ()):
+            corners.append(np.asarray(vertices, dtype=np.float64).reshape(-1, 2))
+    return np.concatenate([np.asarray(c, dtype=np.float64) for c in corners])
+
+def write_svg(output_path, paths, shapes=None, color='blue', shape_color='red', linewidth=2,
+              precision=2, size=(640, 480), padding=0.05):
+    """
+    Write paths, and optionally detected shapes, straight to an SVG file.
+
+    Parameters:
+        output_path (str): The path where the SVG should be saved.
+        paths (iterable): Paths, where each path is a list of (m, 2) point arrays.
+        shapes (dict): Optional detected primitives (see ``SVGWriter.add_shapes``),
+            drawn on top of the paths.
+        color (str): Stroke color of the paths.
+        shape_color (str): Stroke color of the detected shapes.
+        linewidth (float): Stroke width in displayed pixels.
+        precision (int): Number of decimals written for coordinates.
+        size (tuple): Displayed (width, height) in pixels, or None to use the data size.
+        padding (float): Fraction of the data extent added as margin on each side.
+    """
+    paths = [[np.asarray(XY, dtype=np.float64).reshape(-1, 2) for XY in path] for path in paths]
+    shapes = shapes or {}
+
+    points = np.concatenate([XY for path in paths for XY in path] + [shapes_bounds(shapes)])
+    if len(points):
+        lo, hi = points.min(axis=0), points.max(axis=0)
+    else:
+        lo, hi = np.zeros(2), np.ones(2)
+    margin = np.maximum(hi - lo, 1e-9) * padding
+    lo, extent = lo - margin, hi - lo + 2 * margin
+
+    # Stroke widths are given in pixels but written in data units
+    pixel = 1.0 if size is None else float(np.max(extent / np.asarray(size, dtype=np.float64)))
+    linewidth = linewidth * pixel
+
+    with SVGWriter(output_path, (lo[0], lo[1], extent[0], extent[1]), size, precision) as svg:
+        svg.begin_group(color, linewidth)
+        for path in paths:
+            svg.add_path(path)
+        if shapes:
+            svg.begin_group(shape_color, linewidth)
+            svg.add_shapes(shapes)
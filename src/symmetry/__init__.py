@@ -1,4 +1,4 @@
 # src/symmetry/__init__.py
 
-from .reflection_symmetry import detect_reflection_symmetry
-from .rotational_symmetry import detect_rotational_symmetry
+from .reflection_symmetry import detect_reflection_symmetries
+from .rotational_symmetry import detect_rotational_symmetries
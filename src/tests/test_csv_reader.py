@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.csv_reader import parse_buffer, read_rows
+
+class TestCSVReader(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a scratch directory for CSV files.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, content):
+        csv_path = os.path.join(self.tmp.name, "data.csv")
+        with open(csv_path, 'wb') as f:
+            f.write(content)
+        return csv_path
+
+    def test_matches_genfromtxt_on_sample(self):
+        """
+        Test that a bundled problem file parses exactly like np.genfromtxt.
+        """
+        csv_path = "./src/problems/frag0.csv"
+        np.testing.assert_array_equal(read_rows(csv_path), np.genfromtxt(csv_path, delimiter=','))
+
+    def test_float32_output(self):
+        """
+        Test optional float32 output.
+        """
+        rows = read_rows(self.write(b"0,0,1.5,2.25\n1,0,3,4\n"), dtype=np.float32)
+        self.assertEqual(rows.dtype, np.float32)
+        np.testing.assert_array_equal(rows, [[0, 0, 1.5, 2.25], [1, 0, 3, 4]])
+
+    def test_small_chunks_match_whole_file(self):
+        """
+        Test that splitting into blocks on line boundaries does not change the result.
+        """
+        rng = np.random.default_rng(0)
+        rows = np.column_stack([np.arange(200) // 50, np.zeros(200), rng.random((200, 2))])
+        csv_path = os.path.join(self.tmp.name, "random.csv")
+        np.savetxt(csv_path, rows, delimiter=',')
+        np.testing.assert_array_equal(read_rows(csv_path, chunk_bytes=37), read_rows(csv_path))
+
+    def test_blank_lines_and_missing_final_newline(self):
+        """
+        Test that empty lines and CRLF endings are accepted.
+        """
+        rows = parse_buffer(b"0,0,1,2\r\n\r\n0,0,3,4")
+        np.testing.assert_array_equal(rows, [[0, 0, 1, 2], [0, 0, 3, 4]])
+        self.assertEqual(read_rows(self.write(b"")).shape, (0, 4))
+
+    def test_malformed_rows_raise_with_line_numbers(self):
+        """
+        Test that malformed rows raise instead of producing NaNs.
+        """
+        cases = {
+            b"0,0,1,2\n0,0,3\n": "line 2: expected 4",
+            b"0,0,1,2\n0,0,1,2,3\n": "line 2: expected 4",
+            b"0,0,1,2\n\n0,0,x,4\n": "line 3: field 3",
+            b"0,0,,2\n": "line 1: field 3",
+            b"0,0,nan,2\n": "line 1: field 3",
+            b"0,0,1,2\n0,0,3,4 # note\n": "line 2: field 4",
+            b"# path,segment,x,y\n0,0,1,2\n": "line 1: field 1",
+        }
+        for content, message in cases.items():
+            with self.assertRaisesRegex(ValueError, message):
+                read_rows(self.write(content))
+
+    def test_line_numbers_across_chunks(self):
+        """
+        Test that error line numbers are absolute when the file is read in blocks.
+        """
+        content = b"0,0,1,2\n" * 20 + b"0,0,bad,2\n"
+        with self.assertRaisesRegex(ValueError, "line 21:"):
+            read_rows(self.write(content), chunk_bytes=16)
+
+if __name__ == '__main__':
+    unittest.main()
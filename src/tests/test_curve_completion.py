@@ -1,7 +1,7 @@
 import unittest
 import numpy as np
 from src.curve_completion.gap_filler import fill_gaps
-from src.curve_completion.occlusion_handler import handle_occlusions
+from src.curve_completion.occlusion_handler import complete_rectangle, fit_rectangle, handle_occlusions
 
 class TestCurveCompletion(unittest.TestCase):
 
@@ -52,5 +52,24 @@ class TestCurveCompletion(unittest.TestCase):
         np.testing.assert_array_almost_equal(handled_curve, expected_handled_curve, decimal=2,
                                              err_msg="Occlusion handling did not produce expected results.")
 
+    def test_fit_rectangle(self):
+        """
+        Test fitting and completing a rotated square, whose covariance has no preferred axis.
+        """
+        t = np.linspace(0, 1, 20, endpoint=False)[:, None]
+        corners = np.array([[0.0, 0.0], [4, 0], [4, 4], [0, 4]])
+        square = np.vstack([a + t * (b - a) for a, b in zip(corners, np.roll(corners, -1, axis=0))])
+        angle = np.radians(30)
+        rot = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        points = square.dot(rot.T) + [10, 5]
+
+        center_x, center_y, width, height, fitted_angle = fit_rectangle(points)
+        np.testing.assert_allclose([center_x, center_y], rot.dot([2, 2]) + [10, 5], atol=1e-9)
+        np.testing.assert_allclose([width, height, fitted_angle], [4, 4, angle], atol=1e-9)
+
+        completed = complete_rectangle(points[:50])
+        distances = np.abs((completed - rot.dot([2, 2]) - [10, 5]).dot(rot)).max(axis=1)
+        self.assertLess(np.abs(distances - 2).max(), 1e-9)
+
 if __name__ == '__main__':
     unittest.main()
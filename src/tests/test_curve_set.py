@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from src.curve_set import CurveSet, iter_segment_batches
+
+class TestCurveSet(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a small nested drawing with two paths and three segments.
+        """
+        self.paths = [
+            [np.array([[0.0, 0.0], [1.0, 1.0], [2.0, 2.0]]), np.array([[5.0, 5.0], [6.0, 6.0]])],
+            [np.array([[9.0, 0.0], [9.0, 1.0]])],
+        ]
+
+    def test_round_trip(self):
+        """
+        Test that from_paths/to_paths preserve the nested structure.
+        """
+        curves = CurveSet.from_paths(self.paths)
+        self.assertEqual((curves.n_paths, curves.n_segments, curves.n_points), (2, 3, 7))
+        np.testing.assert_array_equal(curves.segment_lengths, [3, 2, 2])
+        np.testing.assert_array_equal(curves.segment_path_index, [0, 0, 1])
+
+        restored = curves.to_paths()
+        self.assertEqual([len(path) for path in restored], [2, 1])
+        for path, expected in zip(restored, self.paths):
+            for XY, expected_XY in zip(path, expected):
+                np.testing.assert_array_equal(XY, expected_XY)
+
+    def test_segment_views_are_zero_copy(self):
+        """
+        Test that segment and path accessors return views into the flat array.
+        """
+        curves = CurveSet.from_paths(self.paths)
+        self.assertTrue(np.shares_memory(curves.segment(1), curves.points))
+        np.testing.assert_array_equal(curves.segment(1), self.paths[0][1])
+        path = curves.path(0)
+        self.assertEqual(len(path), 2)
+        self.assertTrue(all(np.shares_memory(XY, curves.points) for XY in path))
+
+    def test_from_rows_matches_from_paths(self):
+        """
+        Test building from raw CSV rows, including unsorted ids.
+        """
+        rows = np.array([
+            [1, 0, 9.0, 0.0], [0, 1, 5.0, 5.0], [0, 0, 0.0, 0.0], [0, 0, 1.0, 1.0],
+            [1, 0, 9.0, 1.0], [0, 0, 2.0, 2.0], [0, 1, 6.0, 6.0],
+        ])
+        curves = CurveSet.from_rows(rows)
+        expected = CurveSet.from_paths(self.paths)
+        np.testing.assert_array_equal(curves.points, expected.points)
+        np.testing.assert_array_equal(curves.segment_offsets, expected.segment_offsets)
+        np.testing.assert_array_equal(curves.path_offsets, expected.path_offsets)
+
+    def test_segment_reduce_handles_empty_segments(self):
+        """
+        Test per-segment reductions, including an empty segment.
+        """
+        curves = CurveSet.from_paths([[np.ones((2, 2)), np.empty((0, 2)), np.full((3, 2), 2.0)]])
+        sums = curves.segment_reduce(curves.points[:, 0])
+        np.testing.assert_array_equal(sums, [2.0, 0.0, 6.0])
+
+    def test_from_segments(self):
+        """
+        Test building a single path from a flat point array.
+        """
+        points = np.arange(14, dtype=float).reshape(7, 2)
+        curves = CurveSet.from_segments(points, [0, 3, 5, 7])
+        self.assertEqual((curves.n_paths, curves.n_segments), (1, 3))
+        self.assertTrue(np.shares_memory(curves.points, points))
+        self.assertEqual(CurveSet.from_segments(points).n_segments, 1)
+
+    def test_segment_batches(self):
+        """
+        Test batching the segments of paths and of a CurveSet, skipping short segments.
+        """
+        batches = list(iter_segment_batches(iter(self.paths), 2, min_points=3))
+        self.assertEqual([batch.n_segments for batch in batches], [1])
+        batches = list(iter_segment_batches(self.paths, 2))
+        self.assertEqual([batch.n_segments for batch in batches], [2, 1])
+        curves = CurveSet.from_paths(self.paths)
+        (batch,) = iter_segment_batches(curves, 2, min_points=3)
+        np.testing.assert_array_equal(batch.points, curves.segment(0))
+
+    def test_invalid_offsets(self):
+        """
+        Test that inconsistent offsets are rejected.
+        """
+        with self.assertRaises(ValueError):
+            CurveSet(np.zeros((3, 2)), [0, 2], [0, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
+import os
+import tempfile
 import unittest
 import numpy as np
-from src.data_loader import read_csv
+from src.data_loader import read_csv, group_paths, iter_csv, load_dataset, find_csv_files, LazyDataset
 
 class TestDataLoader(unittest.TestCase):
 
@@ -42,5 +44,160 @@ class TestDataLoader(unittest.TestCase):
         # Check for infinite values
         self.assertFalse(np.isinf(loaded_data).any(), "Loaded data contains infinite values.")
 
+def _reference_group(np_path_XYs):
+    """
+    The original mask-per-id grouping, kept as an oracle for group_paths.
+    """
+    path_XYs = []
+    for i in np.unique(np_path_XYs[:, 0]):
+        npXYs = np_path_XYs[np_path_XYs[:, 0] == i][:, 1:]
+        XYs = []
+        for j in np.unique(npXYs[:, 0]):
+            XYs.append(npXYs[npXYs[:, 0] == j][:, 1:])
+        path_XYs.append(XYs)
+    return path_XYs
+
+def assert_same_paths(actual, expected):
+    """
+    Assert that two nested [[XY, ...], ...] structures are identical.
+    """
+    assert len(actual) == len(expected), f"{len(actual)} paths != {len(expected)} paths"
+    for path, expected_path in zip(actual, expected):
+        assert len(path) == len(expected_path), f"{len(path)} segments != {len(expected_path)} segments"
+        for XY, expected_XY in zip(path, expected_path):
+            np.testing.assert_array_equal(XY, expected_XY)
+
+class TestGroupPaths(unittest.TestCase):
+
+    def test_matches_reference_on_shuffled_rows(self):
+        """
+        Test that interleaved, unsorted ids group exactly like the original loader.
+        """
+        rng = np.random.default_rng(0)
+        rows = np.column_stack([
+            rng.integers(0, 7, 500), rng.integers(0, 4, 500), rng.random((500, 2))
+        ]).astype(float)
+        assert_same_paths(group_paths(rows), _reference_group(rows))
+
+    def test_sorted_rows_return_views(self):
+        """
+        Test that already-grouped input is split into views, not copies.
+        """
+        rows = np.array([
+            [0, 0, 1.0, 2.0], [0, 0, 3.0, 4.0], [0, 1, 5.0, 6.0],
+            [1, 0, 7.0, 8.0], [1, 0, 9.0, 0.0]
+        ])
+        paths = group_paths(rows)
+        assert_same_paths(paths, _reference_group(rows))
+        self.assertTrue(all(np.shares_memory(XY, rows) for path in paths for XY in path))
+
+    def test_empty_and_single_row(self):
+        """
+        Test degenerate inputs.
+        """
+        self.assertEqual(group_paths(np.empty((0, 4))), [])
+        paths = group_paths(np.array([2.0, 3.0, 4.0, 5.0]))
+        self.assertEqual(len(paths), 1)
+        np.testing.assert_array_equal(paths[0][0], [[4.0, 5.0]])
+
+    def test_read_csv_sample_matches_reference(self):
+        """
+        Test read_csv on a bundled problem file against the original grouping.
+        """
+        rows = np.genfromtxt("./src/problems/frag0.csv", delimiter=',')
+        assert_same_paths(read_csv("./src/problems/frag0.csv"), _reference_group(rows))
+
+class TestIterCSV(unittest.TestCase):
+
+    def setUp(self):
+        self.csv_path = "./src/problems/occlusion1.csv"
+
+    def test_stream_matches_read_csv(self):
+        """
+        Test that streaming with tiny chunks yields the same paths as read_csv.
+        """
+        expected = read_csv(self.csv_path)
+        for chunk_bytes in (64, 4096):
+            streamed = list(iter_csv(self.csv_path, chunk_bytes=chunk_bytes))
+            assert_same_paths(streamed, expected)
+
+    def test_stream_by_segment(self):
+        """
+        Test that segment mode yields every segment in order.
+        """
+        expected = [XY for path in read_csv(self.csv_path) for XY in path]
+        streamed = list(iter_csv(self.csv_path, by='segment', chunk_bytes=256))
+        self.assertEqual(len(streamed), len(expected))
+        for XY, expected_XY in zip(streamed, expected):
+            np.testing.assert_array_equal(XY, expected_XY)
+
+    def test_non_contiguous_path_raises(self):
+        """
+        Test that a path id reappearing after it was yielded is an error.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "interleaved.csv")
+            np.savetxt(csv_path, [[0, 0, 1, 1], [1, 0, 2, 2], [0, 0, 3, 3]], delimiter=',')
+            with self.assertRaises(ValueError):
+                list(iter_csv(csv_path))
+
+    def test_detectors_consume_stream(self):
+        """
+        Test that a detector gives the same result on a stream as on the loaded list.
+        """
+        from src.regularization.line_detector import detect_lines
+        expected = detect_lines(read_csv(self.csv_path))
+        streamed = detect_lines(iter_csv(self.csv_path, chunk_bytes=512))
+        np.testing.assert_array_equal(streamed, expected)
+
+class TestLoadDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = "./src/problems"
+        self.expected = load_dataset(self.data_dir)
+
+    def test_parallel_matches_serial(self):
+        """
+        Test that parsing in a process pool gives the same dataset as the serial loader.
+        """
+        parallel = load_dataset(self.data_dir, workers=2)
+        self.assertEqual(list(parallel), list(self.expected))
+        for name in self.expected:
+            assert_same_paths(parallel[name], self.expected[name])
+
+    def test_lazy_parses_on_access(self):
+        """
+        Test that the lazy mapping parses only what is accessed and does not keep it.
+        """
+        with load_dataset(self.data_dir, lazy=True) as dataset:
+            self.assertIsInstance(dataset, LazyDataset)
+            self.assertEqual(sorted(dataset), sorted(self.expected))
+            self.assertEqual(dataset._futures, {})
+            first = dataset['frag0']
+            self.assertIsNot(dataset['frag0'], first)
+            assert_same_paths(first, self.expected['frag0'])
+
+    def test_lazy_with_workers(self):
+        """
+        Test the lazy mapping backed by a process pool.
+        """
+        with load_dataset(self.data_dir, lazy=True, workers=2) as dataset:
+            for name in self.expected:
+                assert_same_paths(dataset[name], self.expected[name])
+
+    def test_window_is_bounded(self):
+        """
+        Test that at most window files are parsed ahead, and that the window is refilled as files are taken.
+        """
+        with LazyDataset(find_csv_files(self.data_dir), workers=1, window=2) as dataset:
+            names = list(dataset)
+            self.assertEqual(list(dataset._futures), names[:2])
+            dataset[names[3]]  # Out of order: parsed here, and not ahead later
+            self.assertEqual(list(dataset._futures), names[:2])
+            dataset[names[0]]
+            self.assertEqual(list(dataset._futures), [names[1], names[2]])
+            dataset[names[1]]
+            self.assertEqual(list(dataset._futures), [names[2], names[4]])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+import filecmp
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import main
+from src.data_loader import find_csv_files
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a data directory with a few small drawings and one malformed file.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, "data")
+        os.makedirs(self.data_dir)
+        rng = np.random.default_rng(0)
+        for i in range(5):
+            rows = np.column_stack([np.arange(40) // 20, np.zeros(40), rng.random((40, 2)) * 100])
+            np.savetxt(os.path.join(self.data_dir, f"drawing{i}.csv"), rows, delimiter=',')
+        with open(os.path.join(self.data_dir, "broken.csv"), 'w') as f:
+            f.write("0,0,1,2\n0,0,x,4\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_batch(self, name, **kwargs):
+        output_dir = os.path.join(self.tmp.name, name)
+        results = main.main(self.data_dir, output_dir, cache_dir=os.path.join(self.tmp.name, "cache"), **kwargs)
+        return output_dir, results
+
+    def test_parallel_matches_serial(self):
+        """
+        Test that the parallel batch writes byte-identical files and the same ordered summary.
+        """
+        for renderer in ("direct", "matplotlib"):
+            serial_dir, serial = self.run_batch(f"serial_{renderer}", renderer=renderer, workers=1)
+            parallel_dir, parallel = self.run_batch(f"parallel_{renderer}", renderer=renderer, workers=2,
+                                                    chunk_size=2)
+            files = sorted(f for f in os.listdir(serial_dir) if not f.startswith("."))
+            self.assertEqual(len(files), 10)
+            self.assertEqual(files, sorted(f for f in os.listdir(parallel_dir) if not f.startswith(".")))
+            match, mismatch, errors = filecmp.cmpfiles(serial_dir, parallel_dir, files, shallow=False)
+            self.assertEqual((mismatch, errors), ([], []))
+            self.assertEqual([(r['name'], r['status']) for r in serial],
+                             [(r['name'], r['status']) for r in parallel])
+
+    def test_load_workers_share_the_cpus(self):
+        """
+        Test that the parse pool gets the CPUs the render workers leave, unless set.
+        """
+        with mock.patch('os.cpu_count', return_value=8):
+            self.assertEqual(main.load_worker_count(1), 7)
+            self.assertEqual(main.load_worker_count(8), 1)
+            self.assertEqual(main.load_worker_count(8, load_workers=3), 3)
+
+    def test_errors_are_isolated_per_file(self):
+        """
+        Test that a malformed file is reported without stopping the other files.
+        """
+        _, results = self.run_batch("out", workers=2, chunk_size=3)
+        statuses = {result['name']: result['status'] for result in results}
+        self.assertEqual(statuses.pop("broken"), "error")
+        self.assertEqual(set(statuses.values()), {"ok"})
+        self.assertEqual([result['name'] for result in results], list(find_csv_files(self.data_dir)))
+
+    def test_incremental_rebuild(self):
+        """
+        Test that a rerun only rebuilds edited inputs and prunes outputs of removed ones, down to the last.
+        """
+        os.remove(os.path.join(self.data_dir, "broken.csv"))
+        output_dir, results = self.run_batch("out")
+        self.assertEqual({result['status'] for result in results}, {"ok"})
+
+        _, results = self.run_batch("out")
+        self.assertEqual({result['status'] for result in results}, {"fresh"})
+
+        with open(os.path.join(self.data_dir, "drawing1.csv"), 'a') as f:
+            f.write("5,0,1,1\n5,0,2,2\n")
+        os.remove(os.path.join(self.data_dir, "drawing2.csv"))
+        _, results = self.run_batch("out")
+        statuses = {result['name']: result['status'] for result in results}
+        self.assertEqual(statuses, {"drawing0": "fresh", "drawing1": "ok", "drawing3": "fresh", "drawing4": "fresh"})
+        self.assertFalse(os.path.exists(os.path.join(output_dir, "drawing2_from_csv.svg")))
+
+        _, results = self.run_batch("out", renderer="direct")
+        self.assertEqual({result['status'] for result in results}, {"ok"})
+
+        for name in os.listdir(self.data_dir):
+            os.remove(os.path.join(self.data_dir, name))
+        _, results = self.run_batch("out")
+        self.assertEqual(results, [])
+        self.assertEqual(os.listdir(output_dir), [".manifest.json"])
+        self.assertEqual(len(main.BuildManifest(output_dir)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import time
+import unittest
+from src.manifest import BuildManifest
+
+class TestBuildManifest(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up an input file, an output directory and one recorded build.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp.name, "a.csv")
+        self.output_dir = os.path.join(self.tmp.name, "out")
+        os.makedirs(self.output_dir)
+        with open(self.input_path, 'w') as f:
+            f.write("0,0,1,2\n")
+        self.params = {'renderer': 'direct'}
+        self.build(BuildManifest(self.output_dir, 'v1'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, manifest):
+        with open(os.path.join(self.output_dir, "a.svg"), 'w') as f:
+            f.write("<svg/>")
+        manifest.record("a", self.input_path, self.params, ["a.svg"])
+        manifest.save()
+
+    def test_fresh_after_reload(self):
+        """
+        Test that a saved build is fresh in a new manifest, even after touching the input.
+        """
+        manifest = BuildManifest(self.output_dir, 'v1')
+        self.assertTrue(manifest.is_fresh("a", self.input_path, self.params))
+        stat = os.stat(self.input_path)
+        os.utime(self.input_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertTrue(manifest.is_fresh("a", self.input_path, self.params))
+
+    def test_stale_when_anything_changes(self):
+        """
+        Test that input content, parameters, code version and missing outputs make a build stale.
+        """
+        self.assertFalse(BuildManifest(self.output_dir, 'v2').is_fresh("a", self.input_path, self.params))
+        manifest = BuildManifest(self.output_dir, 'v1')
+        self.assertFalse(manifest.is_fresh("a", self.input_path, {'renderer': 'matplotlib'}))
+        self.assertFalse(manifest.is_fresh("b", self.input_path, self.params))
+
+        with open(self.input_path, 'w') as f:
+            f.write("0,0,1,3\n")  # Same size, different content
+        os.utime(self.input_path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        self.assertFalse(manifest.is_fresh("a", self.input_path, self.params))
+
+        self.build(manifest)
+        os.remove(os.path.join(self.output_dir, "a.svg"))
+        self.assertFalse(manifest.is_fresh("a", self.input_path, self.params))
+
+    def test_prune_removes_outputs_of_missing_inputs(self):
+        """
+        Test that pruning deletes the outputs of inputs that are gone.
+        """
+        manifest = BuildManifest(self.output_dir, 'v1')
+        self.assertEqual(manifest.prune(["a"]), [])
+        self.assertEqual(manifest.prune([]), ["a.svg"])
+        self.assertNotIn("a", manifest)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "a.svg")))
+
+if __name__ == '__main__':
+    unittest.main()
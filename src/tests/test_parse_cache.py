@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.data_loader import read_csv
+from unittest import mock
+from src.parse_cache import ParseCache
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a scratch directory with one small CSV file and a cache.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, "shape.csv")
+        self.rows = np.array([[0, 0, 1.0, 2.0], [0, 0, 3.0, 4.0], [1, 0, 5.0, 6.0]])
+        np.savetxt(self.csv_path, self.rows, delimiter=',')
+        self.cache = ParseCache(os.path.join(self.tmp.name, "cache"))
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def parse(self, csv_path):
+        self.calls += 1
+        return np.genfromtxt(csv_path, delimiter=',')
+
+    def test_hit_is_memory_mapped(self):
+        """
+        Test that the second load is served from the cache as a memory map.
+        """
+        self.cache.load(self.csv_path, self.parse)
+        array = self.cache.load(self.csv_path, self.parse)
+        self.assertEqual(self.calls, 1)
+        self.assertIsInstance(array, np.memmap)
+        np.testing.assert_array_equal(array, self.rows)
+
+    def test_cache_survives_reopen(self):
+        """
+        Test that a new cache object on the same directory reuses the entries.
+        """
+        self.cache.load(self.csv_path, self.parse)
+        reopened = ParseCache(self.cache.cache_dir)
+        self.assertIsNotNone(reopened.get(self.csv_path))
+
+    def test_modified_file_is_reparsed(self):
+        """
+        Test that changing the contents invalidates the entry, but touching does not.
+        """
+        self.cache.load(self.csv_path, self.parse)
+        stat = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNotNone(self.cache.get(self.csv_path))
+
+        np.savetxt(self.csv_path, self.rows * 2, delimiter=',')
+        self.assertIsNone(self.cache.get(self.csv_path))
+        np.testing.assert_array_equal(self.cache.load(self.csv_path, self.parse), self.rows * 2)
+
+    def test_parser_change_is_a_miss(self):
+        """
+        Test that entries written by another parser, or an older parser version, are not served.
+        """
+        self.cache.load(self.csv_path, self.parse)
+        self.assertIsNone(self.cache.get(self.csv_path, np.loadtxt))
+        self.assertFalse(self.cache.contains(self.csv_path, np.loadtxt))
+        self.assertTrue(self.cache.contains(self.csv_path, self.parse))
+        self.assertIsNotNone(self.cache.get(self.csv_path))
+        with mock.patch('src.parse_cache.PARSER_VERSION', -1):
+            self.assertIsNone(self.cache.get(self.csv_path, self.parse))
+            self.cache.load(self.csv_path, self.parse)
+        self.assertEqual(self.calls, 2)
+        self.assertIsNone(self.cache.get(self.csv_path, self.parse))
+
+    def test_invalidate_and_clear(self):
+        """
+        Test explicit invalidation.
+        """
+        self.cache.load(self.csv_path, self.parse)
+        self.cache.invalidate(self.csv_path)
+        self.assertIsNone(self.cache.get(self.csv_path))
+        self.cache.load(self.csv_path, self.parse)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(self.csv_path))
+        self.assertEqual(self.cache.nbytes, 0)
+
+    def test_eviction_is_lru_and_bounded(self):
+        """
+        Test that the least recently used entry is evicted when over budget.
+        """
+        other_path = os.path.join(self.tmp.name, "other.csv")
+        np.savetxt(other_path, self.rows, delimiter=',')
+        self.cache.load(self.csv_path, self.parse)
+        self.cache.max_bytes = self.cache.nbytes
+        self.cache.load(other_path, self.parse)
+        self.assertLessEqual(self.cache.nbytes, self.cache.max_bytes)
+        self.assertIsNone(self.cache.get(self.csv_path))
+        self.assertIsNotNone(self.cache.get(other_path))
+
+    def test_lookups_write_index_on_flush(self):
+        """
+        Test that hits update the access times in memory only, until flushed.
+        """
+        self.cache.load(self.csv_path, self.parse)
+        index_path = os.path.join(self.cache.cache_dir, "index.json")
+        before = os.stat(index_path).st_mtime_ns
+        os.utime(index_path, ns=(before - 10**9, before - 10**9))
+        for _ in range(3):
+            self.assertIsNotNone(self.cache.get(self.csv_path))
+        self.assertEqual(os.stat(index_path).st_mtime_ns, before - 10**9)
+
+        last_access = self.cache._index[ParseCache._key(self.csv_path)]['last_access']
+        with self.cache:
+            pass
+        reopened = ParseCache(self.cache.cache_dir)
+        self.assertEqual(reopened._index[ParseCache._key(self.csv_path)]['last_access'], last_access)
+
+    def test_read_csv_through_cache(self):
+        """
+        Test that read_csv returns the same paths with and without the cache.
+        """
+        expected = read_csv(self.csv_path)
+        read_csv(self.csv_path, cache=self.cache)
+        cached = read_csv(self.csv_path, cache=self.cache)
+        self.assertEqual(len(cached), len(expected))
+        for path, expected_path in zip(cached, expected):
+            for XY, expected_XY in zip(path, expected_path):
+                np.testing.assert_array_equal(XY, expected_XY)
+
+if __name__ == '__main__':
+    unittest.main()
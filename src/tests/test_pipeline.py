@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from contextlib import redirect_stderr
+from unittest import mock
+from src import pipeline
+
+FAST_DETECTORS = ['lines', 'ellipses', 'rectangles', 'stars']
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a scratch output directory.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmp.name, "output")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_selected_stages_are_reported(self):
+        """
+        Test that only the selected stages run and each reports time, throughput and memory.
+        """
+        state, report = pipeline.run_pipeline("./src/problems/frag0.csv", stages=['complete', 'regularize'],
+                                              detectors=FAST_DETECTORS, output_dir=self.output_dir)
+        self.assertEqual(list(report['stages']), ['load', 'complete', 'regularize'])
+        for stats in report['stages'].values():
+            self.assertGreater(stats['seconds'], 0)
+            self.assertGreater(stats['points'], 0)
+            self.assertGreater(stats['points_per_second'], 0)
+            self.assertGreaterEqual(stats['peak_memory_bytes'], 0)
+        self.assertEqual(sorted(state['shapes']), sorted(FAST_DETECTORS))
+        self.assertLessEqual(report['results']['paths_after_gap_filling'], report['results']['paths'])
+        self.assertFalse(os.path.exists(self.output_dir))
+        json.dumps(report)
+
+    def test_detector_errors_are_isolated(self):
+        """
+        Test that a detector raising an error is reported by name and the others still give their shapes.
+        """
+        expected, _ = pipeline.run_pipeline("./src/problems/frag0.csv", stages=['regularize'],
+                                            detectors=FAST_DETECTORS)
+        with mock.patch.dict('src.regularization.shapes._DETECTORS',
+                             {'ellipses': mock.Mock(side_effect=np.linalg.LinAlgError("singular"))}):
+            state, report = pipeline.run_pipeline("./src/problems/frag0.csv", stages=['regularize'],
+                                                  detectors=FAST_DETECTORS)
+        self.assertEqual(report['errors'], {'ellipses': "LinAlgError: singular"})
+        self.assertEqual(state['shapes']['ellipses'], [])
+        for detector in ('lines', 'rectangles', 'stars'):
+            self.assertEqual(len(state['shapes'][detector]), len(expected['shapes'][detector]))
+        self.assertGreater(len(state['shapes']['lines']), 0)
+
+    def test_cli_writes_report_and_outputs(self):
+        """
+        Test the command line end to end, from loading to export.
+        """
+        report_path = os.path.join(self.tmp.name, "report.json")
+        with redirect_stderr(io.StringIO()):
+            pipeline.main(["./src/problems/frag0.csv", "./src/problems/isolated.csv", "--stages", "complete",
+                           "regularize", "export", "--detectors", *FAST_DETECTORS,
+                           "--output-dir", self.output_dir, "--report", report_path])
+        with open(report_path) as f:
+            document = json.load(f)
+        self.assertEqual([report['name'] for report in document['files']], ['frag0', 'isolated'])
+        self.assertEqual(document['totals']['export']['files'], 2)
+        self.assertEqual(sorted(os.listdir(self.output_dir)),
+                         ['frag0_pipeline.png', 'frag0_pipeline.svg', 'isolated_pipeline.png',
+                          'isolated_pipeline.svg'])
+
+    def test_file_errors_are_isolated(self):
+        """
+        Test that a malformed file is reported with its error and the other files still run.
+        """
+        bad_path = os.path.join(self.tmp.name, "bad.csv")
+        with open(bad_path, 'w') as f:
+            f.write("0,0,1,2\n0,0,oops,2\n")
+        with redirect_stderr(io.StringIO()):
+            document = pipeline.main([bad_path, "./src/problems/frag0.csv", "--detectors", *FAST_DETECTORS,
+                                      "--output-dir", self.output_dir, "--report", os.path.join(self.tmp.name,
+                                                                                               "report.json")])
+        bad, good = document['files']
+        self.assertEqual(list(bad['errors']), ['load'])
+        self.assertIn("ValueError", bad['errors']['load'])
+        self.assertEqual(bad['stages'], {})
+        self.assertEqual(list(good['stages']), ['load', 'complete', 'regularize', 'export'])
+        self.assertNotIn('load', good['errors'])
+
+    def test_symmetry_is_capped(self):
+        """
+        Test that the symmetry stage leaves out segments over the point cap.
+        """
+        square = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=float)
+        long_square = np.repeat(square, 20, axis=0)
+        with mock.patch.object(pipeline, 'read_csv', return_value=[[square, long_square]]):
+            state, report = pipeline.run_pipeline("square.csv", stages=['symmetry'], symmetry_max_points=10)
+        self.assertEqual(report['results']['symmetry_skipped_segments'], 1)
+        self.assertEqual(report['stages']['symmetry']['points'], 4)
+        self.assertEqual(len(state['symmetries']['rotational']), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+import numpy as np
+from src.rasterizer import blend_palette, rasterize_coverage, rasterize_paths, write_png
+
+def read_png(png_path):
+    """
+    Decode the unfiltered 8-bit PNGs written by write_png.
+    """
+    with open(png_path, 'rb') as f:
+        data = f.read()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks = {}
+    position = 8
+    while position < len(data):
+        length, = struct.unpack('>I', data[position:position + 4])
+        kind = data[position + 4:position + 8]
+        body = data[position + 8:position + 8 + length]
+        crc, = struct.unpack('>I', data[position + 8 + length:position + 12 + length])
+        assert crc == zlib.crc32(kind + body) & 0xffffffff
+        chunks[kind] = body
+        position += 12 + length
+    width, height, _, color_type, _, _, _ = struct.unpack('>IIBBBBB', chunks[b'IHDR'])
+    channels = {0: 1, 2: 3, 3: 1, 6: 4}[color_type]
+    raw = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8)
+    rows = raw.reshape(height, width * channels + 1)
+    assert np.all(rows[:, 0] == 0)
+    image = rows[:, 1:].reshape(height, width, channels)
+    if b'PLTE' in chunks:
+        image = np.frombuffer(chunks[b'PLTE'], dtype=np.uint8).reshape(-1, 3)[image[:, :, 0]]
+    return image
+
+class TestRasterizer(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a square outline and a scratch directory.
+        """
+        self.square = [[np.array([[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]], dtype=float)]]
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_png_round_trip(self):
+        """
+        Test that RGB and indexed PNGs decode to the rasterized image.
+        """
+        image = rasterize_paths(self.square, size=(64, 48), color='red')
+        png_path = os.path.join(self.tmp.name, "rgb.png")
+        write_png(image, png_path)
+        np.testing.assert_array_equal(read_png(png_path), image)
+
+        coverage = rasterize_coverage(self.square, size=(64, 48))
+        write_png(coverage, png_path, palette=blend_palette('red'))
+        np.testing.assert_array_equal(read_png(png_path), image)
+
+    def test_equal_aspect_and_centering(self):
+        """
+        Test that a square stays square and is centered in a wide image.
+        """
+        coverage = rasterize_coverage(self.square, size=(200, 100), padding=0.1)
+        rows = np.flatnonzero(coverage.max(axis=1))
+        cols = np.flatnonzero(coverage.max(axis=0))
+        self.assertAlmostEqual(rows[-1] - rows[0], cols[-1] - cols[0], delta=1)
+        self.assertAlmostEqual((cols[0] + cols[-1]) / 2, 99.5, delta=1)
+        self.assertAlmostEqual((rows[0] + rows[-1]) / 2, 49.5, delta=1)
+
+    def test_y_axis_points_down(self):
+        """
+        Test that small y values are drawn at the top, like the inverted plot_paths axis.
+        """
+        paths = [[np.array([[0, 0], [10, 0]], dtype=float)], [np.array([[0, 10]], dtype=float)]]
+        coverage = rasterize_coverage(paths, size=(100, 100), linewidth=4)
+        rows = np.flatnonzero(coverage[:, 10:90].max(axis=1))
+        self.assertLess(rows.max(), 50)
+        self.assertGreater(coverage[90:, :20].max(), 0)  # The dot at y = 10
+
+    def test_antialiasing_and_linewidth(self):
+        """
+        Test partial coverage at stroke edges and that thicker lines cover more pixels.
+        """
+        thin = rasterize_coverage(self.square, size=(100, 100), linewidth=1)
+        thick = rasterize_coverage(self.square, size=(100, 100), linewidth=5)
+        self.assertTrue(np.any((thin > 0) & (thin < 255)))
+        self.assertEqual(thick.max(), 255)
+        self.assertGreater(np.count_nonzero(thick), 2 * np.count_nonzero(thin))
+        # The inside of the outline stays empty
+        self.assertEqual(thick[30:70, 30:70].max(), 0)
+
+    def test_empty_paths(self):
+        """
+        Test that an empty drawing gives a blank image.
+        """
+        image = rasterize_paths([], size=(8, 4), background='white')
+        self.assertEqual(image.shape, (4, 8, 3))
+        self.assertTrue(np.all(image == 255))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,23 @@
 import unittest
+from unittest import mock
 import numpy as np
-from src.regularization.line_detector import detect_lines
-from src.regularization.circle_detector import detect_circles
-from src.regularization.ellipse_detector import detect_ellipses
-from src.regularization.rectangle_detector import detect_rectangles
+from src.regularization.line_detector import detect_lines, fit_lines
+from src.regularization.circle_detector import detect_circles, hough_circle
+from src.regularization.ellipse_detector import (conic_to_ellipse, detect_ellipses, detect_ellipses_in_curves,
+                                                 fit_ellipse, fit_ellipses)
+from src.regularization.rectangle_detector import detect_rectangles, fitted_rectangle_errors, is_rectangle
 from src.regularization.polygon_detector import detect_polygons
-from src.regularization.star_detector import detect_stars
+from src.regularization.star_detector import detect_stars, is_star, star_points
+from src.regularization.ransac import ransac_circles, ransac_ellipses
+from src.regularization.circle_fit import fit_circles
+from src.regularization.polygon_detector import is_polygon, polygon_cascade, polygon_mask
+from src.regularization.shapes import SHAPE_DTYPE, SHAPE_TYPES, detect_all, records_to_shapes
+from src.regularization.corners import corner_indices, turning_angles
+from src.regularization.features import FeatureCache, SegmentFeatures
+from src.regularization.min_rectangle import (fit_min_area_rectangle, min_area_rectangles, rectangle_corners,
+                                             rectangle_residuals)
+from src.regularization.simplify import iter_corner_segments, rdp_mask, simplify_curves
+from src.curve_set import CurveSet
 
 class TestRegularization(unittest.TestCase):
 
@@ -69,5 +81,688 @@ class TestRegularization(unittest.TestCase):
         self.assertEqual(len(detected_stars), 1, "Star detection failed.")
         self.assertTrue(np.allclose(detected_stars[0], self.star_data, atol=0.1), "Detected star does not match the expected star.")
 
+class TestHoughCircle(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a noisy circle and its accumulator, counted one vote at a time.
+        """
+        rng = np.random.default_rng(1)
+        t = rng.random(40) * 2 * np.pi
+        self.points = np.column_stack([40 + 12 * np.cos(t), -30 + 12 * np.sin(t)]) + rng.normal(0, 0.3, (40, 2))
+        self.accumulator = {}
+        for x, y in self.points:
+            for r in range(10, 16):
+                for angle in range(0, 360, 5):
+                    cell = (int(x - r * np.cos(np.radians(angle))), int(y - r * np.sin(np.radians(angle))), r)
+                    self.accumulator[cell] = self.accumulator.get(cell, 0) + 1
+
+    def expected_peaks(self, threshold):
+        above = {cell: votes for cell, votes in self.accumulator.items() if votes > threshold * len(self.points)}
+        return {cell for cell, votes in above.items()
+                if not any(above.get((cell[0] + i, cell[1] + j, cell[2] + k), 0) > votes
+                           for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1))}
+
+    def test_matches_loop_accumulator(self):
+        """
+        Test that dense, chunked and sparse counting all give the local maxima of the loop accumulator.
+        """
+        expected = self.expected_peaks(0.1)
+        self.assertTrue(expected)
+        for max_votes, max_cells in ((2**22, 2**22), (500, 2000), (500, 100)):
+            circles = hough_circle(self.points, (10, 15), threshold=0.1, max_votes=max_votes, max_cells=max_cells)
+            self.assertEqual(set(circles), expected)
+        self.assertTrue(np.allclose(circles[0], (40, -30, 12), atol=1))
+
+    def test_empty_input(self):
+        """
+        Test that no points or no radii give no circles.
+        """
+        self.assertEqual(hough_circle(np.empty((0, 2)), (10, 15)), [])
+        self.assertEqual(hough_circle(self.points, (15, 10)), [])
+        self.assertEqual(detect_circles(np.empty((0, 2))), [])
+
+class TestRansac(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a noisy circle and rotated ellipse among uniform clutter.
+        """
+        rng = np.random.default_rng(0)
+        t = rng.random(300) * 2 * np.pi
+        circle = np.column_stack([100 + 40 * np.cos(t), 50 + 40 * np.sin(t)])
+        t = rng.random(300) * 2 * np.pi
+        ellipse = np.column_stack([60 * np.cos(t), 25 * np.sin(t)]) @ [[np.cos(0.4), np.sin(0.4)],
+                                                                       [-np.sin(0.4), np.cos(0.4)]] + [250, 200]
+        self.points = np.vstack([circle, ellipse]) + rng.normal(0, 0.5, (600, 2))
+        self.points = np.vstack([self.points, rng.random((200, 2)) * 300])
+
+    def test_conic_to_ellipse(self):
+        """
+        Test conversion of conic coefficients, in either sign, and rejection of other conics.
+        """
+        # (x - 3)^2 / 25 + (y + 2)^2 / 4 = 1, times 100
+        conic = np.array([4, 0, 25, -24, 100, 36])
+        np.testing.assert_allclose(conic_to_ellipse(conic), [3, -2, 5, 2, 0], atol=1e-9)
+        np.testing.assert_allclose(conic_to_ellipse(-conic), [3, -2, 5, 2, 0], atol=1e-9)
+        self.assertTrue(np.isnan(conic_to_ellipse([1, 0, -1, 0, 0, -1])).all())  # Hyperbola
+        self.assertTrue(np.isnan(conic_to_ellipse([1, 0, 1, 0, 0, 1])).all())  # No real points
+
+    def test_circles(self):
+        """
+        Test that the circle is found among the clutter, and reproducibly for a seed.
+        """
+        circles = ransac_circles(self.points, seed=1)
+        self.assertEqual(len(circles), 1)
+        np.testing.assert_allclose(circles[0], (100, 50, 40), atol=0.5)
+        self.assertEqual(ransac_circles(self.points, seed=1), circles)
+        self.assertEqual(detect_circles(self.points, method='ransac', seed=1), circles)
+
+    def test_ellipses(self):
+        """
+        Test that the ellipse, and the circle as an ellipse, are found among the clutter.
+        """
+        ellipses = sorted(ransac_ellipses(self.points, seed=1))  # Both have 300 points, found in either order
+        self.assertEqual(len(ellipses), 2)
+        np.testing.assert_allclose(ellipses[1], (250, 200, 60, 25, 0.4), atol=0.5)
+        np.testing.assert_allclose(ellipses[0][:4], (100, 50, 40, 40), atol=0.5)
+
+    def test_clutter_only(self):
+        """
+        Test that uniform noise gives no shapes.
+        """
+        clutter = self.points[600:]
+        self.assertEqual(ransac_circles(clutter, seed=1), [])
+        self.assertEqual(ransac_ellipses(clutter, seed=1), [])
+
+    def test_rejected_shape_first(self):
+        """
+        Test that a dominant arc, rejected for its coverage, does not hide a full circle after it.
+        """
+        t = np.linspace(0, np.pi / 2, 400)
+        arc = np.column_stack([50 * np.cos(t), 50 * np.sin(t)])
+        t = np.linspace(0, 2 * np.pi, 100, endpoint=False)
+        circle = np.column_stack([1000 + 30 * np.cos(t), 30 * np.sin(t)])
+        circles = ransac_circles(np.vstack([arc, circle]), radius_range=(10, 100), seed=0)
+        self.assertEqual(len(circles), 1)
+        np.testing.assert_allclose(circles[0], (1000, 0, 30), atol=1e-6)
+
+class TestCircleFit(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up noisy arcs of random circles, from short arcs to full circles.
+        """
+        rng = np.random.default_rng(0)
+        self.circles = np.column_stack([rng.random((200, 2)) * 1000, rng.random(200) * 100 + 5])
+        self.segments = []
+        for x, y, r in self.circles:
+            t = rng.random() * 2 * np.pi + np.sort(rng.random(30)) * (rng.random() * 1.5 + 0.5) * np.pi
+            self.segments.append(np.column_stack([x + r * np.cos(t), y + r * np.sin(t)]) + rng.normal(0, 0.01 * r, (30, 2)))
+        self.curves = CurveSet.from_paths([self.segments[:120], self.segments[120:]])
+
+    def test_batch_matches_single_fits(self):
+        """
+        Test that fitting all segments at once gives the circle of each segment on its own.
+        """
+        for method in ('kasa', 'pratt', 'taubin'):
+            fitted = fit_circles(self.curves, method=method, iterations=2)
+            single = np.vstack([fit_circles(XY, method=method, iterations=2) for XY in self.segments])
+            np.testing.assert_allclose(fitted, single, rtol=1e-6)
+            errors = np.abs(fitted - self.circles) / self.circles[:, 2:]
+            self.assertLess(np.median(errors), 0.01)
+
+    def test_gauss_newton_minimizes_geometric_distance(self):
+        """
+        Test that the refined fit matches a geometric least-squares optimizer.
+        """
+        from scipy import optimize
+        fitted = fit_circles(self.curves, iterations=10)
+        for XY, circle in zip(self.segments[:20], fitted):
+            def residuals(c):
+                return np.hypot(*(XY - c[:2]).T) - c[2]
+            expected = optimize.least_squares(residuals, circle + [1, -1, 0.5], xtol=1e-12, ftol=1e-12).x
+            np.testing.assert_allclose(circle, expected, rtol=1e-5, atol=1e-5)
+
+    def test_degenerate_segments(self):
+        """
+        Test that short or collinear segments give NaN without affecting the others.
+        """
+        points = np.array([[0, 0], [1, 1], [2, 2], [3, 3], [5, 5], [6, 7], [1, 0], [0, 1], [-1, 0], [0, -1]], dtype=float)
+        fitted = fit_circles(points, [0, 4, 4, 6, 10], iterations=3)
+        self.assertTrue(np.isnan(fitted[:3]).all())
+        np.testing.assert_allclose(fitted[3], [0, 0, 1], atol=1e-12)
+
+class TestEllipseFit(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up noisy random ellipses, from thin ones to near-circles.
+        """
+        rng = np.random.default_rng(0)
+        self.ellipses = []
+        self.segments = []
+        for _ in range(100):
+            cx, cy = rng.random(2) * 1000
+            a = rng.random() * 100 + 10
+            b = a * (rng.random() * 0.9 + 0.1)
+            angle = (rng.random() - 0.5) * np.pi
+            t = rng.random(40) * 2 * np.pi
+            x, y = a * np.cos(t), b * np.sin(t)
+            XY = np.column_stack([cx + x * np.cos(angle) - y * np.sin(angle), cy + x * np.sin(angle) + y * np.cos(angle)])
+            self.segments.append(XY + rng.normal(0, 0.002 * a, XY.shape))
+            self.ellipses.append((cx, cy, a, b, angle))
+        self.ellipses = np.array(self.ellipses)
+
+    def test_batch_fit(self):
+        """
+        Test that fitting all segments at once recovers every ellipse and matches single fits.
+        """
+        fitted = fit_ellipses(CurveSet.from_paths([self.segments]))
+        np.testing.assert_allclose(fitted[:, :4], self.ellipses[:, :4], atol=0.01 * self.ellipses[:, 2:3].max())
+        elongated = self.ellipses[:, 3] < 0.9 * self.ellipses[:, 2]
+        angle_errors = np.abs(fitted[:, 4] - self.ellipses[:, 4])
+        self.assertLess(np.minimum(angle_errors, np.pi - angle_errors)[elongated].max(), 0.05)
+        for XY, params in zip(self.segments[:10], fitted):
+            np.testing.assert_allclose(fit_ellipse(XY[:, 0], XY[:, 1]), params, rtol=1e-6)
+
+    def test_circles_and_degenerate_segments(self):
+        """
+        Test that a circle fits (the old fit divided by a - c) and degenerate segments give NaN.
+        """
+        t = np.linspace(0, 6, 30)
+        circle = np.column_stack([3 + 5 * np.cos(t), -2 + 5 * np.sin(t)])
+        line = np.column_stack([np.arange(10.0), 2 * np.arange(10.0)])
+        fitted = fit_ellipses(np.vstack([circle, line, circle[:4]]), [0, 30, 40, 44])
+        np.testing.assert_allclose(fitted[0, :4], [3, -2, 5, 5], atol=1e-9)
+        self.assertTrue(np.isnan(fitted[1:]).all())
+
+    def test_detection_in_batches(self):
+        """
+        Test that detection gives the same result per curve and across batch boundaries.
+        """
+        curves = [[XY] for XY in self.segments] + [[np.array([[0, 0], [1, 1], [2, 2], [3, 3], [4, 4.]])]]
+        results = detect_ellipses_in_curves(curves)
+        self.assertEqual([is_ellipse for is_ellipse, _ in results], [True] * 100 + [False])
+        from src.regularization import ellipse_detector
+        batch = ellipse_detector.ELLIPSE_BATCH
+        ellipse_detector.ELLIPSE_BATCH = 7
+        try:
+            batched = detect_ellipses(iter(curves))
+        finally:
+            ellipse_detector.ELLIPSE_BATCH = batch
+        np.testing.assert_allclose(batched, detect_ellipses(curves))
+        self.assertEqual(len(batched), 100)
+
+class TestLineFit(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a diagonal, a vertical and a bent polyline, and a single point.
+        """
+        self.paths = [[np.array([[0, 0], [1, 1], [2, 2], [3, 3]], dtype=float),
+                       np.array([[5, 0], [5.01, 1], [4.99, 2], [5, 3]])],
+                      [np.array([[0, 0], [1, 5], [2, 0]], dtype=float), np.array([[1.0, 1.0]])]]
+
+    def test_residuals_and_endpoints(self):
+        """
+        Test perpendicular residuals (vertical lines included) and projected endpoints.
+        """
+        endpoints, residuals = fit_lines(CurveSet.from_paths(self.paths))
+        self.assertAlmostEqual(residuals[0], 0)
+        self.assertLess(residuals[1], 5e-5)  # At most the variance of the x offsets
+        self.assertGreater(residuals[2], 0.5)
+        self.assertTrue(np.isnan(residuals[3]))
+        np.testing.assert_allclose(endpoints[0], [[0, 0], [3, 3]], atol=1e-12)
+        np.testing.assert_allclose(endpoints[1][:, 1], [0, 3], atol=1e-3)
+
+    def test_detect_lines(self):
+        """
+        Test detection from paths, a stream across batches and a CurveSet.
+        """
+        lines = detect_lines(self.paths)
+        self.assertEqual(len(lines), 2)
+        from src.regularization import line_detector
+        batch = line_detector.LINE_BATCH
+        line_detector.LINE_BATCH = 1
+        try:
+            streamed = detect_lines(iter(self.paths))
+        finally:
+            line_detector.LINE_BATCH = batch
+        np.testing.assert_allclose(streamed, lines)
+        np.testing.assert_allclose(detect_lines(CurveSet.from_paths(self.paths)), lines)
+
+def densify(vertices, per_edge=50):
+    """
+    Closed polyline through the vertices with per_edge points on every edge.
+    """
+    t = np.linspace(0, 1, per_edge, endpoint=False)[:, None]
+    edges = [a + t * (b - a) for a, b in zip(vertices, np.roll(vertices, -1, axis=0))]
+    return np.concatenate(edges + [vertices[:1]])
+
+def rdp_recursive(XY, epsilon):
+    """
+    Reference Ramer-Douglas-Peucker: indices of the kept points.
+    """
+    if len(XY) < 3:
+        return list(range(len(XY)))
+    a, b = XY[0], XY[-1]
+    chord = b - a
+    rel = XY[1:-1] - a
+    distances = np.abs(chord[0] * rel[:, 1] - chord[1] * rel[:, 0]) / np.hypot(*chord)
+    split = int(np.argmax(distances)) + 1
+    if distances[split - 1] <= epsilon:
+        return [0, len(XY) - 1]
+    return rdp_recursive(XY[:split + 1], epsilon)[:-1] + [split + i for i in rdp_recursive(XY[split:], epsilon)]
+
+class TestSimplify(unittest.TestCase):
+
+    def test_matches_recursive(self):
+        """
+        Test the batched selection against the recursive algorithm on random walks.
+        """
+        rng = np.random.default_rng(0)
+        segments = [np.cumsum(rng.normal(size=(n, 2)), axis=0) for n in (1, 2, 3, 40, 200)]
+        curves = CurveSet.from_paths([segments])
+        keep = rdp_mask(curves, 1.5)
+        for XY, kept in zip(segments, np.split(keep, curves.segment_offsets[1:-1])):
+            self.assertEqual(list(np.flatnonzero(kept)), rdp_recursive(XY, 1.5))
+
+    def test_closed_corners(self):
+        """
+        Test that a noisy closed rectangle starting mid-edge comes out as its 4 corners.
+        """
+        rng = np.random.default_rng(1)
+        XY = np.roll(densify(np.array([[0, 0], [4, 0], [4, 2], [0, 2]], dtype=float))[:-1], 25, axis=0)
+        XY = np.concatenate([XY, XY[:1]]) + rng.normal(scale=0.01, size=(len(XY) + 1, 2))
+        corners = simplify_curves(CurveSet.from_paths([[XY]]), 0.1).segment(0)
+        self.assertEqual(len(corners), 4)
+        self.assertLess(np.abs(np.sort(np.abs(corners).sum(axis=1)) - [0, 2, 4, 6]).max(), 0.1)
+
+    def test_tied_distances(self):
+        """
+        Test that points RDP keeps on an edge because of exactly tied distances are dropped.
+        """
+        angles = np.arange(6) * np.pi / 3
+        hexagon = densify(np.column_stack([np.cos(angles), np.sin(angles)]))
+        keep = rdp_mask(CurveSet.from_paths([[hexagon]]), 0.01)
+        self.assertGreater(keep.sum(), 7)  # Edge points tied with the corners for the farthest one
+        corners = simplify_curves(CurveSet.from_paths([[hexagon]]), 0.01).segment(0)
+        self.assertEqual(len(corners), 6)
+        np.testing.assert_allclose(np.hypot(*corners.T), 1, atol=1e-12)
+
+        zigzag = np.array([[0, 0], [1, 0], [2, 0.001], [3, 0], [4, 1], [5, 1]], dtype=float)
+        np.testing.assert_array_equal(simplify_curves(CurveSet.from_paths([[zigzag]]), 0.01).segment(0),
+                                      zigzag[[0, 3, 4, 5]])
+
+    def test_dense_shapes(self):
+        """
+        Test that the corner detectors find densely sampled shapes, streamed or not.
+        """
+        rectangle = densify(np.array([[0, 0], [3, 0], [3, 2], [0, 2]], dtype=float))
+        angles = np.pi / 2 + np.arange(10) * np.pi / 5
+        star = densify(np.column_stack([np.cos(angles), np.sin(angles)]) * np.tile([1, 0.4], 5)[:, None])
+        paths = [[rectangle], [star]]
+        self.assertEqual(len(detect_rectangles(paths)), 1)
+        self.assertEqual(len(detect_stars(iter(paths))), 1)
+        self.assertEqual(len(detect_rectangles(paths, simplify=None)), 0)
+        self.assertEqual([len(XY) for XY in iter_corner_segments(paths)], [4, 10])
+
+class TestFeatures(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a unit square, an open 3-4-5 polyline and an empty segment.
+        """
+        self.paths = [[np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=float)],
+                      [np.array([[0, 0], [3, 0], [3, 4]], dtype=float), np.empty((0, 2))]]
+
+    def test_features(self):
+        """
+        Test per-segment and per-vertex features against hand-computed values.
+        """
+        features = SegmentFeatures(CurveSet.from_paths(self.paths))
+        np.testing.assert_allclose(features.centroid[:2], [[0.5, 0.5], [2, 4 / 3]])
+        np.testing.assert_allclose(features.arc_length, [3, 7, 0])
+        np.testing.assert_allclose(features.closure_gap[:2], [1, 5])
+        np.testing.assert_allclose(features.bbox[:2], [[0, 0, 1, 1], [0, 0, 3, 4]])
+        np.testing.assert_allclose(features.radii[:4], np.sqrt(0.5))
+        np.testing.assert_allclose(features.radius_std[0], 0, atol=1e-12)
+        np.testing.assert_allclose(features.turning_angles[:4], np.pi / 2)
+        np.testing.assert_allclose(features.side_lengths[4:], [3, 4, 5])
+        self.assertEqual(len(features.hull(0).vertices), 4)
+        self.assertIsNone(features.hull(2))
+        self.assertTrue(np.isnan(features.centroid[2]).all())
+
+    def test_cache(self):
+        """
+        Test that detectors share the features of the same segments, and only those.
+        """
+        cache = FeatureCache()
+        features = cache.features(self.paths)
+        self.assertIs(cache.features(list(self.paths)), features)
+        self.assertIsNot(cache.features([[XY.copy() for XY in path] for path in self.paths]), features)
+        self.assertIsNot(cache.features(self.paths, simplify=0.02), features)
+        self.assertEqual(len(cache), 3)
+
+        rectangle = densify(np.array([[0, 0], [3, 0], [3, 2], [0, 2]], dtype=float))
+        paths = [[rectangle], [rectangle[:20]]]
+        cache = FeatureCache()
+        for detect in (detect_lines, detect_ellipses, detect_rectangles, detect_polygons, detect_stars):
+            np.testing.assert_allclose(detect(paths, cache=cache), detect(paths))
+        self.assertEqual(len(cache), 2)
+
+class TestCascade(unittest.TestCase):
+
+    def test_counters(self):
+        """
+        Test that strokes are pruned by the cheap stages and polygons pass every stage.
+        """
+        rng = np.random.default_rng(0)
+        strokes = [np.cumsum(rng.normal(size=(30, 2)), axis=0) for _ in range(50)]
+        polygons = [np.column_stack([np.cos(a), np.sin(a)]) * 5
+                    for a in (np.linspace(0, 2 * np.pi, n, endpoint=False) for n in (3, 6))]
+        paths = [strokes + polygons, [np.array([[0, 0], [1, 1]], dtype=float), np.zeros((4, 2))]]
+        cascade = polygon_cascade()
+        detected = detect_polygons(paths, simplify=None, cascade=cascade)
+        self.assertEqual(len(detected), 2)
+        counts = cascade.counts()
+        self.assertEqual(list(counts), ['tested', 'points', 'bbox', 'radial', 'regular', 'accepted'])
+        self.assertEqual(counts['tested'], 54)
+        self.assertEqual(counts['points'], 1)
+        self.assertGreater(counts['bbox'] + counts['radial'], 40)  # Strokes and the repeated point
+        self.assertEqual(sum(list(counts.values())[1:-1]) + counts['accepted'], counts['tested'])
+        self.assertEqual(counts['accepted'], 2)
+
+        detect_polygons(paths, simplify=None, cascade=cascade)
+        self.assertEqual(cascade.counts()['tested'], 108)
+        cascade.reset()
+        self.assertEqual(cascade.counts()['tested'], 0)
+
+    def test_never_rejects_regular(self):
+        """
+        Test that the cheap stages keep every segment the regularity test accepts, whatever the order
+        of its points.
+        """
+        angles = np.arange(6) * np.pi / 3
+        hexagon = np.column_stack([np.cos(angles), np.sin(angles)]) * 5
+        shuffled = hexagon[[0, 3, 1, 4, 2, 5]]
+        sliver = np.array([[0, 0], [0.009, 0], [0.009, 0.0001], [0, 0.0001]])  # Sides within the tolerance
+        features = SegmentFeatures(CurveSet.from_paths([[hexagon, shuffled, sliver]]))
+        self.assertTrue(polygon_mask(features).all())
+        np.testing.assert_array_equal(polygon_cascade()(features), polygon_mask(features))
+        self.assertTrue(is_polygon(shuffled))
+
+    def test_single_segment(self):
+        """
+        Test the single-segment predicates, including degenerate input.
+        """
+        self.assertTrue(is_polygon(np.array([[0, 0], [2, 0], [1, np.sqrt(3)]])))
+        self.assertFalse(is_polygon(np.array([[0, 0], [1, 1], [2, 2]])))
+        self.assertFalse(is_polygon(np.array([[0, 0], [0, 4], [1, 4], [1, 0]])))
+
+class TestDetectAll(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a line and a rotated rectangle in one path, and a star, a hexagon and an ellipse in another.
+        """
+        t = np.linspace(0, 2 * np.pi, 200)
+        angle = np.pi / 6
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        rectangle = densify(np.array([[0, 0], [30, 0], [30, 20], [0, 20]], dtype=float) @ rotation.T + [50, 50])
+        star_angles = np.pi / 2 + np.arange(10) * np.pi / 5
+        star = densify(np.column_stack([np.cos(star_angles), np.sin(star_angles)]) * np.tile([10, 4], 5)[:, None])
+        hexagon_angles = np.arange(6) * np.pi / 3
+        hexagon = densify(np.column_stack([np.cos(hexagon_angles), np.sin(hexagon_angles)]) * 8 + [100, 0])
+        ellipse = np.column_stack([200 + 20 * np.cos(t), 5 * np.sin(t)])
+        self.paths = [[np.column_stack([np.arange(10.0), 2 * np.arange(10.0)]), rectangle],
+                      [star, hexagon, ellipse]]
+
+    def test_records(self):
+        """
+        Test the record layout and the parameters of every kind of shape.
+        """
+        records = detect_all(self.paths, shapes=('lines', 'ellipses', 'rectangles', 'polygons', 'stars'))
+        self.assertEqual(records.dtype, SHAPE_DTYPE)
+        found = {(int(r['path']), int(r['segment']), SHAPE_TYPES[r['shape']]) for r in records}
+        # The hexagon is close enough to an ellipse to pass both tests
+        self.assertEqual(found, {(0, 0, 'lines'), (0, 1, 'rectangles'), (1, 0, 'stars'), (1, 1, 'polygons'),
+                                 (1, 1, 'ellipses'), (1, 2, 'ellipses')})
+        by_kind = {SHAPE_TYPES[r['shape']]: r for r in records}  # The last ellipse is the real one
+        np.testing.assert_allclose(by_kind['lines']['params'][:4], [0, 0, 9, 18], atol=1e-9)
+        np.testing.assert_allclose(by_kind['rectangles']['params'][:5], [50 + 15 * np.cos(np.pi / 6) - 10 * 0.5,
+                                                                         50 + 15 * 0.5 + 10 * np.cos(np.pi / 6),
+                                                                         30, 20, np.pi / 6])
+        np.testing.assert_allclose(by_kind['stars']['params'], [0, 0, 10, 4, np.pi / 2, 5], atol=1e-9)
+        np.testing.assert_allclose(by_kind['polygons']['params'], [100, 0, 8, 8, 0, 6], atol=1e-9)
+        np.testing.assert_allclose(by_kind['ellipses']['params'][:4], [200, 0, 20, 5], atol=1e-6)
+        self.assertTrue((records['error'] >= 0).all())
+
+    def test_matches_detectors(self):
+        """
+        Test that the shapes match the separate detectors, and the ideal vertices match the drawn ones.
+        """
+        cache = FeatureCache()
+        records = detect_all(iter(self.paths), cache=FeatureCache())
+        shapes = records_to_shapes(records)
+        self.assertEqual(len(shapes['lines']), len(detect_lines(self.paths, cache=cache)))
+        self.assertEqual(len(shapes['ellipses']), len(detect_ellipses(self.paths, cache=cache)))
+        for kind, detect in (('rectangles', detect_rectangles), ('polygons', detect_polygons),
+                             ('stars', detect_stars)):
+            detected = detect(self.paths, cache=cache)
+            self.assertEqual(len(shapes[kind]), len(detected))
+            for ideal, drawn in zip(shapes[kind], detected):
+                np.testing.assert_allclose(np.sort(ideal, axis=0), np.sort(drawn, axis=0), atol=1e-9)
+
+    def test_circle_errors(self):
+        """
+        Test the error of circles: the mean distance of the points within r/10 of the circle.
+        """
+        rng = np.random.default_rng(4)
+        t = np.linspace(0, 2 * np.pi, 200)
+        circle = np.column_stack([100 + 30 * np.cos(t), 100 + 30 * np.sin(t)]) + rng.normal(0, 0.3, (200, 2))
+        far = rng.random((50, 2)) * 1000 + 500
+        records = detect_all([[circle], [far]], shapes=['circles'], options={'circles': {'method': 'ransac', 'seed': 1}})
+        self.assertEqual(len(records), 1)
+        x, y, r = records['params'][0, :3]
+        distances = np.abs(np.hypot(*(np.vstack([circle, far]) - [x, y]).T) - r)
+        self.assertAlmostEqual(records['error'][0], distances[distances < r / 10].mean())
+
+    def test_serialization(self):
+        """
+        Test that the records survive a round trip through np.save, and unknown kinds are refused.
+        """
+        import io
+        records = detect_all(self.paths, shapes=('lines', 'stars'))
+        buffer = io.BytesIO()
+        np.save(buffer, records)
+        buffer.seek(0)
+        self.assertEqual(np.load(buffer).tobytes(), records.tobytes())
+        with self.assertRaises(ValueError):
+            detect_all(self.paths, shapes=('triangles',))
+
+class TestCorners(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a closed rectangle drawn from mid-edge, an open V stroke, a straight stroke and a lone point.
+        """
+        rectangle = densify(np.array([[0, 0], [3, 0], [3, 2], [0, 2]], dtype=float))[:-1]
+        rectangle = np.roll(rectangle, 25, axis=0)
+        self.rectangle = np.concatenate([rectangle, rectangle[:1]])
+        t = np.linspace(0, 5, 30)
+        self.vee = np.concatenate([np.column_stack([t, t]), np.column_stack([5 + t, 5 - t])[1:]])
+        self.stroke = np.column_stack([np.linspace(0, 10, 50), np.zeros(50)])
+        self.curves = CurveSet.from_paths([[self.rectangle, self.vee], [self.stroke, np.array([[1.0, 1.0]])]])
+
+    def test_turning_angles(self):
+        """
+        Test the chord angles of an open polyline: zero on straight runs and at the ends.
+        """
+        angles = turning_angles(CurveSet.from_paths([[self.vee]]), window=3)
+        self.assertAlmostEqual(angles[29], -np.pi / 2)
+        self.assertEqual(angles[0], 0)
+        np.testing.assert_allclose(angles[3:26], 0, atol=1e-12)
+
+    def test_corner_indices(self):
+        """
+        Test corners of closed and open segments, per segment.
+        """
+        indices, offsets = corner_indices(self.curves)
+        np.testing.assert_array_equal(np.diff(offsets), [4, 3, 2, 1])
+        corners = self.curves.points[indices]
+        np.testing.assert_allclose(np.sort(corners[:4], axis=0), [[0, 0], [0, 0], [3, 2], [3, 2]])
+        np.testing.assert_allclose(corners[4:7], [[0, 0], [5, 5], [10, 0]])
+        np.testing.assert_allclose(corners[7:9], [[0, 0], [10, 0]])
+
+    def test_detectors(self):
+        """
+        Test that the polygon-family detectors find shapes from curvature corners.
+        """
+        rng = np.random.default_rng(2)
+        angles = np.pi / 2 + np.arange(10) * np.pi / 5
+        star = densify(np.column_stack([np.cos(angles), np.sin(angles)]) * np.tile([1, 0.4], 5)[:, None])
+        paths = [[self.rectangle], [star], [self.rectangle + rng.normal(scale=0.002, size=self.rectangle.shape)]]
+        self.assertEqual(len(detect_rectangles(paths, simplify='curvature')), 1)
+        self.assertEqual(len(detect_stars(paths, simplify='curvature')), 1)
+        self.assertEqual([len(XY) for XY in iter_corner_segments(paths, 'curvature')], [4, 10, 4])
+
+def rotate(XY, angle):
+    return XY @ np.array([[np.cos(angle), np.sin(angle)], [-np.sin(angle), np.cos(angle)]])
+
+class TestMinAreaRectangle(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a dense rotated square and rectangle, an open stroke and degenerate segments.
+        """
+        self.square = rotate(densify(np.array([[0.0, 0.0], [4, 0], [4, 4], [0, 4]])), np.radians(30)) + [10, 5]
+        self.rectangle = rotate(densify(np.array([[0.0, 0.0], [6, 0], [6, 2], [0, 2]])), np.radians(100))
+        self.curves = CurveSet.from_paths([[self.square, self.rectangle[:-60]],
+                                           [np.array([[1.0, 1.0], [2, 2], [3, 3]]), np.zeros((0, 2))]])
+
+    def test_rectangles(self):
+        """
+        Test the fitted rectangles and residuals of all segments at once against brute force.
+        """
+        rectangles = min_area_rectangles(self.curves)
+        center = rotate(np.array([[2.0, 2.0]]), np.radians(30))[0] + [10, 5]
+        np.testing.assert_allclose(rectangles[0], [*center, 4, 4, np.radians(30)], atol=1e-9)
+        np.testing.assert_allclose(rectangles[2], [2, 2, np.sqrt(8), 0, np.pi / 4], atol=1e-9)
+        self.assertTrue(np.isnan(rectangles[3]).all())
+        for XY, (_, _, width, height, _) in zip([self.square, self.rectangle[:-60]], rectangles):
+            angles = np.linspace(0, np.pi / 2, 2001)
+            projections = XY @ np.array([np.cos(angles), np.sin(angles)])
+            areas = np.ptp(projections, axis=0) * np.ptp(XY @ np.array([-np.sin(angles), np.cos(angles)]), axis=0)
+            self.assertLessEqual(width * height, areas.min() + 1e-9)
+            self.assertAlmostEqual(width * height, areas.min(), places=1)
+        residuals = rectangle_residuals(self.curves, rectangles)
+        np.testing.assert_allclose(residuals[:3], 0, atol=1e-9)
+        self.assertTrue(np.isnan(residuals[3]))
+        np.testing.assert_allclose(np.sort(rectangle_corners(rectangles[:1])[0], axis=0),
+                                   np.sort(rotate(np.array([[0.0, 0.0], [4, 0], [4, 4], [0, 4]]), np.radians(30))
+                                           + [10, 5], axis=0), atol=1e-9)
+
+    def test_shared_hulls(self):
+        """
+        Test that the rectangle fit reuses the hulls memoized by SegmentFeatures.
+        """
+        features = SegmentFeatures(self.curves)
+        hull = features.hull(0)
+        rectangles, _ = fitted_rectangle_errors(features, [0, 1])
+        self.assertIs(features.hull(0), hull)
+        self.assertEqual(sorted(features._hulls), [0, 1])
+        np.testing.assert_allclose(rectangles[:2], min_area_rectangles(self.curves)[:2], atol=1e-12)
+
+    def test_fits_once(self):
+        """
+        Test that every segment is fitted once, the residuals only over the fitted segments.
+        """
+        features = SegmentFeatures(self.curves)
+        with mock.patch('src.regularization.rectangle_detector.rectangle_residuals',
+                        wraps=rectangle_residuals) as residuals:
+            rectangles, errors = fitted_rectangle_errors(features, [1])
+            self.assertEqual(residuals.call_args[0][0].n_points, self.curves.segment_lengths[1])
+            again, _ = fitted_rectangle_errors(features, [0, 1])
+            self.assertEqual(residuals.call_count, 2)
+            self.assertEqual(residuals.call_args[0][0].n_segments, 1)  # Only segment 0 is new
+        self.assertTrue(np.isnan(rectangles[0]).all() and np.isnan(errors[0]))
+        np.testing.assert_array_equal(again[1], rectangles[1])
+        np.testing.assert_allclose(again[:2], min_area_rectangles(self.curves)[:2], atol=1e-12)
+
+        with mock.patch('src.regularization.rectangle_detector.min_area_rectangles',
+                        wraps=min_area_rectangles) as fit:
+            detect_rectangles([[self.rectangle]], method='calipers')
+        self.assertEqual(fit.call_count, 1)
+
+    def test_residual(self):
+        """
+        Test the residual of points off the rectangle outline.
+        """
+        points = np.array([[0.0, 0.0], [4, 0], [4, 2], [0, 2], [2, 1]])
+        rectangle, residual = fit_min_area_rectangle(points)
+        np.testing.assert_allclose(rectangle, [2, 1, 4, 2, 0], atol=1e-12)
+        self.assertAlmostEqual(residual, np.sqrt(1 / 5))
+
+    def test_detection(self):
+        """
+        Test detecting dense rectangles, which have too many points for the corner test.
+        """
+        rng = np.random.default_rng(3)
+        noisy = self.rectangle + rng.normal(scale=0.02, size=self.rectangle.shape)
+        self.assertFalse(is_rectangle(noisy))
+        self.assertTrue(is_rectangle(noisy, method='calipers'))
+        self.assertFalse(is_rectangle(self.rectangle[:-60], method='calipers'))  # Open: one side missing
+        paths = [[self.square], [noisy, self.rectangle[:-60]], [densify(np.array([[0.0, 0], [4, 0], [2, 3]]))]]
+        rectangles = detect_rectangles(paths, method='calipers', simplify=None)
+        self.assertEqual(len(rectangles), 2)
+        self.assertEqual(rectangles[0].shape, (4, 2))
+        records = detect_all(paths, shapes=['rectangles'], options={'rectangles': {'method': 'calipers'}})
+        np.testing.assert_array_equal(records['path'], [0, 1])
+        np.testing.assert_allclose(np.abs(records['params'][0, 2:4]), [4, 4], atol=1e-9)
+
+def star(points, outer=1.0, inner=0.4, angle=np.pi / 2):
+    angles = angle + np.arange(2 * points) * np.pi / points
+    return np.column_stack([np.cos(angles), np.sin(angles)]) * np.tile([outer, inner], points)[:, None]
+
+class TestStarPoints(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up stars of 3 to 8 points, an octagon, an irregular star and a star starting at an inner vertex.
+        """
+        irregular = star(6)
+        irregular[3] *= 1.1
+        self.segments = [star(k) for k in range(3, 9)] + [star(4, 1, 1), irregular, np.roll(star(5, 10, 3), 1, axis=0)]
+        self.curves = CurveSet.from_paths([self.segments])
+
+    def test_point_counts(self):
+        """
+        Test that every segment is classified in one pass, whatever its number of points.
+        """
+        points = star_points(SegmentFeatures(self.curves))
+        np.testing.assert_array_equal(points, [3, 4, 5, 6, 7, 8, 0, 0, 5])
+        np.testing.assert_array_equal(star_points(SegmentFeatures(self.curves), segments=[1, 7]),
+                                      [0, 4, 0, 0, 0, 0, 0, 0, 0])
+        subset = SegmentFeatures(self.curves).subset([8, 2])
+        np.testing.assert_array_equal(subset.lengths, [10, 10])
+        np.testing.assert_array_equal(subset.curves.segment(0), self.segments[8])
+        np.testing.assert_array_equal(star_points(subset), [5, 5])
+
+    def test_detection(self):
+        """
+        Test detecting stars of a given or any number of points.
+        """
+        self.assertTrue(is_star(star(6), num_points=None))
+        self.assertFalse(is_star(star(6)))
+        self.assertEqual(len(detect_stars([self.segments], num_points=None, simplify=None)), 7)
+        self.assertEqual(len(detect_stars([self.segments], simplify=None)), 2)
+
+        records = detect_all([[densify(XY) for XY in self.segments]], shapes=['stars'])
+        np.testing.assert_array_equal(records['segment'], [0, 1, 2, 3, 4, 5, 8])
+        np.testing.assert_array_equal(records['params'][:, 5], [3, 4, 5, 6, 7, 8, 5])
+        np.testing.assert_allclose(records['params'][-1], [0, 0, 10, 3, np.pi / 2, 5], atol=1e-9)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.data_loader import load_dataset, read_csv
+from src.svg_loader import parse_path_data, parse_transform, read_svg
+
+SVG_TEMPLATE = '<svg xmlns="http://www.w3.org/2000/svg">{}</svg>'
+
+class TestSVGLoader(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a scratch directory for SVG files.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, body, name="drawing.svg"):
+        svg_path = os.path.join(self.tmp.name, name)
+        with open(svg_path, 'w') as f:
+            f.write(SVG_TEMPLATE.format(body))
+        return svg_path
+
+    def test_straight_commands_and_subpaths(self):
+        """
+        Test absolute/relative line commands, implicit linetos and one segment per subpath.
+        """
+        segments = parse_path_data("M0,0 10,0 v10 h-10 z m20,0 l5,5")
+        self.assertEqual(len(segments), 2)
+        np.testing.assert_array_equal(segments[0], [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]])
+        np.testing.assert_array_equal(segments[1], [[20, 0], [25, 5]])
+
+    def test_curves_stay_within_tolerance(self):
+        """
+        Test that flattened arcs and Beziers stay within tolerance of the true curve.
+        """
+        for tolerance in (1.0, 0.1, 0.01):
+            # Two half-circle arcs of radius 50 around (50, 0)
+            arc = parse_path_data("M0,0 A50,50 0 0,1 100,0 A50,50 0 0,1 0,0", tolerance)[0]
+            midpoints = (arc[1:] + arc[:-1]) / 2
+            sagitta = 50 - np.hypot(midpoints[:, 0] - 50, midpoints[:, 1])
+            self.assertLessEqual(sagitta.max(), tolerance + 1e-9)
+            np.testing.assert_allclose(np.hypot(arc[:, 0] - 50, arc[:, 1]), 50)
+
+        control = np.array([[0, 0], [0, 100], [100, 100], [100, 0]])
+        n_points = []
+        for tolerance in (1.0, 0.01):
+            cubic = parse_path_data("M0,0 C0,100 100,100 100,0", tolerance)[0]
+            n_points.append(len(cubic))
+            # Samples are uniform in t, so compare each chord midpoint with the curve at mid-t
+            t = (np.arange(len(cubic) - 1) + 0.5)[:, np.newaxis] / (len(cubic) - 1)
+            curve = ((1 - t) ** 3 * control[0] + 3 * (1 - t) ** 2 * t * control[1]
+                     + 3 * (1 - t) * t ** 2 * control[2] + t ** 3 * control[3])
+            chord_midpoints = (cubic[1:] + cubic[:-1]) / 2
+            self.assertLessEqual(np.hypot(*(curve - chord_midpoints).T).max(), tolerance)
+        self.assertLess(n_points[0], n_points[1])
+
+    def test_compact_arc_flags(self):
+        """
+        Test arc flags written without separators.
+        """
+        spaced = parse_path_data("M0,0 a5 5 0 0 1 10 0")[0]
+        compact = parse_path_data("M0,0 a5 5 0 0110 0")[0]
+        np.testing.assert_allclose(compact, spaced)
+
+    def test_elements_and_transforms(self):
+        """
+        Test the basic shape elements and nested group transforms.
+        """
+        svg_path = self.write(
+            '<g transform="translate(100 0)"><line x1="0" y1="0" x2="10" y2="0"/>'
+            '<g transform="scale(2)"><polyline points="0,0 1,1 2,0"/></g></g>'
+            '<polygon points="0,0 4,0 4,3"/><circle cx="0" cy="0" r="10"/>'
+            '<defs><path d="M0,0 L1,1"/></defs>'
+        )
+        paths = read_svg(svg_path)
+        self.assertEqual(len(paths), 4)
+        np.testing.assert_allclose(paths[0][0], [[100, 0], [110, 0]])
+        np.testing.assert_allclose(paths[1][0], [[100, 0], [102, 2], [104, 0]])
+        np.testing.assert_allclose(paths[2][0][[0, -1]], [[0, 0], [0, 0]])
+        np.testing.assert_allclose(np.hypot(*paths[3][0].T), 10)
+
+    def test_parse_transform_rotate_about_point(self):
+        """
+        Test rotation about a center point.
+        """
+        matrix = parse_transform("rotate(90 10 10)")
+        np.testing.assert_allclose(matrix @ [20, 10, 1], [10, 20, 1], atol=1e-12)
+
+    def test_sample_matches_csv(self):
+        """
+        Test that a bundled SVG holds the same points as its CSV (paths are in a different order).
+        """
+        svg_points = np.vstack([XY for path in read_svg("./src/problems/frag2_sol.svg") for XY in path])
+        csv_points = np.vstack([XY for path in read_csv("./src/problems/frag2_sol.csv") for XY in path])
+        np.testing.assert_allclose(np.unique(svg_points, axis=0), np.unique(csv_points, axis=0), atol=1e-9)
+
+    def test_load_dataset_reads_svg(self):
+        """
+        Test loading a directory of SVG files.
+        """
+        self.write('<line x1="0" y1="0" x2="1" y2="1"/>', "a.svg")
+        dataset = load_dataset(self.tmp.name, extensions=('.svg',))
+        self.assertEqual(list(dataset), ['a'])
+        np.testing.assert_array_equal(dataset['a'][0][0], [[0, 0], [1, 1]])
+
+if __name__ == '__main__':
+    unittest.main()
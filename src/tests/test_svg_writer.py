@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+from src.data_loader import read_csv
+from src.svg_loader import read_svg
+from src.svg_writer import format_path_data, format_points, write_svg
+
+SVG_NS = '{http://www.w3.org/2000/svg}'
+
+class TestSVGWriter(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a scratch directory for SVG files.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.svg_path = os.path.join(self.tmp.name, "out.svg")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_number_formatting(self):
+        """
+        Test rounding, trailing zero removal and negative zero handling.
+        """
+        XY = np.array([[1.5, 2.0], [100, -0.0001], [1.05, 10.104]])
+        self.assertEqual(format_points(XY, 2), "1.5,2 100,0 1.05,10.1")
+        self.assertEqual(format_path_data(np.array([[0.5, -0.25], [1.0, 0.5]]), 2), "M.5,-.25l.5,.75")
+
+    def test_round_trip_through_svg_loader(self):
+        """
+        Test that reading the written file back gives the paths to within the precision.
+        """
+        paths = read_csv("./src/problems/frag0.csv")
+        for precision in (1, 3):
+            write_svg(self.svg_path, paths, precision=precision)
+            restored = read_svg(self.svg_path)
+            self.assertEqual(len(restored), len(paths))
+            for path, restored_path in zip(paths, restored):
+                self.assertEqual(len(path), len(restored_path))
+                for XY, restored_XY in zip(path, restored_path):
+                    np.testing.assert_allclose(restored_XY, XY, atol=0.5 * 10 ** -precision + 1e-9)
+
+    def test_lower_precision_shrinks_output(self):
+        """
+        Test that fewer decimals give a smaller file.
+        """
+        paths = read_csv("./src/problems/frag0.csv")
+        sizes = []
+        for precision in (4, 2, 1):
+            write_svg(self.svg_path, paths, precision=precision)
+            sizes.append(os.path.getsize(self.svg_path))
+        self.assertGreater(sizes[0], sizes[1])
+        self.assertGreater(sizes[1], sizes[2])
+
+    def test_shapes_become_native_elements(self):
+        """
+        Test that detected primitives are written as native SVG elements.
+        """
+        rectangle = np.array([[0, 0], [10, 10], [0, 20], [-10, 10]], dtype=float)
+        shapes = {
+            'lines': [[np.array([0, 0]), np.array([5, 5])]],
+            'circles': [(50, 50, 10)],
+            'ellipses': [(20, 30, 8, 4, np.pi / 6)],
+            'rectangles': [rectangle],
+            'polygons': [np.array([[0, 0], [4, 0], [2, 3]])],
+            'stars': [np.array([[0, -5], [1, -1], [5, 0], [1, 1], [0, 5], [-1, 1], [-5, 0], [-1, -1]])],
+        }
+        write_svg(self.svg_path, [], shapes=shapes)
+        tags = [element.tag.replace(SVG_NS, '') for element in ET.parse(self.svg_path).iter()]
+        for tag in ('line', 'circle', 'ellipse', 'rect'):
+            self.assertEqual(tags.count(tag), 1)
+        self.assertEqual(tags.count('polygon'), 2)
+        self.assertNotIn('path', tags)
+
+        # Shapes read back in the same place, including the rotated rectangle
+        restored = read_svg(self.svg_path)
+        np.testing.assert_allclose(np.hypot(*(restored[1][0] - [50, 50]).T), 10, atol=0.01)
+        corners = restored[3][0][:4]
+        np.testing.assert_allclose(sorted(map(tuple, corners)), sorted(map(tuple, rectangle)), atol=0.02)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from src.data_loader import read_csv
+from src.visualizer import plot_paths, save_plot_as_svg
+
+class TestPlotPaths(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up sample paths and a figure to draw on.
+        """
+        self.paths = read_csv("./src/problems/frag0.csv")
+        self.fig, self.ax = plt.subplots()
+
+    def tearDown(self):
+        plt.close(self.fig)
+
+    def test_batch_draws_one_collection(self):
+        """
+        Test that batch mode adds a single artist holding every segment.
+        """
+        plot_paths(self.paths, ax=self.ax)
+        self.assertEqual(len(self.ax.lines), 0)
+        self.assertEqual(len(self.ax.collections), 1)
+        n_segments = sum(len(path) for path in self.paths)
+        self.assertEqual(len(self.ax.collections[0].get_segments()), n_segments)
+
+    def test_batch_matches_per_segment_limits(self):
+        """
+        Test that both modes give the same (inverted, equal aspect) view.
+        """
+        plot_paths(self.paths, ax=self.ax)
+        fig, ax = plt.subplots()
+        try:
+            plot_paths(self.paths, ax=ax, batch=False)
+            self.assertEqual(len(ax.lines), sum(len(path) for path in self.paths))
+            np.testing.assert_allclose(self.ax.get_xlim(), ax.get_xlim())
+            np.testing.assert_allclose(self.ax.get_ylim(), ax.get_ylim())
+            self.assertTrue(self.ax.yaxis_inverted())
+        finally:
+            plt.close(fig)
+
+    def test_colors_per_path(self):
+        """
+        Test one color per path.
+        """
+        paths = [[np.array([[0, 0], [1, 1]]), np.array([[2, 2], [3, 3]])], [np.array([[0, 1], [1, 0]])]]
+        plot_paths(paths, ax=self.ax, color=['red', 'blue'])
+        colors = self.ax.collections[0].get_colors()
+        np.testing.assert_allclose(colors[:, :3], [[1, 0, 0], [1, 0, 0], [0, 0, 1]])
+
+    def test_single_color_tuple(self):
+        """
+        Test that an RGB tuple colors every path, and that a list of colors must have one per path.
+        """
+        paths = [[np.array([[0, 0], [1, 1]])]] * 4
+        plot_paths(paths, ax=self.ax, color=(1, 0, 0))
+        colors = self.ax.collections[0].get_colors()
+        np.testing.assert_allclose(colors[:, :3], [[1, 0, 0]] * 4)
+        with self.assertRaises(ValueError):
+            plot_paths(paths, ax=self.ax, color=['red', 'blue'])
+
+    def test_reused_axis_after_clear(self):
+        """
+        Test that a cleared axis can be reused without keeping earlier artists.
+        """
+        for _ in range(3):
+            self.ax.clear()
+            plot_paths(self.paths, ax=self.ax)
+        self.assertEqual(len(self.ax.collections), 1)
+        self.assertTrue(self.ax.yaxis_inverted())
+
+class TestSavePlot(unittest.TestCase):
+
+    def test_svg_is_reproducible(self):
+        """
+        Test that saving the same figure at different dates gives the same SVG bytes.
+        """
+        paths = read_csv("./src/problems/frag0.csv")
+        fig, ax = plt.subplots()
+        plot_paths(paths, ax=ax)
+        contents = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, epoch in enumerate(("0", "2000000000")):
+                svg_path = os.path.join(tmp, f"{i}.svg")
+                with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': epoch}):
+                    save_plot_as_svg(fig, svg_path)
+                with open(svg_path, 'rb') as f:
+                    contents.append(f.read())
+        plt.close(fig)
+        self.assertEqual(contents[0], contents[1])
+        self.assertNotIn(b"<dc:date>", contents[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,28 +1,58 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import LineCollection
+from matplotlib.colors import is_color_like
 import numpy as np
 import os
+from .rasterizer import DEFAULT_SIZE, blend_palette, rasterize_coverage, write_png
+from .svg_writer import write_svg
 
-def plot_paths(paths, ax=None, color='blue', linewidth=2):
+SVG_HASH_SALT = 'curvetopia'  # Fixed salt for the ids matplotlib writes into SVGs
+
+def plot_paths(paths, ax=None, color='blue', linewidth=2, batch=True):
     """
     Plot a series of paths (curves) on a given axis.
     
+    By default all segments are drawn as one LineCollection, so the number of
+    artists does not grow with the number of segments. With batch=False every
+    segment gets its own Line2D, as before.
+    
     Parameters:
         paths (list): A list of paths, where each path is a list of (x, y) points.
         ax (matplotlib.axes._axes.Axes): The axis to plot on. If None, creates a new figure and axis.
-        color (str): Color of the paths.
+        color (str, tuple or list): Color of the paths (any matplotlib color, such as a name or an
+            RGB tuple), or a list with one color per path.
         linewidth (int): Width of the paths.
+        batch (bool): Draw all segments as a single LineCollection.
     
     Returns:
         matplotlib.axes._axes.Axes: The axis with the plotted paths.
+    
+    Raises:
+        ValueError: If a list of colors does not have one color per path.
     """
+    paths = list(paths)
+    colors = [color] * len(paths) if is_color_like(color) else list(color)
+    if len(colors) != len(paths):
+        raise ValueError(f"Got {len(colors)} colors for {len(paths)} paths")
+    
     if ax is None:
         fig, ax = plt.subplots()
     
-    for path in paths:
-        for segment in path:
-            segment = np.array(segment)
-            ax.plot(segment[:, 0], segment[:, 1], color=color, linewidth=linewidth)
+    if batch:
+        segments = []
+        segment_colors = []
+        for path, path_color in zip(paths, colors):
+            for segment in path:
+                segments.append(np.asarray(segment).reshape(-1, 2))
+                segment_colors.append(path_color)
+        ax.add_collection(LineCollection(segments, colors=segment_colors, linewidths=linewidth))
+        ax.autoscale_view()  # Collections do not update the data limits on their own
+    else:
+        for path, path_color in zip(paths, colors):
+            for segment in path:
+                segment = np.asarray(segment)
+                ax.plot(segment[:, 0], segment[:, 1], color=path_color, linewidth=linewidth)
     
     ax.set_aspect('equal', 'box')
     ax.invert_yaxis()  # To match the SVG coordinate system
@@ -32,11 +62,33 @@ def save_plot_as_svg(fig, output_path):
     """
     Save a matplotlib figure as an SVG file.
     
+    The output is reproducible: element ids use a fixed salt and no date is written,
+    so the same figure always gives the same bytes.
+    
     Parameters:
         fig (matplotlib.figure.Figure): The figure to save.
         output_path (str): The path where the SVG should be saved.
     """
-    fig.savefig(output_path, format='svg')
+    with plt.rc_context({'svg.hashsalt': SVG_HASH_SALT}):
+        fig.savefig(output_path, format='svg', metadata={'Date': None})
+    print(f"Saved SVG to {output_path}")
+
+def save_paths_as_svg(paths, output_path, shapes=None, color='blue', linewidth=2, precision=2):
+    """
+    Write paths straight to an SVG file, without building a matplotlib figure.
+
+    Segments become ``<path>`` elements and detected shapes become native SVG
+    elements, with coordinates rounded to precision decimals.
+
+    Parameters:
+        paths (list): A list of paths, where each path is a list of (x, y) points.
+        output_path (str): The path where the SVG should be saved.
+        shapes (dict): Optional detector results to draw on top (see ``svg_writer.SVGWriter.add_shapes``).
+        color (str): Color of the paths.
+        linewidth (float): Width of the paths in pixels.
+        precision (int): Number of decimals written for coordinates.
+    """
+    write_svg(output_path, paths, shapes=shapes, color=color, linewidth=linewidth, precision=precision)
     print(f"Saved SVG to {output_path}")
 
 def save_plot_as_png(fig, output_path):
@@ -50,6 +102,24 @@ def save_plot_as_png(fig, output_path):
     fig.savefig(output_path, format='png')
     print(f"Saved PNG to {output_path}")
 
+def save_paths_as_png(paths, output_path, color='blue', linewidth=2, size=DEFAULT_SIZE):
+    """
+    Rasterize paths straight to a PNG file, without building a matplotlib figure.
+
+    This is much faster than ``plot_paths`` followed by ``save_plot_as_png``. The
+    drawing keeps the same conventions: equal aspect and the y axis pointing down.
+
+    Parameters:
+        paths (list): A list of paths, where each path is a list of (x, y) points.
+        output_path (str): The path where the PNG should be saved.
+        color (str): Color of the paths.
+        linewidth (float): Width of the paths in pixels.
+        size (tuple): Image (width, height) in pixels.
+    """
+    coverage = rasterize_coverage(paths, size=size, linewidth=linewidth)
+    write_png(coverage, output_path, palette=blend_palette(color))
+    print(f"Saved PNG to {output_path}")
+
 def visualize_and_save(paths, output_dir, filename):
     """
     Visualize paths and save the plot as both SVG and PNG.
@@ -62,16 +132,11 @@ def visualize_and_save(paths, output_dir, filename):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    fig, ax = plt.subplots()
-    ax = plot_paths(paths, ax=ax)
-    
     svg_path = os.path.join(output_dir, f"{filename}.svg")
     png_path = os.path.join(output_dir, f"{filename}.png")
     
-    save_plot_as_svg(fig, svg_path)
-    save_plot_as_png(fig, png_path)
-    
-    plt.close(fig)
+    save_paths_as_svg(paths, svg_path)
+    save_paths_as_png(paths, png_path)
 
 def visualize_polygon(vertices, ax=None, color='green', linewidth=2, fill=False):
     """